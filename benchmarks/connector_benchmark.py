@@ -0,0 +1,136 @@
+"""
+Compara o BybitConnector (pybit síncrono, em threads) com o AsyncBybitConnector
+contra um servidor HTTP local que imita a API v5 (sem rede, sem credenciais reais).
+
+Rode a partir da raiz do projeto:
+    python -m benchmarks.connector_benchmark --requests 2000 --concurrency 50 --latency-ms 20
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+FAKE_KEY = "benchmark-key"
+FAKE_SECRET = "benchmark-secret"
+
+
+def _kline_body(limit):
+    now = int(time.time() // 60 * 60_000)
+    candles = [[str(now - i * 60_000), "100.0", "101.0", "99.0", "100.5", "12.3", "1234.5"] for i in range(limit)]
+    return json.dumps({"retCode": 0, "retMsg": "OK", "result": {"list": candles}, "time": now}).encode()
+
+
+def _serve(port, latency):
+    """Servidor aiohttp que responde /v5/market/kline com latência artificial."""
+    from aiohttp import web
+
+    bodies = {}
+
+    async def kline(request):
+        limit = int(request.query.get('limit', 200))
+        if limit not in bodies:
+            bodies[limit] = _kline_body(limit)
+        if latency:
+            await asyncio.sleep(latency)
+        return web.Response(body=bodies[limit], content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/v5/market/kline', kline)
+    web.run_app(app, host='127.0.0.1', port=port, print=None, handle_signals=False, access_log=None)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _wait_port(port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Servidor local não respondeu na porta {port}")
+
+
+def _summary(label, latencies, elapsed, failures):
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else 0.0
+    print(f"{label:<6} | {len(latencies) / elapsed:8.1f} req/s | "
+          f"p50: {statistics.median(ordered) * 1000 if ordered else 0:7.2f}ms | "
+          f"p99: {p99 * 1000:7.2f}ms | falhas: {failures}")
+
+
+def bench_sync(base_url, total, concurrency, limit):
+    from pybit.unified_trading import HTTP
+    from src.connector.bybit_connector import BybitConnector
+
+    session = HTTP(testnet=True, api_key=FAKE_KEY, api_secret=FAKE_SECRET)
+    session.endpoint = base_url
+    connector = BybitConnector(session=session)
+
+    def one(_):
+        started = time.perf_counter()
+        df = connector.get_historical_candles('linear', 'BTCUSDT', '1', limit=limit)
+        return time.perf_counter() - started, df is not None
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    elapsed = time.perf_counter() - started
+    _summary('sync', [r[0] for r in results], elapsed, sum(1 for r in results if not r[1]))
+
+
+async def _bench_async(base_url, total, concurrency, limit):
+    from src.connector.async_bybit_connector import AsyncBybitConnector
+
+    async with AsyncBybitConnector(api_key=FAKE_KEY, api_secret=FAKE_SECRET, base_url=base_url,
+                                   pool_size=concurrency) as connector:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                df = await connector.get_historical_candles('linear', 'BTCUSDT', '1', limit=limit)
+                return time.perf_counter() - started, df is not None
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+    _summary('async', [r[0] for r in results], elapsed, sum(1 for r in results if not r[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sync x async do conector Bybit')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Latência simulada pelo servidor local')
+    parser.add_argument('--limit', type=int, default=200, help='Candles por resposta')
+    args = parser.parse_args()
+
+    from src.utils.logger import logger
+    logger.remove()  # Os logs por requisição distorceriam a medição
+
+    port = _free_port()
+    server = multiprocessing.Process(target=_serve, args=(port, args.latency_ms / 1000), daemon=True)
+    server.start()
+    try:
+        _wait_port(port)
+        base_url = f"http://127.0.0.1:{port}"
+        print(f"Requisições: {args.requests} | Concorrência: {args.concurrency} | Latência simulada: {args.latency_ms}ms")
+        bench_sync(base_url, args.requests, args.concurrency, args.limit)
+        asyncio.run(_bench_async(base_url, args.requests, args.concurrency, args.limit))
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+Custo de log por ciclo no caminho crítico: as chamadas de log de um ciclo do executor
+(metadata, última linha dos sinais, posição, saldo, tamanho da ordem e o log de
+requisições do pybit), no formato antigo (f-strings em INFO) e com `hot_log`.
+
+Cada cenário roda em um processo novo, pois o logger é configurado na importação a partir
+de LOG_LEVEL/LOG_MODE. Os logs vão para um diretório temporário e o console para /dev/null
+(num terminal real o console custa mais). A partir da raiz do projeto:
+    python -m benchmarks.logging_benchmark --cycles 2000
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (nome, variante do ciclo, LOG_LEVEL, LOG_MODE)
+SCENARIOS = [
+    ('antes  INFO    text', 'legacy', 'INFO', 'text'),
+    ('depois INFO    text', 'hot_log', 'INFO', 'text'),
+    ('depois INFO    hot ', 'hot_log', 'INFO', 'hot'),
+    ('antes  WARNING text', 'legacy', 'WARNING', 'text'),
+    ('depois WARNING text', 'hot_log', 'WARNING', 'text'),
+]
+
+
+def build_context():
+    import numpy as np
+    import pandas as pd
+
+    rows = 200
+    close = 100 + np.cumsum(np.random.default_rng(7).normal(size=rows))
+    dataframe = pd.DataFrame({
+        'timestamp': np.arange(rows) * 900_000, 'open': close, 'high': close + 1, 'low': close - 1,
+        'close': close, 'volume': np.full(rows, 10.0), 'ema_fast': close, 'ema_slow': close,
+        'enter_long': 0, 'enter_short': 0, 'exit_long': 0, 'exit_short': 0,
+        'stop_loss': close * 0.98, 'take_profit': close * 1.04,
+    })
+    position = {'symbol': 'BTCUSDT', 'side': 'Buy', 'size': '0.010', 'avgPrice': '100.5', 'leverage': '5',
+                'positionValue': '1.005', 'unrealisedPnl': '0.02', 'stopLoss': '98.5', 'takeProfit': '104.5',
+                'createdTime': '1700000000000', 'updatedTime': '1700000900000', 'positionIdx': 0}
+    response = {'retCode': 0, 'retMsg': 'OK', 'result': {'category': 'linear', 'list': [position]}}
+    return dataframe, response
+
+
+def legacy_cycle(logger, pybit_logger, strategy, dataframe, response):
+    """As chamadas de log do ciclo como eram: tudo formatado, mesmo se filtrado."""
+    symbol, interval = 'BTCUSDT', '15'
+    logger.info(f"Executor: Starting strategy execution for {symbol} on {interval} timeframe")
+    pybit_logger.debug(f"Request -> GET /v5/position/list. Body: {{'category': 'linear', 'symbol': '{symbol}'}}")
+    pybit_logger.debug(f"Response text: {json.dumps(response)}")
+    position = response['result']['list'][0]
+    logger.info(f"Connector: Found open position - {position}")
+    logger.info(f"Executor: Getting balance for USDT (Account: UNIFIED)")
+    logger.info(f"Executor: Available balance: {1000.0:.2f} USDT, Investment percent: {10}%, Capital to use: {100.0:.2f} USDT")
+    metadata = {'capital_to_use': 100.0, 'quote_coin': 'USDT', 'close_price': 100.5, 'order_qty': 0.995}
+    strategy.metadata.update(metadata)
+    logger.info(f"Strategy: Metadata updated - {metadata}")
+    logger.info(f"Executor: Order size calculated - Qty: {0.995} BTC, Value: {100.0:.2f} USDT")
+    strategy.metadata.update(metadata)
+    logger.info(f"Strategy: Metadata updated - {metadata}")
+    last_row = dataframe.iloc[-1]
+    logger.info(f"Strategy: Last row - Close: {last_row['close']:.2f}, EnterLong: {last_row.get('enter_long', 0)}, "
+                f"EnterShort: {last_row.get('enter_short', 0)}, ExitLong: {last_row.get('exit_long', 0)}, "
+                f"ExitShort: {last_row.get('exit_short', 0)}, StopLoss: {last_row.get('stop_loss', 0):.2f}, "
+                f"TakeProfit: {last_row.get('take_profit', 0):.2f}")
+
+
+def hot_log_cycle(hot_log, parse_open_position, strategy, dataframe, response):
+    """As mesmas mensagens pelo código atual (hot_log, parse_open_position e update_metadata reais)."""
+    symbol, interval = 'BTCUSDT', '15'
+    hot_log(('executor.run', symbol), 'INFO', "Executor: Starting strategy execution for {symbol} on {interval} timeframe",
+            symbol=symbol, interval=interval)
+    parse_open_position(response)
+    hot_log('executor.balance_request', 'DEBUG', "Executor: Getting balance for {coin} (Account: {account_type})",
+            coin='USDT', account_type='UNIFIED')
+    hot_log('executor.balance', 'INFO',
+            "Executor: Available balance: {balance:.2f} {coin}, Investment percent: {investment_percent}%, "
+            "Capital to use: {capital:.2f} {coin}",
+            balance=1000.0, coin='USDT', investment_percent=10, capital=100.0)
+    metadata = {'capital_to_use': 100.0, 'quote_coin': 'USDT', 'close_price': 100.5, 'order_qty': 0.995}
+    strategy.update_metadata(metadata)
+    hot_log(('executor.order_size', symbol), 'INFO', "Executor: Order size calculated - Qty: {qty} {base}, Value: {value:.2f} {coin}",
+            qty=0.995, base=lambda: 'BTC', value=100.0, coin='USDT')
+    strategy.update_metadata(metadata)
+    hot_log('strategy.last_row', 'INFO',
+            "Strategy: Last row - Close: {row[close]:.2f}, EnterLong: {row[enter_long]}, "
+            "EnterShort: {row[enter_short]}, ExitLong: {row[exit_long]}, ExitShort: {row[exit_short]}, "
+            "StopLoss: {row[stop_loss]:.2f}, TakeProfit: {row[take_profit]:.2f}",
+            row=lambda: strategy._signal_snapshot(dataframe))
+
+
+def run_child(variant, cycles, warmup):
+    """Executado no processo filho: imprime um JSON com as durações por ciclo (µs)."""
+    sys.path.insert(0, ROOT_DIR)
+    from src.utils.logger import logger, hot_log, REQUEST_LOGGING
+    from src.connector.responses import parse_open_position
+    from strategies.base_strategy import BaseStrategy
+
+    class Strategy(BaseStrategy):
+        populate_indicators = populate_entry_trend = populate_exit_trend = lambda self, dataframe, metadata: dataframe
+
+    strategy = Strategy(config={})
+    dataframe, response = build_context()
+    # Como o conector configurava o pybit antes: log_requests sempre ligado, handler em INFO
+    pybit_logger = logging.getLogger('pybit._http_manager')
+
+    def cycle():
+        if variant == 'legacy':
+            legacy_cycle(logger, pybit_logger, strategy, dataframe, response)
+        else:
+            if REQUEST_LOGGING:
+                pybit_logger.debug(f"Response text: {json.dumps(response)}")
+            hot_log_cycle(hot_log, parse_open_position, strategy, dataframe, response)
+
+    for _ in range(warmup):
+        cycle()
+    durations = []
+    for _ in range(cycles):
+        started = time.perf_counter()
+        cycle()
+        durations.append((time.perf_counter() - started) * 1e6)
+    started = time.perf_counter()
+    logger.remove()  # Espera os sinks assíncronos esvaziarem a fila
+    drain = (time.perf_counter() - started) * 1e3
+    print(json.dumps({'durations': durations, 'drain_ms': drain}), file=sys.__stdout__)
+
+
+def run_scenario(variant, level, mode, cycles, warmup):
+    with tempfile.TemporaryDirectory() as workdir:
+        env = {**os.environ, 'LOG_LEVEL': level, 'LOG_MODE': mode, 'LOG_SAMPLE_INTERVAL': '0'}
+        result = subprocess.run(
+            [sys.executable, '-m', 'benchmarks.logging_benchmark', '--child', variant,
+             '--cycles', str(cycles), '--warmup', str(warmup)],
+            cwd=workdir, env={**env, 'PYTHONPATH': ROOT_DIR}, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, check=True,
+        )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Custo de log por ciclo (antes/depois do hot_log)')
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--child', choices=['legacy', 'hot_log'], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.cycles, args.warmup)
+        return
+
+    print("Limite por mensagem desligado (LOG_SAMPLE_INTERVAL=0): todas as mensagens são emitidas.")
+    for name, variant, level, mode in SCENARIOS:
+        result = run_scenario(variant, level, mode, args.cycles, args.warmup)
+        ordered = sorted(result['durations'])
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"{name}: média {statistics.mean(ordered):7.1f}µs | p50 {statistics.median(ordered):7.1f}µs | "
+              f"p99 {p99:7.1f}µs por ciclo | esvaziar sinks {result['drain_ms']:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark/regressão offline do StrategyExecutor.run sobre uma sessão gravada.
+
+Grave uma sessão real com:
+    python src/main.py --record logs/session.jsonl.gz
+e depois rode, a partir da raiz do projeto:
+    python -m benchmarks.replay_benchmark logs/session.jsonl.gz --strategy simple_cross_long_test --pair BTCUSDT --timeframe 15
+"""
+import argparse
+import statistics
+import time
+from src.connector.bybit_connector import ReplayConnector
+from src.connector.cassette import ReplayClock
+from src.core.executor import StrategyExecutor
+from src.core.strategy_loader import load_strategy_class
+
+
+def run(cassette, strategy_name, pair, timeframe, category, speed):
+    connector = ReplayConnector(cassette, speed=speed)
+    strategy = load_strategy_class(strategy_name)(config={'pair': pair, 'timeframe': timeframe})
+    # Relógio da sessão gravada, como no --replay do main: o delta de candles segue a gravação
+    executor = StrategyExecutor(connector, strategy, clock=ReplayClock(connector.session))
+
+    durations = []
+    while not connector.exhausted:
+        started = time.perf_counter()
+        executor.run(category=category, symbol=pair, interval=timeframe)
+        durations.append(time.perf_counter() - started)
+    return durations, connector.session
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay benchmark do StrategyExecutor')
+    parser.add_argument('cassette')
+    parser.add_argument('--strategy', required=True)
+    parser.add_argument('--pair', required=True)
+    parser.add_argument('--timeframe', required=True)
+    parser.add_argument('--category', default='linear')
+    parser.add_argument('--speed', type=float, default=0.0, help='0 = o mais rápido possível, 1.0 = latência gravada de cada chamada (sem as pausas entre chamadas)')
+    args = parser.parse_args()
+
+    durations, session = run(args.cassette, args.strategy, args.pair, args.timeframe, args.category, args.speed)
+    if not durations:
+        print("Nenhum ciclo reproduzido.")
+        return
+
+    ordered = sorted(durations)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(f"Ciclos: {len(durations)} | Chamadas reproduzidas: {session.calls} | Não consumidas: {session.remaining} | Divergências: {session.mismatches}")
+    print(f"Total: {sum(durations):.3f}s | Média: {statistics.mean(durations) * 1000:.2f}ms | "
+          f"p50: {statistics.median(durations) * 1000:.2f}ms | p99: {p99 * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Mede o tempo até o primeiro ciclo: do início do processo `python src/main.py ...` até o log
+"Running check..." (o processo é encerrado em seguida). Cada rodada é um processo novo.
+
+Sem rede, usando uma sessão gravada:
+    python -m benchmarks.startup_benchmark --runs 5 -- --replay logs/session.jsonl.gz --strategy simple_cross_long_test --pair BTCUSDT --timeframe 15
+
+Com `--importtime`, mostra também os módulos de importação mais lenta da primeira rodada.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MAIN = os.path.join(ROOT_DIR, 'src', 'main.py')
+FIRST_CYCLE_MARKER = "Running check..."
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def time_to_first_cycle(main_args, timeout, importtime=False):
+    """Retorna (segundos até o marcador ou None, linhas de -X importtime)."""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + [MAIN] + main_args
+    started = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                               text=True, env={**os.environ, 'PYTHONUNBUFFERED': '1'})
+    elapsed = None
+    import_lines = []
+    try:
+        for line in process.stderr:
+            if line.startswith("import time:"):
+                import_lines.append(line)
+            elif FIRST_CYCLE_MARKER in line:
+                elapsed = time.perf_counter() - started
+                break
+            if time.perf_counter() - started > timeout:
+                break
+    finally:
+        process.kill()
+        process.wait()
+    return elapsed, import_lines
+
+
+def slowest_imports(lines, top):
+    """Top-N módulos de primeiro nível por tempo cumulativo (µs)."""
+    entries = []
+    for line in lines:
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) <= 3:
+            entries.append((int(match.group(2)), match.group(4)))
+    return sorted(entries, reverse=True)[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tempo até o primeiro ciclo do robô')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--importtime', action='store_true', help='Lista as importações mais lentas')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('main_args', nargs=argparse.REMAINDER, help='Argumentos repassados ao src/main.py (após --)')
+    args = parser.parse_args()
+    main_args = [a for a in args.main_args if a != '--']
+
+    durations = []
+    for run in range(args.runs):
+        elapsed, import_lines = time_to_first_cycle(main_args, args.timeout, importtime=args.importtime and run == 0)
+        if elapsed is None:
+            print(f"Rodada {run + 1}: primeiro ciclo não alcançado em {args.timeout}s")
+            continue
+        durations.append(elapsed)
+        print(f"Rodada {run + 1}: {elapsed * 1000:.0f}ms")
+        if import_lines:
+            print("Importações mais lentas (cumulativo):")
+            for micros, module in slowest_imports(import_lines, args.top):
+                print(f"  {micros / 1000:8.1f}ms  {module}")
+
+    if durations:
+        print(f"Tempo até o primeiro ciclo: mediana {statistics.median(durations) * 1000:.0f}ms | "
+              f"mín {min(durations) * 1000:.0f}ms | máx {max(durations) * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
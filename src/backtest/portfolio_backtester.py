@@ -0,0 +1,300 @@
+"""
+Backtest de portfólio multi-ativo sobre matrizes tempo x símbolo.
+
+Os candles de todos os símbolos são alinhados em uma grade regular de tempo e os
+sinais de cada estratégia são calculados de forma vetorizada por blocos de tempo.
+A simulação compartilha saldo e margem entre todos os símbolos e processa cada
+barra com operações vetorizadas sobre os símbolos. A memória fica limitada pelo
+tamanho do bloco (`chunk_bars`), não pelo tamanho do histórico.
+
+Uso (a partir da raiz do projeto):
+    python -m src.backtest.portfolio_backtester --strategy simple_cross_long_test \\
+        --all-usdt --timeframe 15 --start 2024-01-01 --end 2024-03-01 --refresh
+"""
+import argparse
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from src.utils.logger import logger
+from src.core.strategy_loader import create_strategy
+from src.data.candle_store import CandleStore, interval_to_ms
+from src.data.market_data import AuxSeriesStore, DERIVATIVES_ONLY, join_aux
+
+PRICE_COLUMNS = ['close', 'high', 'low']
+SIGNAL_COLUMNS = ['enter_long', 'enter_short', 'exit_long', 'exit_short', 'stop_loss', 'take_profit']
+
+
+@dataclass
+class BacktestConfig:
+    initial_balance: float = 1000.0
+    fee_rate: float = 0.00055     # Taxa taker por lado
+    chunk_bars: int = 5000        # Barras por bloco de simulação
+    warmup_bars: int = 200        # Histórico extra para aquecer indicadores (igual ao limit do live)
+
+
+@dataclass
+class PortfolioState:
+    """Estado carregado entre blocos: um valor por símbolo, mais o saldo compartilhado."""
+    balance: float
+    qty: np.ndarray
+    entry: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    margin: np.ndarray
+    last_close: np.ndarray
+    trades: np.ndarray
+    wins: np.ndarray
+    pnl: np.ndarray
+    fees: np.ndarray
+
+    @classmethod
+    def empty(cls, balance, n_symbols):
+        zeros = lambda: np.zeros(n_symbols)
+        return cls(balance, zeros(), zeros(), zeros(), zeros(), zeros(), np.full(n_symbols, np.nan),
+                   zeros(), zeros(), zeros(), zeros())
+
+
+@dataclass
+class BacktestResult:
+    per_symbol: pd.DataFrame
+    summary: Dict
+    equity: pd.Series = field(repr=False)
+
+
+class PortfolioBacktester:
+
+    def __init__(self, strategy_name: str, symbols: List[str], category: str, interval: str,
+                 store: CandleStore, config: Optional[BacktestConfig] = None, overrides: Optional[Dict] = None):
+        self.symbols = list(symbols)
+        self.category = category
+        self.interval = str(interval)
+        self.step = interval_to_ms(interval)
+        self.store = store
+        self.config = config or BacktestConfig()
+        self.strategies = [
+            create_strategy(strategy_name, config={'pair': s, 'timeframe': self.interval}, overrides=overrides)
+            for s in self.symbols
+        ]
+        self.leverage = np.array([float(s.leverage or 1) for s in self.strategies])
+        self.invest_fraction = np.array([float(s.investment_percent or 100) / 100 for s in self.strategies])
+        # Séries auxiliares declaradas pelas estratégias (`aux_data`), lidas do armazenamento local
+        self.aux_stores = {kind: AuxSeriesStore(kind) for s in self.strategies for kind in s.aux_data}
+
+    def _load_aux(self, kind, symbol, start: int, end: int) -> Optional[pd.DataFrame]:
+        if kind in DERIVATIVES_ONLY and self.category == 'spot':
+            return None
+        store = self.aux_stores[kind]
+        return store.load(self.category, symbol, self.interval, start - store.lookback_ms(self.interval), end)
+
+    def refresh_aux(self, connector, start: int, end: int):
+        """Baixa da API o que falta das séries auxiliares em [start, end] para todos os símbolos."""
+        for kind, store in self.aux_stores.items():
+            if kind in DERIVATIVES_ONLY and self.category == 'spot':
+                continue
+            for symbol in self.symbols:
+                store.refresh(connector, self.category, symbol, self.interval, start - store.lookback_ms(self.interval), end)
+
+    def _build_panel(self, chunk_start: int, chunk_end: int) -> Dict[str, np.ndarray]:
+        """Monta as matrizes [tempo, símbolo] de preços e sinais para um bloco."""
+        n_bars = (chunk_end - chunk_start) // self.step
+        shape = (n_bars, len(self.symbols))
+        panel = {c: np.full(shape, np.nan) for c in PRICE_COLUMNS}
+        panel.update({c: np.zeros(shape) for c in SIGNAL_COLUMNS})
+
+        warmup_start = chunk_start - self.config.warmup_bars * self.step
+        for j, (symbol, strategy) in enumerate(zip(self.symbols, self.strategies)):
+            df = self.store.load(self.category, symbol, self.interval, warmup_start, chunk_end)
+            if df.empty:
+                continue
+            if strategy.aux_data:
+                # Mesmo alinhamento as-of do loop ao vivo
+                df = join_aux(df, {kind: self._load_aux(kind, symbol, warmup_start, chunk_end) for kind in strategy.aux_data})
+            df = strategy.calculate_signals(df, {'symbol': symbol, 'interval': self.interval})
+            df = df[df['timestamp'] >= chunk_start]
+            if df.empty:
+                continue
+            rows = ((df['timestamp'].to_numpy() - chunk_start) // self.step).astype(np.int64)
+            for column in PRICE_COLUMNS + SIGNAL_COLUMNS:
+                if column in df:
+                    panel[column][rows, j] = df[column].to_numpy(dtype=np.float64)
+        return panel
+
+    def _close_positions(self, state: PortfolioState, mask: np.ndarray, exit_price: np.ndarray):
+        qty = state.qty[mask]
+        price = exit_price[mask]
+        fees = np.abs(qty) * price * self.config.fee_rate
+        pnl = qty * (price - state.entry[mask]) - fees
+
+        state.balance += pnl.sum()
+        state.pnl[mask] += pnl
+        state.fees[mask] += fees
+        state.trades[mask] += 1
+        state.wins[mask] += pnl > 0
+        state.qty[mask] = 0
+        state.entry[mask] = 0
+        state.margin[mask] = 0
+        state.stop_loss[mask] = 0
+        state.take_profit[mask] = 0
+
+    def _simulate_chunk(self, panel: Dict[str, np.ndarray], state: PortfolioState):
+        n_bars = panel['close'].shape[0]
+        equity = np.empty(n_bars)
+        open_counts = np.empty(n_bars, dtype=np.int64)
+
+        for t in range(n_bars):
+            close, high, low = panel['close'][t], panel['high'][t], panel['low'][t]
+            valid = ~np.isnan(close)
+            state.last_close[valid] = close[valid]
+            long, short = state.qty > 0, state.qty < 0
+            sl, tp = state.stop_loss, state.take_profit
+
+            # 1. Stop loss / take profit dentro da barra (stop tem prioridade se ambos forem tocados)
+            exit_price = np.full(len(close), np.nan)
+            hit_sl = valid & (sl > 0) & ((long & (low <= sl)) | (short & (high >= sl)))
+            hit_tp = valid & (tp > 0) & ~hit_sl & ((long & (high >= tp)) | (short & (low <= tp)))
+            exit_price[hit_sl] = sl[hit_sl]
+            exit_price[hit_tp] = tp[hit_tp]
+
+            # 2. Sinais de saída no fechamento; como no live, posições com stop ficam com a corretora
+            signal_exit = valid & (sl == 0) & np.isnan(exit_price) & (
+                (long & (panel['exit_long'][t] == 1)) | (short & (panel['exit_short'][t] == 1)))
+            exit_price[signal_exit] = close[signal_exit]
+
+            closing = ~np.isnan(exit_price)
+            if closing.any():
+                self._close_positions(state, closing, exit_price)
+
+            # 3. Entradas com saldo e margem compartilhados
+            flat = valid & (state.qty == 0)
+            want_long = flat & (panel['enter_long'][t] == 1)
+            want_short = flat & (panel['enter_short'][t] == 1) & ~want_long
+            candidates = np.flatnonzero(want_long | want_short)
+            if len(candidates):
+                unrealized = np.nansum(state.qty * (state.last_close - state.entry))
+                free_margin = state.balance + unrealized - state.margin.sum()
+                capital = max(state.balance, 0.0) * self.invest_fraction[candidates]
+                margin_needed = capital / self.leverage[candidates]
+                accepted = np.cumsum(margin_needed) <= free_margin
+                idx = candidates[accepted]
+                if len(idx):
+                    price = close[idx]
+                    qty = capital[accepted] / price
+                    fees = qty * price * self.config.fee_rate
+                    state.balance -= fees.sum()
+                    state.fees[idx] += fees
+                    state.pnl[idx] -= fees
+                    state.qty[idx] = np.where(want_long[idx], qty, -qty)
+                    state.entry[idx] = price
+                    state.margin[idx] = margin_needed[accepted]
+                    state.stop_loss[idx] = panel['stop_loss'][t][idx]
+                    state.take_profit[idx] = panel['take_profit'][t][idx]
+
+            open_positions = state.qty != 0
+            equity[t] = state.balance + np.nansum(state.qty[open_positions] * (state.last_close[open_positions] - state.entry[open_positions]))
+            open_counts[t] = open_positions.sum()
+
+        return equity, open_counts
+
+    def run(self, start: int, end: int) -> BacktestResult:
+        """Executa o backtest em [start, end) (timestamps em ms), bloco a bloco."""
+        start -= start % self.step
+        state = PortfolioState.empty(self.config.initial_balance, len(self.symbols))
+        equity_parts, timestamps, max_open = [], [], 0
+
+        chunk_span = self.config.chunk_bars * self.step
+        for chunk_start in range(start, end, chunk_span):
+            chunk_end = min(chunk_start + chunk_span, end)
+            panel = self._build_panel(chunk_start, chunk_end)
+            equity, open_counts = self._simulate_chunk(panel, state)
+            equity_parts.append(equity)
+            timestamps.append(np.arange(chunk_start, chunk_start + len(equity) * self.step, self.step))
+            if len(open_counts):
+                max_open = max(max_open, int(open_counts.max()))
+            logger.info(f"Backtest: Chunk {pd.to_datetime(chunk_start, unit='ms')} done - Equity: {equity[-1] if len(equity) else state.balance:.2f}")
+
+        # Posições abertas no fim são marcadas pelo último preço conhecido
+        still_open = (state.qty != 0) & ~np.isnan(state.last_close)
+        if still_open.any():
+            self._close_positions(state, still_open, state.last_close)
+
+        equity = pd.Series(np.concatenate(equity_parts) if equity_parts else np.array([]),
+                           index=pd.to_datetime(np.concatenate(timestamps) if timestamps else [], unit='ms'))
+        return self._report(state, equity, max_open)
+
+    def _report(self, state: PortfolioState, equity: pd.Series, max_open: int) -> BacktestResult:
+        per_symbol = pd.DataFrame({
+            'trades': state.trades.astype(int),
+            'wins': state.wins.astype(int),
+            'win_rate': np.divide(state.wins, state.trades, out=np.zeros_like(state.wins), where=state.trades > 0),
+            'pnl': state.pnl,
+            'fees': state.fees,
+        }, index=pd.Index(self.symbols, name='symbol')).sort_values('pnl', ascending=False)
+
+        initial = self.config.initial_balance
+        drawdown = (equity / equity.cummax() - 1).min() if len(equity) else 0.0
+        summary = {
+            'initial_balance': initial,
+            'final_balance': state.balance,
+            'return_pct': (state.balance / initial - 1) * 100,
+            'max_drawdown_pct': float(drawdown) * 100,
+            'trades': int(state.trades.sum()),
+            'win_rate': float(state.wins.sum() / state.trades.sum()) if state.trades.sum() else 0.0,
+            'fees': float(state.fees.sum()),
+            'max_concurrent_positions': max_open,
+        }
+        return BacktestResult(per_symbol=per_symbol, summary=summary, equity=equity)
+
+
+def _to_ms(date_str):
+    return int(pd.Timestamp(date_str, tz='UTC').timestamp() * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backtest de portfólio multi-ativo')
+    parser.add_argument('--strategy', required=True)
+    parser.add_argument('--pairs', nargs='*', default=[], help='Lista de pares (ex: BTCUSDT ETHUSDT)')
+    parser.add_argument('--all-usdt', action='store_true', help='Usa todos os perpétuos USDT em negociação')
+    parser.add_argument('--timeframe', required=True)
+    parser.add_argument('--category', default='linear')
+    parser.add_argument('--start', required=True, help='Data inicial (UTC), ex: 2024-01-01')
+    parser.add_argument('--end', required=True, help='Data final (UTC), ex: 2024-03-01')
+    parser.add_argument('--balance', type=float, default=BacktestConfig.initial_balance)
+    parser.add_argument('--fee', type=float, default=BacktestConfig.fee_rate)
+    parser.add_argument('--chunk-bars', type=int, default=BacktestConfig.chunk_bars)
+    parser.add_argument('--refresh', action='store_true', help='Baixa da API os candles (e séries auxiliares) que faltam no armazenamento local')
+    parser.add_argument('--testnet', action=argparse.BooleanOptionalAction, default=False)
+    args = parser.parse_args()
+
+    store = CandleStore()
+    start, end = _to_ms(args.start), _to_ms(args.end)
+    config = BacktestConfig(initial_balance=args.balance, fee_rate=args.fee, chunk_bars=args.chunk_bars)
+
+    symbols = list(args.pairs)
+    connector = None
+    if args.all_usdt or args.refresh:
+        from src.connector.bybit_connector import BybitConnector
+        connector = BybitConnector(testnet=args.testnet)
+        if args.all_usdt:
+            instruments = connector.get_instruments(args.category, quote_coin='USDT') or []
+            symbols += [i['symbol'] for i in instruments if i.get('contractType', 'LinearPerpetual') == 'LinearPerpetual']
+
+    if not symbols:
+        parser.error('Informe --pairs ou --all-usdt')
+
+    backtester = PortfolioBacktester(args.strategy, sorted(set(symbols)), args.category, args.timeframe, store, config)
+    if args.refresh:
+        warmup = config.warmup_bars * interval_to_ms(args.timeframe)
+        for symbol in backtester.symbols:
+            store.refresh(connector, args.category, symbol, args.timeframe, start - warmup, end)
+        backtester.refresh_aux(connector, start - warmup, end)
+    result = backtester.run(start, end)
+
+    print(result.per_symbol.to_string(float_format=lambda v: f"{v:.4f}"))
+    print()
+    for key, value in result.summary.items():
+        print(f"{key}: {value:.4f}" if isinstance(value, float) else f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
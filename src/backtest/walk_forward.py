@@ -0,0 +1,268 @@
+"""
+Análise walk-forward sobre o backtest de portfólio.
+
+O histórico é dividido em folds móveis: cada um otimiza os parâmetros da estratégia
+(overrides, ex: ema_fast, stop_loss) no trecho in-sample e avalia a melhor combinação no
+trecho out-of-sample seguinte. Cada backtest (estratégia, parâmetros, período) roda em um
+processo do pool e tem o resultado guardado em disco, sob um hash do código-fonte da
+estratégia e do motor de backtest, dos parâmetros, do período e dos próprios candles. Rodar
+de novo depois de mudar uma estratégia ou um parâmetro recalcula só o que mudou.
+
+Uso (a partir da raiz do projeto):
+    python -m src.backtest.walk_forward --strategy simple_cross_long_test --pairs BTCUSDT ETHUSDT \\
+        --timeframe 15 --start 2023-01-01 --end 2024-01-01 --train-days 90 --test-days 30 \\
+        --param ema_fast=5,9,12 --param ema_slow=21,30 --param stop_loss=1,2
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import pandas as pd
+from src.utils.logger import logger
+from src.backtest.portfolio_backtester import BacktestConfig, PortfolioBacktester, _to_ms
+from src.core.strategy_loader import PROJECT_ROOT, STRATEGIES_DIR
+from src.data.candle_store import CandleStore, interval_to_ms
+
+DEFAULT_CACHE_DIR = Path('data') / 'walk_forward'
+DAY_MS = 86_400_000
+# Chaves do resumo do backtest que podem ser otimizadas (maximizadas)
+METRICS = ('return_pct', 'max_drawdown_pct', 'win_rate', 'final_balance')
+# Código que define o resultado de um backtest além do arquivo da estratégia
+ENGINE_FILES = (
+    os.path.join(STRATEGIES_DIR, 'base_strategy.py'),
+    os.path.join(PROJECT_ROOT, 'src', 'backtest', 'portfolio_backtester.py'),
+    os.path.join(PROJECT_ROOT, 'src', 'data', 'market_data.py'),
+)
+
+
+@dataclass
+class Fold:
+    index: int
+    train_start: int
+    train_end: int
+    test_start: int
+    test_end: int
+
+
+@dataclass(frozen=True)
+class BacktestTask:
+    """Um backtest do walk-forward; é o que vai para os processos do pool."""
+    strategy: str
+    symbols: Tuple[str, ...]
+    category: str
+    interval: str
+    start: int
+    end: int
+    params: Tuple[Tuple[str, object], ...]
+    config: Tuple[Tuple[str, object], ...]
+
+
+def make_folds(start: int, end: int, train_ms: int, test_ms: int, step_ms: Optional[int] = None) -> List[Fold]:
+    """Folds móveis [treino | teste] avançando `step_ms` (padrão: o tamanho do teste) até `end`."""
+    step_ms = step_ms or test_ms
+    folds = []
+    train_start = start
+    while train_start + train_ms + test_ms <= end:
+        train_end = train_start + train_ms
+        folds.append(Fold(len(folds), train_start, train_end, train_end, train_end + test_ms))
+        train_start += step_ms
+    return folds
+
+
+def parse_param(text: str) -> Tuple[str, list]:
+    """'ema_fast=5,9,12' -> ('ema_fast', [5, 9, 12]). Valores em JSON quando possível (números, true/false)."""
+    name, sep, values = text.partition('=')
+    if not sep or not name or not values:
+        raise ValueError(f"Parâmetro inválido '{text}'. Use nome=valor1,valor2")
+    parsed = []
+    for value in values.split(','):
+        try:
+            parsed.append(json.loads(value))
+        except ValueError:
+            parsed.append(value)
+    return name, parsed
+
+
+def parameter_grid(grid: Dict[str, list]) -> List[Dict]:
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def source_digest(strategy_name) -> str:
+    """Hash do arquivo da estratégia e do código do motor de backtest."""
+    digest = hashlib.sha256()
+    for path in (os.path.join(STRATEGIES_DIR, f"{strategy_name}.py"),) + ENGINE_FILES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def data_digest(backtester: PortfolioBacktester, start: int, end: int) -> str:
+    """Hash dos candles (e séries auxiliares) que o backtest de [start, end) vai ler, aquecimento incluído."""
+    digest = hashlib.sha256()
+    warmup_start = start - start % backtester.step - backtester.config.warmup_bars * backtester.step
+    for symbol, strategy in zip(backtester.symbols, backtester.strategies):
+        frames = [backtester.store.load(backtester.category, symbol, backtester.interval, warmup_start, end)]
+        frames += [backtester._load_aux(kind, symbol, warmup_start, end) for kind in strategy.aux_data]
+        for frame in frames:
+            if frame is not None and not frame.empty:
+                digest.update(pd.util.hash_pandas_object(frame, index=False).to_numpy().tobytes())
+            digest.update(b'|')
+    return digest.hexdigest()
+
+
+def evaluate(task: BacktestTask, source_hash: str, cache_dir: Path) -> Dict:
+    """Roda um backtest ou devolve o resultado em cache. Retorna o resumo com `cached`."""
+    backtester = PortfolioBacktester(task.strategy, list(task.symbols), task.category, task.interval, CandleStore(),
+                                     BacktestConfig(**dict(task.config)), dict(task.params))
+    key = hashlib.sha256(json.dumps({
+        'source': source_hash, 'task': asdict(task), 'data': data_digest(backtester, task.start, task.end),
+    }, sort_keys=True, default=str).encode()).hexdigest()
+    path = Path(cache_dir) / f"{key}.json"
+    if path.exists():
+        try:
+            with open(path) as f:
+                return {**json.load(f), 'cached': True}
+        except (OSError, ValueError):
+            pass  # Cache corrompido: recalcula
+
+    summary = backtester.run(task.start, task.end).summary
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(summary, f)
+    tmp_path.replace(path)
+    return {**summary, 'cached': False}
+
+
+class WalkForward:
+
+    def __init__(self, strategy_name: str, symbols: List[str], category: str, interval: str, grid: Dict[str, list],
+                 config: Optional[BacktestConfig] = None, metric: str = 'return_pct', jobs: Optional[int] = None,
+                 cache_dir=DEFAULT_CACHE_DIR):
+        """
+        Args:
+            grid: Valores de cada override a testar no in-sample ({'ema_fast': [5, 9]})
+            metric: Chave do resumo do backtest maximizada na otimização (ex: return_pct)
+            jobs: Processos em paralelo (padrão: número de CPUs)
+        """
+        self.strategy_name = strategy_name
+        self.symbols = tuple(sorted(set(symbols)))
+        self.category = category
+        self.interval = str(interval)
+        self.combos = parameter_grid(grid)
+        self.config = tuple(sorted(asdict(config or BacktestConfig()).items()))
+        self.metric = metric
+        self.jobs = jobs
+        self.cache_dir = Path(cache_dir)
+        self.cached = 0
+        self.computed = 0
+
+    def _task(self, params: Dict, start: int, end: int) -> BacktestTask:
+        return BacktestTask(self.strategy_name, self.symbols, self.category, self.interval, start, end,
+                            tuple(sorted(params.items())), self.config)
+
+    def _run_all(self, pool, tasks: List[BacktestTask], source_hash) -> List[Dict]:
+        futures = [pool.submit(evaluate, task, source_hash, self.cache_dir) for task in tasks]
+        results = [future.result() for future in futures]
+        for result in results:
+            if result['cached']:
+                self.cached += 1
+            else:
+                self.computed += 1
+        return results
+
+    def run(self, folds: List[Fold]) -> pd.DataFrame:
+        """Otimiza cada fold no in-sample e avalia no out-of-sample. Retorna uma linha por fold."""
+        source_hash = source_digest(self.strategy_name)
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            # 1. In-sample: todas as combinações de todos os folds de uma vez (uma só combinação dispensa a etapa)
+            best = {fold.index: (self.combos[0], None) for fold in folds}
+            if len(self.combos) > 1:
+                tasks = [self._task(params, fold.train_start, fold.train_end) for fold in folds for params in self.combos]
+                results = iter(self._run_all(pool, tasks, source_hash))
+                for fold in folds:
+                    scored = [(next(results)[self.metric], i) for i in range(len(self.combos))]
+                    score, i = max(scored, key=lambda item: (item[0], -item[1]))
+                    best[fold.index] = (self.combos[i], score)
+                    logger.info(f"WalkForward: Fold {fold.index} best {self.combos[i]} ({self.metric}={score:.4f})")
+
+            # 2. Out-of-sample com a melhor combinação de cada fold
+            tasks = [self._task(best[fold.index][0], fold.test_start, fold.test_end) for fold in folds]
+            oos = self._run_all(pool, tasks, source_hash)
+
+        logger.info(f"WalkForward: {self.computed} backtests computed, {self.cached} from cache")
+        return pd.DataFrame([{
+            'fold': fold.index,
+            'train': f"{pd.to_datetime(fold.train_start, unit='ms'):%Y-%m-%d} - {pd.to_datetime(fold.train_end, unit='ms'):%Y-%m-%d}",
+            'test': f"{pd.to_datetime(fold.test_start, unit='ms'):%Y-%m-%d} - {pd.to_datetime(fold.test_end, unit='ms'):%Y-%m-%d}",
+            'params': best[fold.index][0],
+            f'is_{self.metric}': best[fold.index][1],
+            'oos_return_pct': result['return_pct'],
+            'oos_max_drawdown_pct': result['max_drawdown_pct'],
+            'oos_trades': result['trades'],
+        } for fold, result in zip(folds, oos)]).set_index('fold')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Walk-forward com otimização por fold e cache de resultados')
+    parser.add_argument('--strategy', required=True)
+    parser.add_argument('--pairs', nargs='+', required=True, help='Lista de pares (ex: BTCUSDT ETHUSDT)')
+    parser.add_argument('--timeframe', required=True)
+    parser.add_argument('--category', default='linear')
+    parser.add_argument('--start', required=True, help='Data inicial (UTC), ex: 2023-01-01')
+    parser.add_argument('--end', required=True, help='Data final (UTC), ex: 2024-01-01')
+    parser.add_argument('--train-days', type=float, required=True, help='Tamanho do in-sample de cada fold')
+    parser.add_argument('--test-days', type=float, required=True, help='Tamanho do out-of-sample de cada fold')
+    parser.add_argument('--step-days', type=float, help='Avanço entre folds (padrão: --test-days)')
+    parser.add_argument('--param', action='append', default=[], metavar='NOME=V1,V2',
+                        help='Override a otimizar e seus valores (repita para cada parâmetro)')
+    parser.add_argument('--metric', default='return_pct', choices=METRICS, help='Métrica maximizada no in-sample')
+    parser.add_argument('--jobs', type=int, help='Processos em paralelo (padrão: número de CPUs)')
+    parser.add_argument('--balance', type=float, default=BacktestConfig.initial_balance)
+    parser.add_argument('--fee', type=float, default=BacktestConfig.fee_rate)
+    parser.add_argument('--cache-dir', default=str(DEFAULT_CACHE_DIR))
+    parser.add_argument('--refresh', action='store_true', help='Baixa da API os candles (e séries auxiliares) que faltam')
+    parser.add_argument('--testnet', action=argparse.BooleanOptionalAction, default=False)
+    args = parser.parse_args()
+
+    try:
+        grid = dict(parse_param(text) for text in args.param)
+    except ValueError as e:
+        parser.error(str(e))
+    start, end = _to_ms(args.start), _to_ms(args.end)
+    folds = make_folds(start, end, int(args.train_days * DAY_MS), int(args.test_days * DAY_MS),
+                       int(args.step_days * DAY_MS) if args.step_days else None)
+    if not folds:
+        parser.error('Período curto demais para um fold de treino + teste')
+    config = BacktestConfig(initial_balance=args.balance, fee_rate=args.fee)
+
+    if args.refresh:
+        from src.connector.bybit_connector import BybitConnector
+        connector = BybitConnector(testnet=args.testnet)
+        store = CandleStore()
+        warmup = config.warmup_bars * interval_to_ms(args.timeframe)
+        backtester = PortfolioBacktester(args.strategy, sorted(set(args.pairs)), args.category, args.timeframe, store, config)
+        for symbol in backtester.symbols:
+            store.refresh(connector, args.category, symbol, args.timeframe, start - warmup, end)
+        backtester.refresh_aux(connector, start - warmup, end)
+
+    walk_forward = WalkForward(args.strategy, args.pairs, args.category, args.timeframe, grid, config=config,
+                               metric=args.metric, jobs=args.jobs, cache_dir=args.cache_dir)
+    report = walk_forward.run(folds)
+
+    print(report.to_string(float_format=lambda v: f"{v:.4f}"))
+    print()
+    compounded = ((1 + report['oos_return_pct'] / 100).prod() - 1) * 100
+    print(f"Folds: {len(report)} | Retorno OOS composto: {compounded:.4f}% | "
+          f"Folds OOS positivos: {(report['oos_return_pct'] > 0).sum()}/{len(report)}")
+    print(f"Backtests: {walk_forward.computed} calculados, {walk_forward.cached} do cache")
+
+
+if __name__ == "__main__":
+    main()
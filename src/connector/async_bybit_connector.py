@@ -0,0 +1,454 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import aiohttp
+from yarl import URL
+from pybit import _helpers
+from src.utils.logger import logger
+from src.connector.resilience import (
+    ResilienceConfig, CircuitBreaker, CircuitOpenError, ResilientCall, IDEMPOTENT_METHODS,
+    RETRYABLE_RET_CODES, DUPLICATE_ORDER_LINK_ID, new_order_link_id
+)
+from src.connector.responses import (
+    KLINE_PAGE_LIMIT, merge_candle_pages, parse_candles, parse_open_position, precheck_leverage, leverage_already_set,
+    leverage_params, validate_order_qty, build_order_params, balance_request_params, parse_balance,
+    batch_chunks, parse_batch_results, build_batch_order_request, stringify_numbers
+)
+
+try:
+    import orjson
+
+    def _loads(data):
+        return orjson.loads(data)
+
+    def _dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:  # orjson é opcional; cai para o json da biblioteca padrão
+    def _loads(data):
+        return json.loads(data)
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+MAINNET_URL = "https://api.bybit.com"
+TESTNET_URL = "https://api-testnet.bybit.com"
+
+# Endpoint -> nome do método equivalente no pybit (usado para prazos e idempotência)
+PATH_METHODS = {
+    '/v5/market/kline': 'get_kline',
+    '/v5/market/tickers': 'get_tickers',
+    '/v5/position/list': 'get_positions',
+    '/v5/account/wallet-balance': 'get_wallet_balance',
+    '/v5/order/realtime': 'get_open_orders',
+    '/v5/order/history': 'get_order_history',
+    '/v5/position/set-leverage': 'set_leverage',
+    '/v5/order/create': 'place_order',
+    '/v5/order/create-batch': 'place_batch_order',
+    '/v5/order/amend-batch': 'amend_batch_order',
+    '/v5/order/cancel-batch': 'cancel_batch_order',
+}
+BATCH_PATHS = {name: path for path, name in PATH_METHODS.items() if name.endswith('_batch_order')}
+
+
+class _RetryableResponse(Exception):
+    """Resposta com retCode transitório; tratada como falha para fins de retentativa."""
+
+    def __init__(self, response):
+        self.response = response
+        super().__init__(f"retCode={response.get('retCode')} {response.get('retMsg')}")
+
+
+def _is_retryable(error) -> bool:
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status == 429
+    return isinstance(error, (_RetryableResponse, aiohttp.ClientConnectionError, asyncio.TimeoutError, ConnectionError))
+
+
+class AsyncBybitConnector:
+    """
+    Conector asyncio para a API v5 da Bybit, com a mesma interface do BybitConnector
+    (os métodos são corrotinas). Mantém um pool persistente de conexões keep-alive,
+    cache de DNS e assina as requisições no mesmo formato do pybit.
+
+    Uso:
+        async with AsyncBybitConnector(testnet=True) as connector:
+            df = await connector.get_historical_candles('linear', 'BTCUSDT', '15')
+    """
+
+    def __init__(self, testnet=True, api_key=None, api_secret=None, base_url=None,
+                 timeout=10.0, pool_size=100, recv_window=5000, dns_ttl=300, keepalive_timeout=30.0,
+                 resilience=None):
+        """
+        Args:
+            testnet (bool): Usa credenciais e endpoint da testnet
+            api_key/api_secret (str, optional): Credenciais explícitas; padrão lido do ambiente
+            base_url (str, optional): Sobrescreve o endpoint (ex: servidor local de testes)
+            timeout (float): Timeout total de cada requisição em segundos
+            pool_size (int): Máximo de conexões simultâneas no pool
+            recv_window (int): Janela de validade da assinatura em ms
+            dns_ttl (int): Tempo em segundos que a resolução de DNS fica em cache
+            keepalive_timeout (float): Tempo que uma conexão ociosa permanece aberta
+            resilience (dict | False, optional): Retentativas, prazos, circuit breaker e hedge
+                (ver ResilienceConfig); False desativa
+        """
+        self.testnet = testnet
+        if api_key is None or api_secret is None:
+            if self.testnet:
+                api_key_name = "TESTNET_API_KEY"
+                api_secret_name = "TESTNET_API_SECRET"
+                logger.info("Connector: Using TESTNET credentials.")
+            else:
+                api_key_name = "BYBIT_API_KEY"
+                api_secret_name = "BYBIT_API_SECRET"
+                logger.info("Connector: Using MAINNET credentials.")
+            api_key = os.getenv(api_key_name)
+            api_secret = os.getenv(api_secret_name)
+            if not api_key or not api_secret:
+                raise ValueError(f"{api_key_name} and {api_secret_name} must be set in environment or .env file")
+
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.base_url = (base_url or (TESTNET_URL if testnet else MAINNET_URL)).rstrip('/')
+        self.recv_window = recv_window
+        self.pool_size = pool_size
+        self.dns_ttl = dns_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.resilience = ResilienceConfig.from_dict(resilience)
+        self._breakers = {}
+        self._http = None
+
+    async def start(self):
+        """Abre o pool de conexões (chamado automaticamente na primeira requisição)."""
+        if self._http is None or self._http.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                ttl_dns_cache=self.dns_ttl,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+            )
+            logger.info(f"Async Bybit Connector initialized. Testnet: {self.testnet} Pool: {self.pool_size}")
+        return self
+
+    async def close(self):
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    def _headers(self, payload):
+        """Cabeçalhos de autenticação no mesmo formato do pybit (HMAC-SHA256)."""
+        timestamp = _helpers.generate_timestamp()
+        param_str = f"{timestamp}{self.api_key}{self.recv_window}{payload}"
+        signature = hmac.new(self.api_secret.encode('utf-8'), param_str.encode('utf-8'), hashlib.sha256).hexdigest()
+        return {
+            "Content-Type": "application/json",
+            "X-BAPI-API-KEY": self.api_key,
+            "X-BAPI-SIGN": signature,
+            "X-BAPI-SIGN-TYPE": "2",
+            "X-BAPI-TIMESTAMP": str(timestamp),
+            "X-BAPI-RECV-WINDOW": str(self.recv_window),
+        }
+
+    async def _request(self, method, path, params, auth=True):
+        """
+        Executa a requisição com retentativas (backoff exponencial com jitter), prazo total
+        por endpoint, circuit breaker e hedge opcional para leituras idempotentes.
+        """
+        config = self.resilience
+        if not config.enabled:
+            return await self._send(method, path, params, auth)
+
+        name = PATH_METHODS.get(path, path)
+        breaker = self._breakers.setdefault(path, CircuitBreaker(config.failure_threshold, config.reset_timeout))
+        idempotent = name in IDEMPOTENT_METHODS
+        retry_safe = idempotent or name == 'set_leverage' or (name == 'place_order' and 'orderLinkId' in params)
+        loop = asyncio.get_running_loop()
+        call = ResilientCall(name, breaker, config, retry_safe, clock=loop.time)
+        if not call.admit():
+            raise CircuitOpenError(f"Circuit open for {name}; retrying in up to {config.reset_timeout}s")
+
+        try:
+            while True:
+                try:
+                    remaining = call.deadline - loop.time()
+                    if idempotent and config.hedge_after is not None:
+                        request = self._hedged(method, path, params, auth)
+                    else:
+                        request = self._send(method, path, params, auth)
+                    response = await asyncio.wait_for(request, timeout=remaining)
+                    if response.get('retCode') in RETRYABLE_RET_CODES:
+                        raise _RetryableResponse(response)
+                    if name == 'place_order' and call.attempt > 0 and response.get('retCode') == DUPLICATE_ORDER_LINK_ID:
+                        response = await self._recover_order(params)
+                    call.succeeded()
+                    return response
+                except Exception as e:
+                    if not _is_retryable(e):
+                        if isinstance(e, aiohttp.ClientResponseError):
+                            # A Bybit respondeu: erro HTTP definitivo não é falha transitória do endpoint
+                            call.succeeded()
+                        raise
+                    delay = call.retry_delay(e)
+                    if delay is None:
+                        if isinstance(e, _RetryableResponse):
+                            return e.response
+                        raise
+                    await asyncio.sleep(delay)
+        finally:
+            call.release()
+
+    async def _hedged(self, method, path, params, auth):
+        """Se a leitura não responder em `hedge_after`, dispara uma cópia e usa a primeira resposta."""
+        primary = asyncio.ensure_future(self._send(method, path, params, auth))
+        pending = {primary}
+        error = None
+        # Tudo dentro do try: se quem chamou for cancelado, nenhuma requisição fica órfã
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.resilience.hedge_after)
+            if done:
+                return primary.result()
+
+            pending.add(asyncio.ensure_future(self._send(method, path, params, auth)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _recover_order(self, params):
+        """A tentativa anterior foi aceita: busca a ordem original pelo orderLinkId."""
+        logger.warning(f"Connector: Order {params['orderLinkId']} already accepted by a previous attempt. Recovering it.")
+        response = await self._send("GET", "/v5/order/realtime", {
+            'category': params['category'], 'symbol': params['symbol'], 'orderLinkId': params['orderLinkId']
+        }, True)
+        orders = response.get('result', {}).get('list', []) if response.get('retCode') == 0 else []
+        order = orders[0] if orders else {}
+        return {'retCode': 0, 'retMsg': 'OK',
+                'result': {'orderId': order.get('orderId'), 'orderLinkId': params['orderLinkId']}}
+
+    async def _send(self, method, path, params, auth):
+        """Uma única requisição HTTP; devolve o JSON decodificado (dict com retCode/result)."""
+        if self._http is None:
+            await self.start()
+        params = {k: v for k, v in params.items() if v is not None}
+
+        if method == "GET":
+            # A query assinada precisa ser idêntica à enviada: ordenada e sem reencode
+            payload = "&".join(f"{k}={v}" for k, v in sorted(params.items()))
+            headers = self._headers(payload) if auth else None
+            url = URL(f"{self.base_url}{path}?{payload}" if payload else f"{self.base_url}{path}", encoded=True)
+            async with self._http.get(url, headers=headers) as response:
+                response.raise_for_status()
+                return _loads(await response.read())
+
+        payload = _dumps(params)
+        headers = self._headers(payload) if auth else {"Content-Type": "application/json"}
+        async with self._http.post(f"{self.base_url}{path}", data=payload, headers=headers) as response:
+            response.raise_for_status()
+            return _loads(await response.read())
+
+    async def get_historical_candles(self, category, symbol, interval, limit=200):
+        """Busca os `limit` candles mais recentes, paginando de 1000 em 1000 quando necessário.
+           Retorna um DataFrame com os candles formatados ou None em caso de erro.
+        """
+        pages = []
+        params = {'category': category, 'symbol': symbol, 'interval': interval}
+        try:
+            while limit > 0:
+                page_limit = min(limit, KLINE_PAGE_LIMIT)
+                response = await self._request("GET", "/v5/market/kline", {**params, 'limit': page_limit}, auth=False)
+                df = parse_candles(response)
+                if df is None:
+                    if not pages:
+                        return None
+                    break
+                pages.append(df)
+                limit -= len(df)
+                if len(df) < page_limit:
+                    break
+                params['end'] = int(df['timestamp'].iloc[0]) - 1
+        except Exception as e:
+            logger.error(f"Connector Exception (get_kline): {e!r}")
+            return None
+        return merge_candle_pages(pages)
+
+    async def get_tickers(self, category):
+        """Snapshot de tickers de todos os símbolos da categoria. Retorna lista ou None."""
+        try:
+            response = await self._request("GET", "/v5/market/tickers", {'category': category}, auth=False)
+            if response['retCode'] != 0:
+                logger.error(f"Connector Error (get_tickers): Code={response['retCode']} Msg={response['retMsg']}")
+                return None
+            return response['result'].get('list', [])
+        except Exception as e:
+            logger.error(f"Connector Exception (get_tickers): {e!r}")
+            return None
+
+    async def get_open_position(self, category, symbol):
+        """Busca posição aberta para um símbolo. Retorna dict ou None."""
+        try:
+            response = await self._request("GET", "/v5/position/list", {'category': category, 'symbol': symbol})
+            return parse_open_position(response)
+        except Exception as e:
+            logger.error(f"Connector Error: Exception while getting position - {e!r}")
+            return None
+
+    async def set_leverage(self, category, symbol, leverage, margin_type="Cross"):
+        """Define a alavancagem para um símbolo. Retorna True se bem sucedido."""
+        try:
+            leverage = int(leverage)
+            decided = precheck_leverage(category, symbol, leverage)
+            if decided is not None:
+                return decided
+
+            # Verificar a alavancagem atual
+            try:
+                position_info = await self._request("GET", "/v5/position/list", {'category': category, 'symbol': symbol})
+                if leverage_already_set(position_info, symbol, leverage, margin_type):
+                    return True
+            except Exception as e:
+                logger.warning(f"Connector: Could not check current leverage - {e!r}")
+
+            logger.info(f"Connector: Setting leverage for {symbol} to {leverage}x ({margin_type})")
+            response = await self._request(
+                "POST", "/v5/position/set-leverage", leverage_params(category, symbol, leverage, margin_type)
+            )
+            if response['retCode'] == 0:
+                logger.info(f"Connector: Leverage set successfully for {symbol}")
+                return True
+            logger.error(f"Connector Error: Failed to set leverage - {response['retMsg']}")
+            return False
+        except Exception as e:
+            logger.error(f"Connector Error: Exception while setting leverage - {e!r}")
+            return False
+
+    async def place_order(self, category, symbol, side, order_type, qty, stop_loss=None, take_profit=None, reduce_only=False, leverage=None, **kwargs):
+        """Coloca uma ordem na Bybit. Retorna o resultado da ordem ou None se falhar."""
+        try:
+            qty = float(qty)
+            if not validate_order_qty(symbol, qty):
+                return None
+            if leverage is not None and category != "spot":
+                await self.set_leverage(category, symbol, leverage)
+
+            # ID do cliente: permite repetir a ordem sem risco de execução dupla
+            kwargs.setdefault('orderLinkId', new_order_link_id())
+            order_params = build_order_params(
+                category, symbol, side, order_type, qty,
+                stop_loss=stop_loss, take_profit=take_profit, reduce_only=reduce_only, **kwargs
+            )
+            logger.info(f"Connector: Placing order with params: {order_params}")
+            response = await self._request("POST", "/v5/order/create", order_params)
+            if response['retCode'] == 0:
+                logger.info(f"Connector: Order placed successfully - {response['result']}")
+                return response['result']
+            logger.error(f"Connector Error: Failed to place order - {response['retMsg']}")
+            return None
+        except Exception as e:
+            logger.error(f"Connector Error: Exception while placing order - {e!r}")
+            return None
+
+    async def get_order(self, category, symbol, order_link_id):
+        """Consulta uma ordem pelo orderLinkId. Retorna o dict da ordem ou None."""
+        try:
+            query = {'category': category, 'symbol': symbol, 'orderLinkId': order_link_id}
+            for path in ('/v5/order/realtime', '/v5/order/history'):
+                response = await self._request("GET", path, query)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error ({path}): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                orders = response['result'].get('list', [])
+                if orders:
+                    return orders[0]
+            logger.warning(f"Connector: Order {order_link_id} not found")
+            return None
+        except Exception as e:
+            logger.error(f"Connector Error: Exception while getting order - {e!r}")
+            return None
+
+    async def _send_batch(self, action, category, requests):
+        """Envia os pedidos em lotes do tamanho aceito pela categoria. Retorna [(resultado, erro)] na ordem."""
+        outcomes = []
+        for chunk in batch_chunks(category, requests):
+            try:
+                response = await self._request("POST", BATCH_PATHS[action], {'category': category, 'request': chunk})
+                outcomes.extend(parse_batch_results(response, len(chunk), action))
+            except Exception as e:
+                logger.error(f"Connector Error: Exception in {action} - {e!r}")
+                outcomes.extend([(None, repr(e))] * len(chunk))
+        for request, (result, error) in zip(requests, outcomes):
+            if result is None:
+                logger.error(f"Connector Error ({action}): {request.get('symbol')} "
+                             f"{request.get('orderLinkId') or request.get('orderId')} - {error}")
+        return outcomes
+
+    async def place_batch_order(self, category, orders):
+        """Cria várias ordens da mesma categoria (create-batch). Ver `BybitConnector.place_batch_order`."""
+        results = [None] * len(orders)
+        requests, indexes = [], []
+        leverages = {}
+        for index, order in enumerate(orders):
+            order = dict(order)
+            leverage = order.pop('leverage', None)
+            if not validate_order_qty(order['symbol'], float(order['qty'])):
+                continue
+            if leverage is not None and category != "spot":
+                leverages[order['symbol']] = leverage
+            order.setdefault('orderLinkId', new_order_link_id())
+            requests.append(build_batch_order_request(category, order))
+            indexes.append(index)
+
+        # Alavancagem é por símbolo e não faz parte do lote: define em paralelo antes do envio
+        await asyncio.gather(*(self.set_leverage(category, symbol, leverage) for symbol, leverage in leverages.items()))
+        if requests:
+            logger.info(f"Connector: Placing batch of {len(requests)} {category} orders")
+            for index, (result, _) in zip(indexes, await self._send_batch('place_batch_order', category, requests)):
+                results[index] = result
+        return results
+
+    async def amend_batch_order(self, category, amends):
+        """Altera várias ordens abertas (amend-batch). Retorna um resultado (ou None) por item."""
+        requests = [stringify_numbers(amend) for amend in amends]
+        return [result for result, _ in await self._send_batch('amend_batch_order', category, requests)]
+
+    async def cancel_batch_order(self, category, cancels):
+        """Cancela várias ordens (cancel-batch). Retorna um resultado (ou None) por item."""
+        return [result for result, _ in await self._send_batch('cancel_batch_order', category, list(cancels))]
+
+    async def get_balance(self, account_type="UNIFIED", coin="USDT"):
+        """Consulta o saldo de uma moeda específica na conta. Retorna dict ou None."""
+        try:
+            response = await self._request("GET", "/v5/account/wallet-balance", balance_request_params(account_type, coin))
+            return parse_balance(response, account_type, coin)
+        except Exception as e:
+            logger.error(f"Connector Exception (get_wallet_balance): {e!r}")
+            return None
+
+    async def gather(self, *calls, limit=None):
+        """
+        Executa várias corrotinas do conector em paralelo, limitando a concorrência.
+        Retorna os resultados na mesma ordem.
+        """
+        semaphore = asyncio.Semaphore(limit or self.pool_size)
+
+        async def bounded(call):
+            async with semaphore:
+                return await call
+
+        return await asyncio.gather(*(bounded(call) for call in calls))
@@ -1,14 +1,46 @@
 import os
+import logging
 import sys 
 from dotenv import load_dotenv
-from pybit.unified_trading import HTTP
+from pybit.unified_trading import HTTP, WebSocket
 import pandas as pd 
-from src.utils.logger import logger
+from src.utils.logger import logger, REQUEST_LOGGING
+from src.connector.cassette import RecordingSession, ReplaySession
+from src.connector.resilience import ResilienceConfig, ResilientSession, new_order_link_id
+from src.connector.responses import (
+    CANDLE_COLUMNS, KLINE_PAGE_LIMIT, candles_to_dataframe, merge_candle_pages, parse_candles, parse_open_position,
+    precheck_leverage, leverage_already_set, leverage_params, validate_order_qty,
+    build_order_params, balance_request_params, parse_balance, batch_chunks, parse_batch_results,
+    build_batch_order_request, stringify_numbers, AUX_PAGE_LIMIT, series_frame, price_kline_rows, funding_rows,
+    open_interest_rows
+)
+
 
 class BybitConnector:
-    def __init__(self, testnet=True):
+    def __init__(self, testnet=True, session=None, record_path=None, resilience=None, api_key=None, api_secret=None,
+                 account=None):
+        """
+        Args:
+            testnet (bool): Usa credenciais e endpoint da testnet
+            session: Sessão HTTP já pronta (ex: ReplaySession); dispensa credenciais
+            record_path (str, optional): Grava todas as chamadas/respostas neste arquivo
+            resilience (dict | False, optional): Configuração de retentativas, prazos, circuit
+                breaker e hedge (ver ResilienceConfig); False desativa. Não se aplica a `session`.
+            api_key, api_secret (str, optional): Credenciais explícitas (ex: subcontas); sem elas,
+                usa as variáveis de ambiente da testnet/mainnet
+            account (str, optional): Nome da conta nos logs
+        """
         self.testnet = testnet
-        if self.testnet:
+        self.account = account
+        if session is not None:
+            self.session = session
+            logger.info(f"Bybit Connector initialized with {type(session).__name__}.")
+            return
+
+        if api_key and api_secret:
+            api_key_name = api_secret_name = None
+            logger.info(f"Connector: Using explicit credentials for account '{account}'.")
+        elif self.testnet:
             api_key_name = "TESTNET_API_KEY"
             api_secret_name = "TESTNET_API_SECRET"
             logger.info("Connector: Using TESTNET credentials.")
@@ -17,58 +49,239 @@ class BybitConnector:
             api_secret_name = "BYBIT_API_SECRET"
             logger.info("Connector: Using MAINNET credentials.")
 
-        api_key = os.getenv(api_key_name)
-        api_secret = os.getenv(api_secret_name)
+        if api_key_name:
+            api_key = os.getenv(api_key_name)
+            api_secret = os.getenv(api_secret_name)
 
         if not api_key or not api_secret:
             error_msg = f"{api_key_name} and {api_secret_name} must be set in environment or .env file"
             raise ValueError(error_msg)
 
+        self._api_key = api_key
+        self._api_secret = api_secret
         self.session = HTTP(
             testnet=self.testnet,
             api_key=api_key,
             api_secret=api_secret,
-            log_requests=True # Habilitar log detalhado da API
+            # Log detalhado da API só em DEBUG (ver REQUEST_LOGGING)
+            log_requests=REQUEST_LOGGING,
+            logging_level=logging.DEBUG if REQUEST_LOGGING else logging.INFO,
         )
-        logger.info(f"Bybit Connector initialized. Testnet: {self.testnet}")
+        http = self.session
+        if record_path:
+            self.session = RecordingSession(self.session, record_path)
+        resilience = ResilienceConfig.from_dict(resilience)
+        if resilience.enabled:
+            self.session = ResilientSession(self.session, resilience)
+            # Uma só camada de retentativas, com o timeout HTTP limitado pelo prazo do endpoint
+            self.session.bind_transport(http)
+        logger.info(f"Bybit Connector initialized. Testnet: {self.testnet}" + (f" Account: {account}" if account else ""))
 
     def get_historical_candles(self, category, symbol, interval, limit=200):
-        """Busca candles históricos.
+        """Busca os `limit` candles mais recentes, paginando de 1000 em 1000 quando necessário.
            Retorna um DataFrame com os candles formatados ou None em caso de erro.
         """
+        pages = []
+        end = None
         try:
-            response = self.session.get_kline(
-                category=category,
-                symbol=symbol,
-                interval=interval,
-                limit=limit
-            )
-            if response['retCode'] == 0:
+            while limit > 0:
+                page_limit = min(limit, KLINE_PAGE_LIMIT)
+                params = {'end': end} if end is not None else {}
+                response = self.session.get_kline(
+                    category=category,
+                    symbol=symbol,
+                    interval=interval,
+                    limit=page_limit,
+                    **params
+                )
+                df = parse_candles(response)
+                if df is None:
+                    # Sem página anterior: erro ou símbolo sem candles. Depois dela: início do histórico
+                    if not pages:
+                        return None
+                    break
+                pages.append(df)
+                limit -= len(df)
+                if len(df) < page_limit:
+                    break
+                end = int(df['timestamp'].iloc[0]) - 1
+        except Exception as e:
+            logger.error(f"Connector Exception (get_kline): {e}")
+            return None
+        return merge_candle_pages(pages)
+
+    def get_candles_range(self, category, symbol, interval, start, end):
+        """
+        Busca todos os candles entre `start` e `end` (timestamps em ms), paginando
+        de 1000 em 1000 do mais recente para o mais antigo.
+        Retorna um DataFrame crescente (vazio se não houver dados) ou None em caso de erro.
+        """
+        pages = []
+        cursor_end = int(end)
+        try:
+            while cursor_end >= start:
+                response = self.session.get_kline(
+                    category=category,
+                    symbol=symbol,
+                    interval=interval,
+                    start=int(start),
+                    end=cursor_end,
+                    limit=KLINE_PAGE_LIMIT
+                )
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error (get_kline range): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
                 candles = response['result']['list']
                 if not candles:
+                    break
+                pages.append(candles_to_dataframe(candles))
+                oldest = int(candles[-1][0])
+                if len(candles) < KLINE_PAGE_LIMIT:
+                    break
+                cursor_end = oldest - 1
+        except Exception as e:
+            logger.error(f"Connector Exception (get_kline range): {e}")
+            return None
+
+        if not pages:
+            return pd.DataFrame(columns=CANDLE_COLUMNS).astype({'timestamp': 'int64'})
+        return merge_candle_pages(pages)
+
+    def get_price_series_range(self, kind, category, symbol, interval, start, end):
+        """
+        Fechamento das klines de mark price (`kind='mark_price'`) ou index price
+        (`kind='index_price'`) entre `start` e `end` (ms), paginando como `get_candles_range`.
+        Retorna DataFrame (timestamp, kind) crescente ou None em caso de erro.
+        """
+        fetch = self.session.get_mark_price_kline if kind == 'mark_price' else self.session.get_index_price_kline
+        rows = []
+        cursor_end = int(end)
+        try:
+            while cursor_end >= start:
+                response = fetch(category=category, symbol=symbol, interval=interval,
+                                 start=int(start), end=cursor_end, limit=KLINE_PAGE_LIMIT)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error ({kind} kline): Code={response['retCode']} Msg={response['retMsg']}")
                     return None
-                    
-                # Inverte a ordem dos candles e converte para DataFrame
-                candles = candles[::-1]
-                df = pd.DataFrame(candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume', 'turnover'])
-                
-                # Converte os tipos das colunas
-                df = df.astype({
-                    'timestamp': 'int64',
-                    'open': 'float64',
-                    'high': 'float64',
-                    'low': 'float64',
-                    'close': 'float64',
-                    'volume': 'float64',
-                    'turnover': 'float64'
-                })
-                
-                return df
-            else:
-                logger.error(f"Connector Error (get_kline): Code={response['retCode']} Msg={response['retMsg']}")
+                klines = response['result']['list']
+                if not klines:
+                    break
+                rows.extend(price_kline_rows(klines))
+                if len(klines) < KLINE_PAGE_LIMIT:
+                    break
+                cursor_end = int(klines[-1][0]) - 1
+        except Exception as e:
+            logger.error(f"Connector Exception ({kind} kline): {e}")
+            return None
+        return series_frame(rows, kind)
+
+    def get_funding_history_range(self, category, symbol, start, end):
+        """
+        Taxas de funding liquidadas entre `start` e `end` (ms), paginando do mais recente
+        para o mais antigo. Retorna DataFrame (timestamp, funding_rate) ou None em caso de erro.
+        """
+        rows = []
+        cursor_end = int(end)
+        try:
+            while cursor_end >= start:
+                response = self.session.get_funding_rate_history(
+                    category=category, symbol=symbol, startTime=int(start), endTime=cursor_end, limit=AUX_PAGE_LIMIT
+                )
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error (funding history): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                items = response['result']['list']
+                if not items:
+                    break
+                rows.extend(funding_rows(items))
+                if len(items) < AUX_PAGE_LIMIT:
+                    break
+                cursor_end = int(items[-1]['fundingRateTimestamp']) - 1
+        except Exception as e:
+            logger.error(f"Connector Exception (funding history): {e}")
+            return None
+        return series_frame(rows, 'funding_rate')
+
+    def get_open_interest_range(self, category, symbol, interval_time, start, end):
+        """
+        Open interest entre `start` e `end` (ms) na granularidade `interval_time`
+        (5min, 15min, 30min, 1h, 4h, 1d), seguindo o cursor da API.
+        Retorna DataFrame (timestamp, open_interest) ou None em caso de erro.
+        """
+        rows = []
+        params = {'category': category, 'symbol': symbol, 'intervalTime': interval_time,
+                  'startTime': int(start), 'endTime': int(end), 'limit': AUX_PAGE_LIMIT}
+        try:
+            while True:
+                response = self.session.get_open_interest(**params)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error (open interest): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                result = response['result']
+                rows.extend(open_interest_rows(result['list']))
+                cursor = result.get('nextPageCursor')
+                if not cursor or len(result['list']) < AUX_PAGE_LIMIT:
+                    break
+                params['cursor'] = cursor
+        except Exception as e:
+            logger.error(f"Connector Exception (open interest): {e}")
+            return None
+        return series_frame(rows, 'open_interest')
+
+    def get_instruments(self, category, quote_coin=None):
+        """
+        Lista os instrumentos negociáveis de uma categoria (paginado).
+        Retorna lista de dicts da API ou None em caso de erro.
+        """
+        instruments = []
+        cursor = None
+        try:
+            while True:
+                params = {'category': category, 'limit': 1000}
+                if cursor:
+                    params['cursor'] = cursor
+                response = self.session.get_instruments_info(**params)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error (get_instruments_info): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                instruments.extend(response['result'].get('list', []))
+                cursor = response['result'].get('nextPageCursor')
+                if not cursor:
+                    break
+        except Exception as e:
+            logger.error(f"Connector Exception (get_instruments_info): {e}")
+            return None
+
+        instruments = [i for i in instruments if i.get('status') == 'Trading']
+        if quote_coin:
+            instruments = [i for i in instruments if i.get('quoteCoin') == quote_coin]
+        return instruments
+
+    def get_server_time(self):
+        """Horário do servidor da Bybit em ms, ou None em caso de erro."""
+        try:
+            response = self.session.get_server_time()
+            if response['retCode'] != 0:
+                logger.error(f"Connector Error (get_server_time): Code={response['retCode']} Msg={response['retMsg']}")
                 return None
+            return int(response['result']['timeNano']) / 1_000_000
         except Exception as e:
-            logger.error(f"Connector Exception (get_kline): {e}")
+            logger.error(f"Connector Exception (get_server_time): {e}")
+            return None
+
+    def get_tickers(self, category):
+        """
+        Snapshot de tickers de todos os símbolos da categoria em uma única chamada.
+        Retorna lista de dicts da API ou None em caso de erro.
+        """
+        try:
+            response = self.session.get_tickers(category=category)
+            if response['retCode'] != 0:
+                logger.error(f"Connector Error (get_tickers): Code={response['retCode']} Msg={response['retMsg']}")
+                return None
+            return response['result'].get('list', [])
+        except Exception as e:
+            logger.error(f"Connector Exception (get_tickers): {e}")
             return None
 
     def get_open_position(self, category, symbol):
@@ -89,27 +302,39 @@ class BybitConnector:
                 symbol=symbol
             )
             
-            if response['retCode'] == 0:
-                positions = response['result'].get('list', [])
-                
-                # Filtrar posições com size > 0
-                open_positions = [p for p in positions if float(p.get('size', 0)) > 0]
-                
-                if open_positions:
-                    position = open_positions[0]  # Pegar a primeira posição aberta
-                    logger.info(f"Connector: Found open position - {position}")
-                    return position
-                else:
-                    logger.info("Connector: No open position found")
-                    return None
-            else:
-                logger.error(f"Connector Error: Failed to get position - {response['retMsg']}")
-                return None
-                
+            return parse_open_position(response)
+
         except Exception as e:
             logger.error(f"Connector Error: Exception while getting position - {e}")
             return None
 
+    def get_open_positions(self, category, settle_coin=None):
+        """
+        Todas as posições abertas (size > 0) da categoria em poucas chamadas (paginado),
+        filtradas pela moeda de liquidação. Retorna lista de dicts da API ou None em caso de erro.
+        """
+        positions = []
+        cursor = None
+        try:
+            while True:
+                params = {'category': category, 'limit': 200}
+                if settle_coin:
+                    params['settleCoin'] = settle_coin
+                if cursor:
+                    params['cursor'] = cursor
+                response = self.session.get_positions(**params)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error (get_positions): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                positions.extend(response['result'].get('list', []))
+                cursor = response['result'].get('nextPageCursor')
+                if not cursor:
+                    break
+        except Exception as e:
+            logger.error(f"Connector Exception (get_positions): {e}")
+            return None
+        return [p for p in positions if float(p.get('size') or 0) > 0]
+
     def set_leverage(self, category, symbol, leverage, margin_type="Cross"):
         """
         Define a alavancagem para um símbolo.
@@ -124,22 +349,11 @@ class BybitConnector:
             bool: True se bem sucedido, False caso contrário
         """
         try:
-            # Validar categoria
-            if category == "spot":
-                logger.warning("Connector: Leverage not applicable for spot trading")
-                return True
-                
-            # Validar alavancagem
             leverage = int(leverage)
-            if leverage < 1 or leverage > 125:
-                logger.error(f"Connector Error: Invalid leverage value {leverage}. Must be between 1 and 125.")
-                return False
-                
-            # Caso especial: alavancagem 1 não precisa ser definida explicitamente
-            if leverage == 1:
-                logger.info(f"Connector: Leverage 1x is the default, no need to set it explicitly for {symbol}")
-                return True
-                
+            decided = precheck_leverage(category, symbol, leverage)
+            if decided is not None:
+                return decided
+
             # Verificar a alavancagem atual
             try:
                 position_info = self.session.get_position_info(
@@ -147,27 +361,14 @@ class BybitConnector:
                     symbol=symbol
                 )
                 
-                if position_info['retCode'] == 0 and position_info['result']['list']:
-                    current_leverage = int(position_info['result']['list'][0]['leverage'])
-                    current_margin = position_info['result']['list'][0]['marginMode']
-                    
-                    # Se a alavancagem e o tipo de margem já estiverem corretos, não precisa alterar
-                    if current_leverage == leverage and current_margin == margin_type:
-                        logger.info(f"Connector: Leverage already set to {leverage}x ({margin_type}) for {symbol}")
-                        return True
+                if leverage_already_set(position_info, symbol, leverage, margin_type):
+                    return True
             except Exception as e:
                 logger.warning(f"Connector: Could not check current leverage - {e}")
                 # Continua mesmo se não conseguir verificar a alavancagem atual
                 
-            # Preparar parâmetros
-            params = {
-                'category': category,
-                'symbol': symbol,
-                'buyLeverage': str(leverage),
-                'sellLeverage': str(leverage),
-                'marginMode': margin_type
-            }
-            
+            params = leverage_params(category, symbol, leverage, margin_type)
+
             # Definir alavancagem
             logger.info(f"Connector: Setting leverage for {symbol} to {leverage}x ({margin_type})")
             response = self.session.set_leverage(**params)
@@ -205,43 +406,23 @@ class BybitConnector:
         try:
             # Validar quantidade mínima
             qty = float(qty)
-            if symbol == "BTCUSDT":
-                if qty < 0.001:
-                    logger.error(f"Connector Error: Minimum quantity for BTCUSDT is 0.001 BTC. Got: {qty}")
-                    return None
-            elif symbol.endswith("USDT"):
-                if qty < 0.01:
-                    logger.error(f"Connector Error: Minimum quantity for {symbol} is 0.01. Got: {qty}")
-                    return None
-            else:
-                if qty < 0.001:
-                    logger.error(f"Connector Error: Minimum quantity for {symbol} is 0.001. Got: {qty}")
-                    return None
+            if not validate_order_qty(symbol, qty):
+                return None
             # Configurar alavancagem se fornecida e não for spot
             if leverage is not None and category != "spot":
                 self.set_leverage(category, symbol, leverage)
             
+            # ID do cliente: permite repetir a ordem sem risco de execução dupla
+            kwargs.setdefault('orderLinkId', new_order_link_id())
+
             # Preparar parâmetros da ordem
-            order_params = {
-                'category': category,
-                'symbol': symbol,
-                'side': side,
-                'orderType': order_type,
-                'qty': str(qty),  # API requer string
-                'reduceOnly': reduce_only
-            }
-
-            # Adicionar stop loss e take profit se fornecidos
-            if stop_loss is not None:
-                order_params['stopLoss'] = str(stop_loss)
-            if take_profit is not None:
-                order_params['takeProfit'] = str(take_profit)
-            
-            # Adicionar parâmetros adicionais
-            order_params.update(kwargs)
-            
+            order_params = build_order_params(
+                category, symbol, side, order_type, qty,
+                stop_loss=stop_loss, take_profit=take_profit, reduce_only=reduce_only, **kwargs
+            )
+
             # Colocar a ordem
-            logger.info("Connector: Placing order with params: {order_params}")
+            logger.info(f"Connector: Placing order with params: {order_params}")
             response = self.session.place_order(**order_params)
             
             if response['retCode'] == 0:
@@ -255,60 +436,121 @@ class BybitConnector:
             logger.error(f"Connector Error: Exception while placing order - {e}")
             return None
 
-    def get_balance(self, account_type="UNIFIED", coin="USDT"):
-        """Consulta o saldo de uma moeda específica na conta.
-           Retorna dicionário com info do saldo ou None.
+    def get_order(self, category, symbol, order_link_id):
+        """
+        Consulta uma ordem pelo orderLinkId (abertas e, se não achar, o histórico recente).
+        Retorna o dict da ordem (orderStatus, cumExecQty, avgPrice...) ou None.
         """
         try:
-            # Para conta UNIFIED, não passamos a moeda na requisição inicial
-            # pois queremos o resumo da conta que contém a lista de moedas.
-            request_params = {"accountType": account_type}
-            if account_type != "UNIFIED":
-                # Para outros tipos de conta (ex: CONTRACT), a API pode aceitar 'coin'
-                request_params['coin'] = coin
+            query = {'category': category, 'symbol': symbol, 'orderLinkId': order_link_id}
+            for lookup in ('get_open_orders', 'get_order_history'):
+                response = getattr(self.session, lookup)(**query)
+                if response['retCode'] != 0:
+                    logger.error(f"Connector Error ({lookup}): Code={response['retCode']} Msg={response['retMsg']}")
+                    return None
+                orders = response['result'].get('list', [])
+                if orders:
+                    return orders[0]
+            logger.warning(f"Connector: Order {order_link_id} not found")
+            return None
+        except Exception as e:
+            logger.error(f"Connector Error: Exception while getting order - {e}")
+            return None
 
-            response = self.session.get_wallet_balance(**request_params)
+    def _send_batch(self, action, category, requests):
+        """Envia os pedidos em lotes do tamanho aceito pela categoria. Retorna [(resultado, erro)] na ordem."""
+        outcomes = []
+        for chunk in batch_chunks(category, requests):
+            try:
+                response = getattr(self.session, action)(category=category, request=chunk)
+                outcomes.extend(parse_batch_results(response, len(chunk), action))
+            except Exception as e:
+                logger.error(f"Connector Error: Exception in {action} - {e}")
+                outcomes.extend([(None, str(e))] * len(chunk))
+        for request, (result, error) in zip(requests, outcomes):
+            if result is None:
+                logger.error(f"Connector Error ({action}): {request.get('symbol')} "
+                             f"{request.get('orderLinkId') or request.get('orderId')} - {error}")
+        return outcomes
 
-            if response['retCode'] == 0:
-                balance_list = response['result']['list']
-                if not balance_list:
-                    logger.info(f"Connector: Empty balance list returned for account {account_type}.")
-                    return None
+    def place_batch_order(self, category, orders):
+        """
+        Cria várias ordens da mesma categoria com o mínimo de requisições (create-batch).
 
-                if account_type == "UNIFIED":
-                    # A lista deve conter um dicionário principal para a conta UNIFIED
-                    if len(balance_list) > 0:
-                        account_summary = balance_list[0]
-                        # Procurar a moeda específica dentro da lista 'coin' deste sumário
-                        coin_list = account_summary.get('coin', [])
-                        coin_info = next((c for c in coin_list if c.get('coin') == coin), None)
-                        if coin_info:
-                            logger.info(f"Connector: Found balance for {coin} in UNIFIED account.")
-                            return coin_info
-                        else:
-                            # Moeda não encontrada na lista, significa saldo zero ou nunca usada
-                            logger.info(f"Connector: Coin '{coin}' not found within UNIFIED account summary. Assuming zero balance.")
-                            # Retornar um dict com saldo zero para evitar erros no executor
-                            return {'coin': coin, 'walletBalance': '0', 'availableBalance': '0'}
-                    else:
-                        logger.error(f"Connector Error: Unexpected empty list for UNIFIED account summary.")
-                        return None
-                else:
-                    # Para outras contas (ex: CONTRACT), a API pode retornar a lista direta
-                    # ou filtrar se 'coin' foi passado na request.
-                    # Assumindo que a lista contém diretamente a info da moeda solicitada.
-                    balance_info = next((item for item in balance_list if item.get('coin') == coin), None)
-                    if balance_info:
-                        logger.info(f"Connector: Found balance for {coin} in {account_type} account.")
-                        return balance_info
-                    else:
-                        logger.error(f"Connector: Coin '{coin}' not found in {account_type} account response.")
-                        return None # Ou retornar saldo zero como em UNIFIED?
+        Args:
+            orders (list): Dicts com os mesmos argumentos de `place_order` (symbol, side,
+                order_type, qty, stop_loss, take_profit, reduce_only, leverage, orderLinkId...)
 
-            else:
-                logger.error(f"Connector Error (get_wallet_balance): Code={response['retCode']} Msg={response['retMsg']}")
-                return None
+        Returns:
+            list: Um item por ordem, na mesma ordem: o resultado (orderId, orderLinkId) ou
+                None se aquela ordem falhou. Falhas parciais não afetam as demais.
+        """
+        results = [None] * len(orders)
+        requests, indexes = [], []
+        leverage_set = set()
+        for index, order in enumerate(orders):
+            order = dict(order)
+            leverage = order.pop('leverage', None)
+            if not validate_order_qty(order['symbol'], float(order['qty'])):
+                continue
+            # Alavancagem é por símbolo e não faz parte do lote: define uma vez antes do envio
+            if leverage is not None and category != "spot" and (order['symbol'], leverage) not in leverage_set:
+                self.set_leverage(category, order['symbol'], leverage)
+                leverage_set.add((order['symbol'], leverage))
+            order.setdefault('orderLinkId', new_order_link_id())
+            requests.append(build_batch_order_request(category, order))
+            indexes.append(index)
+
+        if requests:
+            logger.info(f"Connector: Placing batch of {len(requests)} {category} orders")
+            for index, (result, _) in zip(indexes, self._send_batch('place_batch_order', category, requests)):
+                results[index] = result
+        return results
+
+    def amend_batch_order(self, category, amends):
+        """
+        Altera várias ordens abertas (amend-batch). Cada item tem `symbol`, `orderId` ou
+        `orderLinkId` e os campos a alterar (qty, price, stopLoss, takeProfit...).
+        Retorna um resultado (ou None) por item, na mesma ordem.
+        """
+        requests = [stringify_numbers(amend) for amend in amends]
+        return [result for result, _ in self._send_batch('amend_batch_order', category, requests)]
+
+    def cancel_batch_order(self, category, cancels):
+        """
+        Cancela várias ordens (cancel-batch). Cada item tem `symbol` e `orderId` ou `orderLinkId`.
+        Retorna um resultado (ou None) por item, na mesma ordem.
+        """
+        return [result for result, _ in self._send_batch('cancel_batch_order', category, list(cancels))]
+
+    def private_stream(self):
+        """Abre um WebSocket privado (ordens, execuções, posições) com as mesmas credenciais."""
+        if not getattr(self, '_api_key', None):
+            raise ValueError("Private stream requires API credentials")
+        return WebSocket(testnet=self.testnet, channel_type="private",
+                         api_key=self._api_key, api_secret=self._api_secret)
+
+    def get_balance(self, account_type="UNIFIED", coin="USDT"):
+        """Consulta o saldo de uma moeda específica na conta.
+           Retorna dicionário com info do saldo ou None.
+        """
+        try:
+            request_params = balance_request_params(account_type, coin)
+            response = self.session.get_wallet_balance(**request_params)
+            return parse_balance(response, account_type, coin)
         except Exception as e:
             logger.error(f"Connector Exception (get_wallet_balance): {e}")
             return None
 
+
+class ReplayConnector(BybitConnector):
+    """Conector offline que reproduz uma sessão gravada com `record_path`."""
+
+    def __init__(self, path, speed=0.0):
+        super().__init__(session=ReplaySession(path, speed=speed))
+
+    @property
+    def exhausted(self):
+        # Cada ciclo do executor começa buscando candles; sem eles a sessão acabou
+        return self.session.remaining_for('get_kline') == 0
+
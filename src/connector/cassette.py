@@ -0,0 +1,169 @@
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from src.utils.logger import logger
+
+
+class ReplayedError(Exception):
+    """Erro gravado durante a sessão original e reproduzido no replay."""
+
+    def __init__(self, error_type, message):
+        self.error_type = error_type
+        super().__init__(f"{error_type}: {message}")
+
+
+class CassetteExhausted(LookupError):
+    """Não há mais respostas gravadas para a chamada solicitada."""
+
+
+def _call_key(method, kwargs):
+    return f"{method}:{json.dumps(kwargs, sort_keys=True, default=str)}"
+
+
+class RecordingSession:
+    """
+    Proxy da sessão HTTP do pybit que grava cada chamada (parâmetros, resposta,
+    latência e timestamp) em um arquivo JSON Lines comprimido com gzip.
+    """
+
+    def __init__(self, session, path):
+        self._session = session
+        self._path = path
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        logger.info(f"Connector: Recording session to {path}")
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(',', ':'), default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def recorded_call(**kwargs):
+            record = {'t': time.time(), 'm': name, 'k': kwargs}
+            started = time.perf_counter()
+            try:
+                response = attr(**kwargs)
+                record['r'] = response
+                return response
+            except Exception as e:
+                record['e'] = [type(e).__name__, str(e)]
+                raise
+            finally:
+                record['d'] = round(time.perf_counter() - started, 6)
+                self._write(record)
+
+        return recorded_call
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayClock:
+    """
+    Relógio do replay: segue os timestamps gravados em vez do relógio de parede, para que
+    o cache de candles e as séries auxiliares peçam o mesmo que pediram na sessão original.
+    """
+
+    def __init__(self, session: "ReplaySession"):
+        self.session = session
+
+    def now_ms(self) -> int:
+        return self.session.now_ms()
+
+    def now_datetime(self) -> datetime:
+        return datetime.fromtimestamp(self.now_ms() / 1000)
+
+
+class ReplaySession:
+    """
+    Serve de forma determinística as respostas de uma sessão gravada.
+
+    Cada chamada consome a próxima gravação com o mesmo método e parâmetros; se não
+    houver, usa a próxima do mesmo método e avisa que o replay divergiu da gravação
+    (`mismatches`): com o ReplayClock, o cache de candles pede o mesmo que na sessão original. Com `speed=0` responde o mais rápido possível;
+    com `speed=1.0` reproduz a latência gravada de cada chamada (2.0 = duas vezes mais rápido).
+    As pausas entre as chamadas não são reproduzidas.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.path = path
+        self.speed = float(speed)
+        self.records = []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    self.records.append(json.loads(line))
+
+        self._consumed = [False] * len(self.records)
+        self._by_key = defaultdict(deque)
+        self._by_method = defaultdict(deque)
+        for index, record in enumerate(self.records):
+            self._by_key[_call_key(record['m'], record['k'])].append(index)
+            self._by_method[record['m']].append(index)
+        self.calls = 0
+        self.mismatches = 0
+        self._cursor = 0  # Primeira gravação ainda não consumida
+        logger.info(f"Connector: Replaying {len(self.records)} recorded calls from {path}")
+
+    @property
+    def remaining(self):
+        return self._consumed.count(False)
+
+    def remaining_for(self, method):
+        return sum(1 for index in self._by_method[method] if not self._consumed[index])
+
+    def now_ms(self) -> int:
+        """
+        Horário gravado da próxima chamada a ser reproduzida (da última, se a sessão acabou):
+        o "agora" da sessão original no ponto em que o replay está.
+        """
+        while self._cursor < len(self.records) and self._consumed[self._cursor]:
+            self._cursor += 1
+        if not self.records:
+            return int(time.time() * 1000)
+        record = self.records[min(self._cursor, len(self.records) - 1)]
+        return int(record['t'] * 1000)
+
+    def _next(self, queue):
+        while queue and self._consumed[queue[0]]:
+            queue.popleft()
+        return queue.popleft() if queue else None
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+
+        def replayed_call(**kwargs):
+            index = self._next(self._by_key[_call_key(name, kwargs)])
+            if index is None:
+                index = self._next(self._by_method[name])
+                if index is not None:
+                    self.mismatches += 1
+                    logger.warning(f"Connector: Replay diverged: no recorded {name}({kwargs}); "
+                                   f"serving the next recorded {name} instead")
+            if index is None:
+                raise CassetteExhausted(f"No recorded response left for {name}({kwargs})")
+
+            self._consumed[index] = True
+            self.calls += 1
+            record = self.records[index]
+            if self.speed > 0:
+                time.sleep(record.get('d', 0) / self.speed)
+            if 'e' in record:
+                raise ReplayedError(*record['e'])
+            return record['r']
+
+        return replayed_call
+
+    def close(self):
+        pass
@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pybit import _helpers
+from src.data.candle_store import interval_to_ms
+from src.utils.logger import logger
+
+
+class ExchangeClock:
+    """
+    Relógio alinhado ao servidor da Bybit.
+
+    Amostra periodicamente o horário do servidor, estima RTT e offset de cada amostra e usa
+    a de menor RTT da janela (filtro estilo NTP: a menos atrasada tem o menor erro). O "agora"
+    da corretora é derivado de `time.monotonic()`, então não anda para trás nem pula com
+    ajustes do relógio local.
+    """
+
+    def __init__(self, fetch_server_time, sample_interval=60.0, window=8, bar_close_grace_ms=250):
+        """
+        Args:
+            fetch_server_time: Função sem argumentos que retorna o horário do servidor em ms (ou None)
+            sample_interval (float): Segundos entre amostras em segundo plano
+            window (int): Quantidade de amostras consideradas no filtro
+            bar_close_grace_ms (int): Espera após o fechamento do candle para a API publicá-lo
+        """
+        self.fetch_server_time = fetch_server_time
+        self.sample_interval = sample_interval
+        self.bar_close_grace_ms = bar_close_grace_ms
+        self.samples = deque(maxlen=window)  # (rtt_ms, offset_ms)
+        self.offset_ms = 0.0
+        self.rtt_ms = None
+        self._base_ms = time.time() * 1000
+        self._base_mono = time.monotonic()
+        self._last_ms = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._original_timestamp = None
+
+    @property
+    def synced(self) -> bool:
+        return self.rtt_ms is not None
+
+    def sample(self) -> bool:
+        """Faz uma medição do servidor. Retorna False se a consulta falhou."""
+        local_before = time.time() * 1000
+        mono_before = time.monotonic()
+        server_ms = self.fetch_server_time()
+        mono_after = time.monotonic()
+        if server_ms is None:
+            return False
+
+        rtt_ms = (mono_after - mono_before) * 1000
+        # O servidor respondeu, em média, no meio da ida e volta
+        offset_ms = server_ms - (local_before + rtt_ms / 2)
+        with self._lock:
+            self.samples.append((rtt_ms, offset_ms))
+            best_rtt, best_offset = min(self.samples)
+            self.rtt_ms = best_rtt
+            self.offset_ms = best_offset
+            self._base_ms = local_before + rtt_ms / 2 + best_offset
+            self._base_mono = (mono_before + mono_after) / 2
+        logger.debug(f"Clock: offset {offset_ms:.1f}ms rtt {rtt_ms:.1f}ms (using {best_offset:.1f}ms / {best_rtt:.1f}ms)")
+        return True
+
+    def now_ms(self) -> int:
+        """Horário estimado da corretora em ms, monotônico."""
+        with self._lock:
+            now = int(self._base_ms + (time.monotonic() - self._base_mono) * 1000)
+            if now < self._last_ms:
+                now = self._last_ms
+            self._last_ms = now
+        return now
+
+    def now_datetime(self) -> datetime:
+        """Horário da corretora como datetime local (para logs e notificações)."""
+        return datetime.fromtimestamp(self.now_ms() / 1000)
+
+    def next_bar_close(self, interval, now_ms=None) -> int:
+        """Timestamp (ms) do próximo fechamento de candle do intervalo."""
+        step = interval_to_ms(interval)
+        now_ms = self.now_ms() if now_ms is None else now_ms
+        return (now_ms // step + 1) * step
+
+    def is_bar_closed(self, candle_start_ms, interval) -> bool:
+        """Indica se o candle que começou em `candle_start_ms` já fechou no horário da corretora."""
+        return candle_start_ms + interval_to_ms(interval) <= self.now_ms()
+
+    def sleep_until_bar_close(self, interval, stop_event=None) -> int:
+        """
+        Dorme até o próximo fechamento de candle (mais a margem de publicação) e retorna
+        o timestamp do fechamento. O sono é fatiado para acompanhar ressincronizações.
+        """
+        target = self.next_bar_close(interval) + self.bar_close_grace_ms
+        while True:
+            remaining = (target - self.now_ms()) / 1000
+            if remaining <= 0:
+                break
+            if stop_event is None:
+                time.sleep(min(remaining, 1.0))
+            elif stop_event.wait(min(remaining, 1.0)):
+                break
+        return target - self.bar_close_grace_ms
+
+    def start(self):
+        """Faz as primeiras amostras e inicia a ressincronização em segundo plano."""
+        for _ in range(3):
+            self.sample()
+        if self.synced:
+            logger.info(f"Clock: Synced with exchange (offset {self.offset_ms:.1f}ms, rtt {self.rtt_ms:.1f}ms)")
+        else:
+            logger.warning("Clock: Could not reach exchange time; using local clock until next sample")
+        self._thread = threading.Thread(target=self._run, name="exchange-clock", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.sample_interval):
+            try:
+                self.sample()
+            except Exception as e:
+                logger.warning(f"Clock: Sample failed - {e}")
+
+    def install(self):
+        """Faz a assinatura das requisições (pybit e conector assíncrono) usar o horário da corretora."""
+        if self._original_timestamp is None:
+            self._original_timestamp = _helpers.generate_timestamp
+            _helpers.generate_timestamp = self.now_ms
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._original_timestamp is not None:
+            _helpers.generate_timestamp = self._original_timestamp
+            self._original_timestamp = None
@@ -0,0 +1,347 @@
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field, fields
+from typing import Dict, Optional
+import requests
+from pybit.exceptions import FailedRequestError, InvalidRequestError
+from src.utils.logger import logger
+
+# Chamadas sem efeito colateral: podem ser repetidas e duplicadas (hedge) à vontade
+IDEMPOTENT_METHODS = {
+    'get_kline', 'get_positions', 'get_position_info', 'get_wallet_balance',
+    'get_instruments_info', 'get_tickers', 'get_open_orders', 'get_order_history',
+}
+
+# retCodes da API v5 que indicam falha transitória do lado da Bybit
+RETRYABLE_RET_CODES = {10000, 10002, 10006, 10016, 10429, 170007, 170146}
+# HTTP que não adianta repetir (credencial, bloqueio de IP, rota inexistente)
+NON_RETRYABLE_HTTP = {401, 403, 404}
+DUPLICATE_ORDER_LINK_ID = 110072
+
+
+class CircuitOpenError(Exception):
+    """O circuito do endpoint está aberto: a chamada foi recusada sem ir à rede."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """O prazo total do endpoint (incluindo retentativas) acabou."""
+
+
+def is_retryable(error) -> bool:
+    """Classifica se a falha é transitória (rede, timeout, sobrecarga) e vale repetir."""
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, InvalidRequestError):
+        return error.status_code in RETRYABLE_RET_CODES
+    if isinstance(error, FailedRequestError):
+        return error.status_code not in NON_RETRYABLE_HTTP
+    return isinstance(error, (TimeoutError, ConnectionError))
+
+
+def new_order_link_id(prefix="bot") -> str:
+    """ID de ordem do cliente (máx. 36 caracteres na API) para deduplicar retentativas."""
+    return f"{prefix}-{uuid.uuid4().hex}"[:36]
+
+
+@dataclass
+class ResilienceConfig:
+    """Parâmetros da camada de resiliência. `hedge_after=None` desativa requisições duplicadas."""
+    enabled: bool = True
+    max_attempts: int = 3
+    base_delay: float = 0.2           # Backoff exponencial: base_delay * 2^tentativa, com jitter
+    max_delay: float = 2.0
+    default_deadline: float = 15.0    # Prazo total por chamada, em segundos
+    deadlines: Dict[str, float] = field(default_factory=lambda: {
+        'get_kline': 8.0, 'get_positions': 5.0, 'get_position_info': 5.0,
+        'get_wallet_balance': 5.0, 'place_order': 10.0, 'set_leverage': 8.0,
+    })
+    hedge_after: Optional[float] = None  # Segundos até disparar a cópia de uma leitura lenta
+    failure_threshold: int = 5        # Falhas consecutivas que abrem o circuito
+    reset_timeout: float = 30.0       # Tempo com o circuito aberto antes de testar de novo
+
+    @classmethod
+    def from_dict(cls, config) -> "ResilienceConfig":
+        if config is False:
+            return cls(enabled=False)
+        config = config or {}
+        known = {f.name for f in fields(cls)}
+        unknown = set(config) - known
+        if unknown:
+            logger.warning(f"Connector: Ignoring unknown resilience settings {sorted(unknown)}")
+        settings = {k: v for k, v in config.items() if k in known}
+        if 'deadlines' in settings:
+            settings['deadlines'] = {**cls().deadlines, **settings['deadlines']}
+        return cls(**settings)
+
+    def deadline_for(self, method) -> float:
+        return self.deadlines.get(method, self.default_deadline)
+
+    def backoff(self, attempt) -> float:
+        # "Full jitter": espalha as retentativas de vários processos no tempo
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Disjuntor por endpoint: após `failure_threshold` falhas transitórias seguidas, recusa
+    chamadas por `reset_timeout` segundos; depois libera uma chamada de teste (meio-aberto).
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Libera a chamada de teste sem registrar resultado (ex.: ela terminou com erro local)."""
+        with self._lock:
+            self._probing = False
+
+
+class ResilientCall:
+    """
+    Estado de uma chamada com retentativas: disjuntor do endpoint, tentativas e prazo total.
+    Compartilhado pelo conector síncrono e pelo assíncrono, que só diferem no transporte
+    e no relógio (`clock`). `release()` deve ser chamado em todos os caminhos de saída
+    para que uma chamada de teste do meio-aberto nunca deixe o disjuntor preso.
+    """
+
+    def __init__(self, method, breaker: CircuitBreaker, config: ResilienceConfig, retry_safe: bool, clock=time.monotonic):
+        self.method = method
+        self.breaker = breaker
+        self.config = config
+        self.clock = clock
+        self.max_attempts = config.max_attempts if retry_safe else 1
+        self.deadline = clock() + config.deadline_for(method)
+        self.attempt = 0
+        self._probe = False
+
+    def admit(self) -> bool:
+        """Pede passagem ao disjuntor; False se o circuito está aberto."""
+        self._probe = self.breaker.state == "half-open"
+        return self.breaker.allow()
+
+    def succeeded(self):
+        """O endpoint respondeu (com sucesso ou com uma recusa de negócio)."""
+        self.breaker.record_success()
+
+    def failed(self):
+        self.breaker.record_failure()
+
+    def retry_delay(self, error) -> Optional[float]:
+        """
+        Registra a falha transitória e devolve a espera até a próxima tentativa, ou None se
+        não há mais tentativas (ou o circuito abriu). Levanta DeadlineExceeded se a espera
+        passaria do prazo.
+        """
+        self.failed()
+        self.attempt += 1
+        delay = self.config.backoff(self.attempt)
+        if self.attempt >= self.max_attempts or not self.breaker.allow():
+            return None
+        if self.clock() + delay >= self.deadline:
+            raise DeadlineExceeded(f"{self.method} deadline exceeded after {self.attempt} attempts: {error!r}") from error
+        logger.warning(f"Connector: {self.method} failed ({type(error).__name__}: {error}). "
+                       f"Retry {self.attempt}/{self.max_attempts - 1} in {delay:.2f}s")
+        return delay
+
+    def release(self):
+        if self._probe:
+            self.breaker.release_probe()
+
+
+class ResilientSession:
+    """
+    Proxy da sessão HTTP do pybit que adiciona retentativas com backoff exponencial e jitter,
+    prazo total por endpoint, circuit breaker por endpoint e, para leituras idempotentes,
+    requisições duplicadas (hedged) quando a primeira demora mais que `hedge_after`.
+
+    `place_order` só é repetida com `orderLinkId`: se a tentativa anterior chegou à Bybit,
+    a API recusa a duplicata e a ordem original é recuperada pelo mesmo ID.
+    """
+
+    def __init__(self, session, config: Optional[ResilienceConfig] = None):
+        self._session = session
+        self.config = config or ResilienceConfig()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._pool = None
+        # Prazo da chamada em andamento em cada thread (o hedge roda em threads do pool)
+        self._local = threading.local()
+        self.stats = {'retries': 0, 'hedges': 0, 'hedge_wins': 0, 'rejected': 0, 'recovered_orders': 0}
+
+    def bind_transport(self, http):
+        """
+        Liga a sessão pybit a esta camada: desliga as retentativas internas do pybit (senão as
+        duas camadas se multiplicam) e limita o timeout HTTP de cada requisição ao que resta
+        do prazo do endpoint.
+        """
+        http.max_retries = 1
+        http.retry_codes = set()
+        http.force_retry = False
+        send = http.client.send
+
+        def bounded_send(request, **kwargs):
+            kwargs['timeout'] = self.request_timeout(kwargs.get('timeout'))
+            return send(request, **kwargs)
+
+        http.client.send = bounded_send
+
+    def request_timeout(self, default=None) -> Optional[float]:
+        """Timeout da requisição HTTP: o menor entre `default` e o que resta do prazo da chamada."""
+        deadline = getattr(self._local, 'deadline', None)
+        if deadline is None:
+            return default
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("deadline exceeded before the request was sent")
+        return min(default, remaining) if default else remaining
+
+    def _invoke(self, func, kwargs, deadline):
+        self._local.deadline = deadline
+        try:
+            return func(**kwargs)
+        finally:
+            self._local.deadline = None
+
+    def _breaker(self, method) -> CircuitBreaker:
+        breaker = self._breakers.get(method)
+        if breaker is None:
+            breaker = self._breakers.setdefault(
+                method, CircuitBreaker(self.config.failure_threshold, self.config.reset_timeout)
+            )
+        return breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._session, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def resilient_call(**kwargs):
+            return self._call(name, attr, kwargs)
+
+        return resilient_call
+
+    def _call(self, method, func, kwargs):
+        idempotent = method in IDEMPOTENT_METHODS
+        retry_safe = idempotent or method == 'set_leverage' or (method == 'place_order' and 'orderLinkId' in kwargs)
+        call = ResilientCall(method, self._breaker(method), self.config, retry_safe)
+        if not call.admit():
+            self.stats['rejected'] += 1
+            raise CircuitOpenError(f"Circuit open for {method}; retrying in up to {self.config.reset_timeout}s")
+
+        try:
+            while True:
+                try:
+                    if idempotent and self.config.hedge_after is not None:
+                        response = self._hedged(method, func, kwargs, call.deadline)
+                    else:
+                        response = self._invoke(func, kwargs, call.deadline)
+                    call.succeeded()
+                    return response
+                except DeadlineExceeded:
+                    call.failed()
+                    raise
+                except Exception as e:
+                    if method == 'place_order' and call.attempt > 0 and self._is_duplicate(e):
+                        call.succeeded()
+                        return self._recover_order(kwargs)
+                    if not is_retryable(e):
+                        if isinstance(e, (InvalidRequestError, FailedRequestError)):
+                            # A Bybit respondeu: recusa de negócio não é falha do endpoint
+                            call.succeeded()
+                        raise
+                    delay = call.retry_delay(e)
+                    if delay is None:
+                        raise
+                    self.stats['retries'] += 1
+                    time.sleep(delay)
+        finally:
+            call.release()
+
+    def _hedged(self, method, func, kwargs, deadline):
+        """Dispara a leitura; se não responder em `hedge_after`, dispara uma cópia e usa a primeira."""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="hedge")
+        primary = self._pool.submit(self._invoke, func, kwargs, deadline)
+        done, _ = wait([primary], timeout=self.config.hedge_after)
+        if done:
+            return primary.result()
+
+        self.stats['hedges'] += 1
+        hedge = self._pool.submit(self._invoke, func, kwargs, deadline)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"{method} deadline exceeded waiting for hedged requests")
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.stats['hedge_wins'] += 1
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    @staticmethod
+    def _is_duplicate(error) -> bool:
+        return isinstance(error, InvalidRequestError) and error.status_code == DUPLICATE_ORDER_LINK_ID
+
+    def _recover_order(self, kwargs):
+        """A tentativa anterior foi aceita: busca a ordem original pelo orderLinkId."""
+        self.stats['recovered_orders'] += 1
+        query = {'category': kwargs['category'], 'symbol': kwargs['symbol'], 'orderLinkId': kwargs['orderLinkId']}
+        logger.warning(f"Connector: Order {kwargs['orderLinkId']} already accepted by a previous attempt. Recovering it.")
+        for lookup in ('get_open_orders', 'get_order_history'):
+            orders = getattr(self._session, lookup)(**query)['result'].get('list', [])
+            if orders:
+                order = orders[0]
+                return {'retCode': 0, 'retMsg': 'OK',
+                        'result': {'orderId': order.get('orderId'), 'orderLinkId': order.get('orderLinkId')}}
+        # A Bybit confirmou a duplicata: a ordem existe mesmo sem aparecer nas consultas ainda
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'orderId': None, 'orderLinkId': kwargs['orderLinkId']}}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        close = getattr(self._session, 'close', None)
+        if callable(close):
+            close()
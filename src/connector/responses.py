@@ -0,0 +1,268 @@
+import pandas as pd
+from src.utils.logger import logger, hot_log
+
+# Interpretação das respostas da API v5, compartilhada pelos conectores síncrono e assíncrono
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'turnover']
+KLINE_PAGE_LIMIT = 1000  # Máximo de candles por requisição na API v5
+# Máximo de ordens por requisição nos endpoints de lote (create/amend/cancel-batch)
+BATCH_LIMITS = {'linear': 20, 'inverse': 20, 'option': 20, 'spot': 10}
+# Máximo de itens por requisição no histórico de funding e de open interest
+AUX_PAGE_LIMIT = 200
+# `intervalTime` aceito pelo endpoint de open interest, com a duração em ms
+OPEN_INTEREST_INTERVALS = {'5min': 300_000, '15min': 900_000, '30min': 1_800_000,
+                           '1h': 3_600_000, '4h': 14_400_000, '1d': 86_400_000}
+
+
+def candles_to_dataframe(candles):
+    """Converte a lista de klines da API (mais recente primeiro) em DataFrame crescente."""
+    # Inverte a ordem dos candles e converte para DataFrame
+    candles = candles[::-1]
+    df = pd.DataFrame(candles, columns=CANDLE_COLUMNS)
+
+    # Converte os tipos das colunas
+    return df.astype({
+        'timestamp': 'int64',
+        'open': 'float64',
+        'high': 'float64',
+        'low': 'float64',
+        'close': 'float64',
+        'volume': 'float64',
+        'turnover': 'float64'
+    })
+
+
+def parse_candles(response):
+    """Retorna o DataFrame de candles de uma resposta de get_kline ou None."""
+    if response['retCode'] == 0:
+        candles = response['result']['list']
+        if not candles:
+            return None
+        return candles_to_dataframe(candles)
+    logger.error(f"Connector Error (get_kline): Code={response['retCode']} Msg={response['retMsg']}")
+    return None
+
+
+def merge_candle_pages(pages):
+    """Junta páginas de candles buscadas da mais recente para a mais antiga em um DataFrame crescente."""
+    if len(pages) == 1:
+        return pages[0]
+    df = pd.concat(pages[::-1], ignore_index=True)
+    return df.drop_duplicates('timestamp', keep='last').reset_index(drop=True)
+
+
+def parse_open_position(response):
+    """Retorna a primeira posição com size > 0 de uma resposta de get_positions ou None."""
+    if response['retCode'] == 0:
+        positions = response['result'].get('list', [])
+
+        # Filtrar posições com size > 0
+        open_positions = [p for p in positions if float(p.get('size', 0)) > 0]
+
+        if open_positions:
+            position = open_positions[0]  # Pegar a primeira posição aberta
+            # Texto resumido; o payload completo vai como campo do registro (JSON no modo hot)
+            hot_log(('connector.position', position.get('symbol')), 'INFO', "Connector: Found open position - {symbol} {side} size={size}",
+                    symbol=position.get('symbol'), side=position.get('side'), size=position.get('size'),
+                    position=position)
+            return position
+        hot_log('connector.no_position', 'INFO', "Connector: No open position found")
+        return None
+    logger.error(f"Connector Error: Failed to get position - {response['retMsg']}")
+    return None
+
+
+def precheck_leverage(category, symbol, leverage):
+    """
+    Validações locais antes de definir a alavancagem.
+    Retorna True/False quando a decisão já está tomada, ou None para seguir com a API.
+    """
+    # Validar categoria
+    if category == "spot":
+        logger.warning("Connector: Leverage not applicable for spot trading")
+        return True
+
+    # Validar alavancagem
+    if leverage < 1 or leverage > 125:
+        logger.error(f"Connector Error: Invalid leverage value {leverage}. Must be between 1 and 125.")
+        return False
+
+    # Caso especial: alavancagem 1 não precisa ser definida explicitamente
+    if leverage == 1:
+        logger.info(f"Connector: Leverage 1x is the default, no need to set it explicitly for {symbol}")
+        return True
+    return None
+
+
+def leverage_already_set(position_info, symbol, leverage, margin_type):
+    """Indica se a alavancagem e o tipo de margem atuais já são os desejados."""
+    if position_info['retCode'] == 0 and position_info['result']['list']:
+        current_leverage = int(position_info['result']['list'][0]['leverage'])
+        current_margin = position_info['result']['list'][0]['marginMode']
+
+        # Se a alavancagem e o tipo de margem já estiverem corretos, não precisa alterar
+        if current_leverage == leverage and current_margin == margin_type:
+            logger.info(f"Connector: Leverage already set to {leverage}x ({margin_type}) for {symbol}")
+            return True
+    return False
+
+
+def leverage_params(category, symbol, leverage, margin_type):
+    return {
+        'category': category,
+        'symbol': symbol,
+        'buyLeverage': str(leverage),
+        'sellLeverage': str(leverage),
+        'marginMode': margin_type
+    }
+
+
+def validate_order_qty(symbol, qty):
+    """Valida a quantidade mínima do par."""
+    if symbol == "BTCUSDT":
+        if qty < 0.001:
+            logger.error(f"Connector Error: Minimum quantity for BTCUSDT is 0.001 BTC. Got: {qty}")
+            return False
+    elif symbol.endswith("USDT"):
+        if qty < 0.01:
+            logger.error(f"Connector Error: Minimum quantity for {symbol} is 0.01. Got: {qty}")
+            return False
+    else:
+        if qty < 0.001:
+            logger.error(f"Connector Error: Minimum quantity for {symbol} is 0.001. Got: {qty}")
+            return False
+    return True
+
+
+def build_order_params(category, symbol, side, order_type, qty, stop_loss=None, take_profit=None, reduce_only=False, **kwargs):
+    """Monta os parâmetros da API para criação de ordem."""
+    order_params = {
+        'category': category,
+        'symbol': symbol,
+        'side': side,
+        'orderType': order_type,
+        'qty': str(qty),  # API requer string
+        'reduceOnly': reduce_only
+    }
+
+    # Adicionar stop loss e take profit se fornecidos
+    if stop_loss is not None:
+        order_params['stopLoss'] = str(stop_loss)
+    if take_profit is not None:
+        order_params['takeProfit'] = str(take_profit)
+
+    # Adicionar parâmetros adicionais
+    order_params.update(kwargs)
+    return order_params
+
+
+def balance_request_params(account_type, coin):
+    # Para conta UNIFIED, não passamos a moeda na requisição inicial
+    # pois queremos o resumo da conta que contém a lista de moedas.
+    request_params = {"accountType": account_type}
+    if account_type != "UNIFIED":
+        # Para outros tipos de conta (ex: CONTRACT), a API pode aceitar 'coin'
+        request_params['coin'] = coin
+    return request_params
+
+
+def parse_balance(response, account_type, coin):
+    """Extrai o saldo da moeda de uma resposta de get_wallet_balance."""
+    if response['retCode'] != 0:
+        logger.error(f"Connector Error (get_wallet_balance): Code={response['retCode']} Msg={response['retMsg']}")
+        return None
+
+    balance_list = response['result']['list']
+    if not balance_list:
+        logger.info(f"Connector: Empty balance list returned for account {account_type}.")
+        return None
+
+    if account_type == "UNIFIED":
+        # A lista deve conter um dicionário principal para a conta UNIFIED
+        account_summary = balance_list[0]
+        # Procurar a moeda específica dentro da lista 'coin' deste sumário
+        coin_list = account_summary.get('coin', [])
+        coin_info = next((c for c in coin_list if c.get('coin') == coin), None)
+        if coin_info:
+            logger.info(f"Connector: Found balance for {coin} in UNIFIED account.")
+            return coin_info
+        # Moeda não encontrada na lista, significa saldo zero ou nunca usada
+        logger.info(f"Connector: Coin '{coin}' not found within UNIFIED account summary. Assuming zero balance.")
+        # Retornar um dict com saldo zero para evitar erros no executor
+        return {'coin': coin, 'walletBalance': '0', 'availableBalance': '0'}
+
+    # Para outras contas (ex: CONTRACT), a API pode retornar a lista direta
+    # ou filtrar se 'coin' foi passado na request.
+    # Assumindo que a lista contém diretamente a info da moeda solicitada.
+    balance_info = next((item for item in balance_list if item.get('coin') == coin), None)
+    if balance_info:
+        logger.info(f"Connector: Found balance for {coin} in {account_type} account.")
+        return balance_info
+    logger.error(f"Connector: Coin '{coin}' not found in {account_type} account response.")
+    return None
+
+
+def batch_chunks(category, requests):
+    """Divide os pedidos em lotes do tamanho aceito pela categoria."""
+    size = BATCH_LIMITS.get(category, BATCH_LIMITS['spot'])
+    return [requests[i:i + size] for i in range(0, len(requests), size)]
+
+
+def parse_batch_results(response, count, action):
+    """
+    Resultado de cada item de uma resposta de lote, na ordem dos pedidos: lista de
+    (resultado, erro). A API devolve `result.list` e `retExtInfo.list` alinhados com a
+    requisição; um retCode diferente de zero no topo invalida o lote inteiro.
+    """
+    if response['retCode'] != 0:
+        error = f"Code={response['retCode']} Msg={response['retMsg']}"
+        logger.error(f"Connector Error ({action}): {error}")
+        return [(None, error)] * count
+    results = response['result'].get('list', [])
+    infos = (response.get('retExtInfo') or {}).get('list', [])
+    parsed = []
+    for index in range(count):
+        info = infos[index] if index < len(infos) else {}
+        result = results[index] if index < len(results) else None
+        if info.get('code', 0) != 0 or not result:
+            parsed.append((None, f"Code={info.get('code')} Msg={info.get('msg')}"))
+        else:
+            parsed.append((result, None))
+    return parsed
+
+
+def build_batch_order_request(category, order):
+    """Item de create-batch a partir dos mesmos argumentos de `place_order` (sem `leverage`)."""
+    params = build_order_params(category, **order)
+    del params['category']
+    return params
+
+
+def stringify_numbers(request):
+    """A API de lote espera valores numéricos como string (qty, price, stopLoss...)."""
+    return {k: str(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else v for k, v in request.items()}
+
+
+def series_frame(rows, column):
+    """Pares (timestamp, valor) em DataFrame crescente, sem timestamps repetidos."""
+    df = pd.DataFrame(rows, columns=['timestamp', column]).astype({'timestamp': 'int64', column: 'float64'})
+    return df.drop_duplicates('timestamp', keep='last').sort_values('timestamp').reset_index(drop=True)
+
+
+def price_kline_rows(klines):
+    """(início, fechamento) das klines de mark/index price ([startTime, open, high, low, close])."""
+    return [(k[0], k[4]) for k in klines]
+
+
+def funding_rows(items):
+    return [(item['fundingRateTimestamp'], item['fundingRate']) for item in items]
+
+
+def open_interest_rows(items):
+    return [(item['timestamp'], item['openInterest']) for item in items]
+
+
+def open_interest_interval(interval_ms):
+    """Maior `intervalTime` de open interest que não passa do intervalo dos candles (mínimo 5min)."""
+    fitting = [name for name, ms in OPEN_INTEREST_INTERVALS.items() if ms <= interval_ms]
+    return fitting[-1] if fitting else '5min'
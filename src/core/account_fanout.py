@@ -0,0 +1,183 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, fields
+from typing import Callable, Dict, List, Optional
+from src.core.executor import StrategyExecutor
+from src.core.risk_engine import RiskEngine
+from src.core.strategy_loader import create_strategy
+from src.data.candle_cache import CandleCache
+from src.data.market_data import AuxDataFeed
+from src.utils.config_loader import STRATEGY_OVERRIDES
+from src.utils.logger import logger
+
+# Status de cada conta no relatório do ciclo
+OK = "ok"
+FAILED = "failed"
+PENDING = "pending"  # Ainda processando quando o ciclo fechou o relatório
+BUSY = "busy"        # Ciclo anterior da conta ainda não terminou; sinal não enviado
+# Overrides de conta que mudam os preços de saída: a conta recalcula SL/TP sobre os sinais
+EXIT_OVERRIDES = ('stop_loss', 'take_profit')
+
+
+@dataclass
+class AccountSpec:
+    """Conta que espelha a estratégia. As credenciais vêm de variáveis de ambiente, nunca do config."""
+    name: str
+    api_key_env: str
+    api_secret_env: str
+    overrides: Dict = field(default_factory=dict)  # leverage, investment_percent... da conta
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "AccountSpec":
+        known = {f.name for f in fields(cls)} | set(STRATEGY_OVERRIDES)
+        unknown = set(config) - known
+        if unknown:
+            logger.warning(f"Accounts: Ignoring unknown account settings {sorted(unknown)}")
+        overrides = {**config.get('overrides', {}), **{k: config[k] for k in STRATEGY_OVERRIDES if k in config}}
+        return cls(config['name'], config['api_key_env'], config['api_secret_env'], overrides)
+
+    def credentials(self):
+        api_key, api_secret = os.getenv(self.api_key_env), os.getenv(self.api_secret_env)
+        if not api_key or not api_secret:
+            raise ValueError(f"Account '{self.name}': {self.api_key_env} and {self.api_secret_env} must be set in environment or .env file")
+        return api_key, api_secret
+
+
+@dataclass
+class AccountReport:
+    account: str
+    status: str
+    latency_ms: Optional[float] = None
+    order: Optional[Dict] = None
+    error: Optional[str] = None
+
+
+class AccountFanout:
+    """
+    Espelha uma estratégia em várias contas: candles e sinais são calculados uma vez por
+    ciclo e o sinal é enviado em paralelo a um executor por conta, cada um com sua sessão
+    HTTP (e portanto seu limite de requisições), seu saldo para o dimensionamento, seu
+    metadata de posição e seu motor de risco.
+
+    O ciclo espera as contas até `timeout`; as que passarem disso seguem rodando em
+    segundo plano e aparecem como `pending`. Enquanto uma conta não termina, ela é pulada
+    nos ciclos seguintes (`busy`) em vez de atrasar as outras.
+    """
+
+    def __init__(self, market_connector, accounts: List[AccountSpec], connector_factory: Callable,
+                 strategy_name, config: Dict, risk_config=None, clock=None, trade_gate=None, timeout=10.0,
+                 signal_recorder=None):
+        """
+        Args:
+            market_connector: Conector usado só para os candles (dados públicos)
+            accounts: Contas que recebem as ordens
+            connector_factory: Função (AccountSpec) -> conector autenticado da conta
+            config: Parâmetros da estratégia (mesmo dict do modo de par único)
+            timeout (float): Espera máxima pelas contas antes de fechar o relatório do ciclo
+        """
+        if not accounts:
+            raise ValueError("At least one account is required for fan-out")
+        self.timeout = timeout
+        self.candles = CandleCache(market_connector, clock=clock)
+        self.aux_feed = AuxDataFeed(market_connector, clock=clock)
+        # Instância usada só para calcular os sinais; cada conta tem a sua para sizing e posição
+        self.signal_strategy = create_strategy(strategy_name, config, config.get('overrides'))
+        self.executors: Dict[str, StrategyExecutor] = {}
+        self._own_exits = {spec.name for spec in accounts if any(key in spec.overrides for key in EXIT_OVERRIDES)}
+        for spec in accounts:
+            strategy = create_strategy(strategy_name, config, {**(config.get('overrides') or {}), **spec.overrides})
+            self.executors[spec.name] = StrategyExecutor(
+                connector_factory(spec), strategy, risk_engine=RiskEngine.from_config(risk_config),
+                clock=clock, trade_gate=trade_gate, signal_recorder=signal_recorder,
+            )
+        self.latencies = {name: deque(maxlen=100) for name in self.executors}  # ms, para percentis
+        self.failures = {name: 0 for name in self.executors}
+        self._inflight: Dict[str, Future] = {}
+        self._pool = ThreadPoolExecutor(max_workers=len(self.executors), thread_name_prefix="account")
+
+    def _run_account(self, name, category, symbol, last_row) -> AccountReport:
+        executor = self.executors[name]
+        started = time.perf_counter()
+        try:
+            ok = executor.run_signal(category, symbol, last_row)
+            error = None if ok else "exception, see log"
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.latencies[name].append(latency_ms)
+        if not ok:
+            self.failures[name] += 1
+        return AccountReport(name, OK if ok else FAILED, latency_ms, executor.last_order_result, error)
+
+    def _account_row(self, name, signals):
+        """Última linha dos sinais com stop loss e take profit da estratégia da conta."""
+        strategy = self.executors[name].strategy
+        frame = signals.copy()
+        frame['stop_loss'] = 0.0
+        frame['take_profit'] = 0.0
+        frame = strategy.populate_stop_loss(frame, strategy.metadata)
+        frame = strategy.populate_take_profit(frame, strategy.metadata)
+        return frame.iloc[-1]
+
+    def run(self, category, symbol, interval) -> List[AccountReport]:
+        """Calcula os sinais uma vez e distribui para as contas. Retorna o relatório do ciclo."""
+        df = self.candles.get(category, symbol, interval, self.signal_strategy.required_candles())
+        if df is None:
+            logger.info("Accounts: No candles data available.")
+            return []
+        if self.signal_strategy.aux_data:
+            df = self.aux_feed.join(category, symbol, interval, df, self.signal_strategy.aux_data)
+        signals = self.signal_strategy.calculate_signals(df)
+        last_row = signals.iloc[-1]
+
+        futures = {}
+        for name in self.executors:
+            previous = self._inflight.get(name)
+            if previous is None or previous.done():
+                row = self._account_row(name, signals) if name in self._own_exits else last_row
+                futures[name] = self._inflight[name] = self._pool.submit(self._run_account, name, category, symbol, row)
+
+        done, _ = wait(futures.values(), timeout=self.timeout)
+        reports = []
+        for name in self.executors:
+            future = futures.get(name)
+            if future is None:
+                reports.append(AccountReport(name, BUSY))
+            else:
+                reports.append(future.result() if future in done else AccountReport(name, PENDING))
+        self._log(reports)
+        return reports
+
+    def _log(self, reports: List[AccountReport]):
+        parts = []
+        for report in reports:
+            part = f"{report.account} {report.status}"
+            if report.latency_ms is not None:
+                part += f" {report.latency_ms:.0f}ms"
+            if report.order:
+                part += f" order={report.order.get('orderLinkId')}"
+            if report.error:
+                part += f" ({report.error})"
+            parts.append(part)
+        level = logger.info if all(r.status == OK for r in reports) else logger.warning
+        level(f"Accounts: {' | '.join(parts)}")
+
+    def stats(self) -> Dict[str, Dict]:
+        """Latência (p50/p99/máx, em ms) e falhas acumuladas por conta."""
+        summary = {}
+        for name, samples in self.latencies.items():
+            ordered = sorted(samples)
+            summary[name] = {
+                'cycles': len(ordered),
+                'failures': self.failures[name],
+                'p50_ms': ordered[len(ordered) // 2] if ordered else None,
+                'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] if ordered else None,
+                'max_ms': ordered[-1] if ordered else None,
+            }
+        return summary
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+        logger.info(f"Accounts: Session stats {self.stats()}")
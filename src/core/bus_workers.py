@@ -0,0 +1,200 @@
+import multiprocessing as mp
+import queue
+import time
+from typing import Dict, List, Optional
+from src.utils.logger import logger
+from src.core.market_bus import SharedCandleRing, StreamSpec
+
+SIGNAL_COLUMNS = ['enter_long', 'enter_short', 'exit_long', 'exit_short']
+INTENT_COLUMNS = ['timestamp', 'close'] + SIGNAL_COLUMNS + ['stop_loss', 'take_profit']
+
+
+def _create_strategy(spec: StreamSpec):
+    from src.core.strategy_loader import create_strategy
+    return create_strategy(spec.strategy, config={'pair': spec.symbol, 'timeframe': spec.interval}, overrides=dict(spec.overrides))
+
+
+def _unique_by_key(streams: List[StreamSpec]) -> List[StreamSpec]:
+    """
+    Um ring por símbolo/intervalo, mesmo que várias estratégias o consumam. Com indicadores
+    compartilhados, um ring por estratégia e overrides (ver StreamSpec.key).
+    """
+    unique = {}
+    for spec in streams:
+        unique.setdefault(spec.key, spec)
+    return list(unique.values())
+
+
+def feed_process(streams: List[StreamSpec], testnet: bool, poll_interval: float, stop_event):
+    """Processo dono do conector: busca candles e publica nos ring buffers."""
+    from src.connector.bybit_connector import BybitConnector
+
+    connector = BybitConnector(testnet=testnet)
+    streams = _unique_by_key(streams)
+    rings = {spec.key: SharedCandleRing.attach(spec) for spec in streams}
+    # Estratégias só são necessárias para pré-calcular indicadores compartilhados
+    indicator_strategies = {
+        spec.key: _create_strategy(spec)
+        for spec in streams if spec.indicator_columns
+    }
+    logger.info(f"MarketBus Feed: Publishing {len(streams)} stream(s)")
+
+    try:
+        while not stop_event.is_set():
+            started = time.monotonic()
+            for spec in streams:
+                ring = rings[spec.key]
+                # Primeira carga preenche o ring; depois só os candles mais recentes.
+                # Indicadores precisam do histórico completo para serem recalculados.
+                full = ring.written == 0 or spec.key in indicator_strategies
+                limit = min(spec.capacity, 1000) if full else 5
+                df = connector.get_historical_candles(spec.category, spec.symbol, spec.interval, limit=limit)
+                if df is None:
+                    continue
+                if spec.key in indicator_strategies:
+                    df = indicator_strategies[spec.key].populate_indicators(df, {})
+                try:
+                    ring.write(df)
+                except ValueError as e:
+                    logger.error(f"MarketBus Feed Error: {e}")
+            elapsed = time.monotonic() - started
+            stop_event.wait(max(0.0, poll_interval - elapsed))
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+def worker_process(streams: List[StreamSpec], intent_queue, stop_event, poll_interval: float):
+    """Processo de estratégia: lê os rings sem cópia e envia intenções de ordem."""
+    rings = {spec.key: SharedCandleRing.attach(spec) for spec in _unique_by_key(streams)}
+    strategies = {spec.strategy_key: _create_strategy(spec) for spec in streams}
+    last_seq: Dict[str, int] = {spec.strategy_key: -1 for spec in streams}
+    logger.info(f"MarketBus Worker: Handling {[spec.strategy_key for spec in streams]}")
+
+    try:
+        while not stop_event.is_set():
+            for spec in streams:
+                ring = rings[spec.key]
+                if ring.written == 0 or ring.seq == last_seq[spec.strategy_key]:
+                    continue
+
+                seq, df = ring.frame()
+                df = strategies[spec.strategy_key].calculate_signals(
+                    df, {'symbol': spec.symbol, 'interval': spec.interval},
+                    with_indicators=not spec.indicator_columns,
+                )
+                if not ring.is_consistent(seq):
+                    # O feed escreveu durante o cálculo; refaz no próximo ciclo
+                    continue
+                last_seq[spec.strategy_key] = seq
+
+                last_row = df.iloc[-1]
+                if not any(last_row.get(c, 0) == 1 for c in SIGNAL_COLUMNS):
+                    continue
+
+                intent = {
+                    'stream': spec.strategy_key,
+                    'category': spec.category,
+                    'symbol': spec.symbol,
+                    'seq': seq,
+                    'row': {c: float(last_row[c]) for c in INTENT_COLUMNS if c in last_row},
+                }
+                try:
+                    intent_queue.put_nowait(intent)
+                except queue.Full:
+                    logger.warning(f"MarketBus Worker: Intent queue full, dropping intent for {spec.strategy_key}")
+            stop_event.wait(poll_interval)
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+def router_process(streams: List[StreamSpec], testnet: bool, intent_queue, stop_event, risk_config: Optional[Dict] = None,
+                   signal_history=None):
+    """
+    Processo único de roteamento: executa as intenções com o conector de ordens.
+    Como todas as ordens passam por aqui, o motor de risco enxerga a exposição global.
+    """
+    from src.connector.bybit_connector import BybitConnector
+    from src.core.executor import StrategyExecutor
+    from src.core.risk_engine import RiskEngine
+    from src.data.signal_recorder import SignalRecorder
+
+    connector = BybitConnector(testnet=testnet)
+    risk_engine = RiskEngine.from_config(risk_config)
+    recorder = SignalRecorder.from_config(signal_history)
+    executors = {
+        spec.strategy_key: StrategyExecutor(
+            connector,
+            _create_strategy(spec),
+            risk_engine=risk_engine,
+            signal_recorder=recorder,
+        )
+        for spec in streams
+    }
+    handled_seq: Dict[str, int] = {}
+    logger.info("MarketBus Router: Ready")
+
+    while not stop_event.is_set():
+        try:
+            intent = intent_queue.get(timeout=1)
+        except queue.Empty:
+            continue
+
+        # Ignora intenções atrasadas de um candle já processado
+        if intent['seq'] <= handled_seq.get(intent['stream'], -1):
+            continue
+        handled_seq[intent['stream']] = intent['seq']
+
+        executor = executors.get(intent['stream'])
+        if executor is None:
+            logger.warning(f"MarketBus Router: Unknown stream {intent['stream']}")
+            continue
+        executor.run_signal(intent['category'], intent['symbol'], intent['row'])
+
+    # Processos filhos não executam os handlers de atexit
+    if recorder:
+        recorder.close()
+
+
+def run_market_bus(streams: List[StreamSpec], testnet: bool, workers: int, poll_interval: float = 5.0,
+                   risk_config: Optional[Dict] = None, signal_history=None):
+    """
+    Sobe o feed, N workers de estratégia e o roteador de ordens.
+    Os rings são criados (e removidos) por este processo.
+    """
+    workers = max(1, min(workers, len(streams)))
+    rings = [SharedCandleRing.create(spec) for spec in _unique_by_key(streams)]
+    stop_event = mp.Event()
+    intent_queue = mp.Queue(maxsize=1000)
+
+    shards = [streams[i::workers] for i in range(workers)]
+    processes = [
+        mp.Process(target=feed_process, args=(streams, testnet, poll_interval, stop_event), name="bus-feed"),
+        mp.Process(target=router_process, args=(streams, testnet, intent_queue, stop_event, risk_config, signal_history),
+                   name="bus-router"),
+    ]
+    processes += [
+        mp.Process(target=worker_process, args=(shard, intent_queue, stop_event, min(1.0, poll_interval)), name=f"bus-worker-{i}")
+        for i, shard in enumerate(shards)
+    ]
+
+    logger.info(f"MarketBus: Starting feed, router and {workers} worker(s) for {len(streams)} stream(s)")
+    for process in processes:
+        process.start()
+
+    try:
+        while not stop_event.is_set():
+            dead = [p.name for p in processes if not p.is_alive()]
+            if dead:
+                logger.error(f"MarketBus: Process(es) {dead} exited. Shutting down bus.")
+                break
+            time.sleep(1)
+    finally:
+        stop_event.set()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        for ring in rings:
+            ring.close()
@@ -1,19 +1,74 @@
-import pandas as pd
-import sys
 import time
-from src.utils.logger import logger
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Dict, Optional
+from src.utils.logger import logger, hot_log
 from src.utils.email_notifier import EmailNotifier
+from src.core.order_manager import OrderManager, REJECTED
+from src.data.candle_cache import CandleCache
+from src.data.market_data import AuxDataFeed
 from datetime import datetime
-import os
-from typing import Union, Optional, List, Dict
+
+ENTRY = "entry"
+EXIT = "exit"
+STANDBY = "standby"  # Decisão gravada no histórico quando o envio de ordens está desabilitado
+# Campos da posição que afetam a decisão (preço de marcação e PnL mudam a todo tick e ficam de fora)
+POSITION_FINGERPRINT = ('side', 'size', 'avgPrice', 'entryPrice', 'stopLoss', 'takeProfit', 'leverage')
+# Intervalo (s) entre dois logs dos contadores de ciclo
+STATS_LOG_INTERVAL = 60
+
+
+def position_fingerprint(position) -> Optional[tuple]:
+    return tuple(position.get(field) for field in POSITION_FINGERPRINT) if position else None
+
+
+def wants_entry(last_row) -> bool:
+    return last_row.get('enter_long', 0) == 1 or last_row.get('enter_short', 0) == 1
+
+
+@dataclass
+class OrderPlan:
+    """Ordem decidida pelos sinais de um ciclo, ainda não enviada."""
+    category: str
+    symbol: str
+    action: str                          # ENTRY ou EXIT
+    order_params: Dict
+    last_close: float
+    position_side: Optional[str] = None  # Lado da posição aberta pela entrada
+    reserved: bool = False               # Risco já contado antes do envio (ver reserve_risk)
+
 
 class StrategyExecutor:
-    def __init__(self, connector, strategy):
+    def __init__(self, connector, strategy, risk_engine=None, order_manager=None, order_lock=None, clock=None,
+                 trade_gate=None, signal_recorder=None):
         self.connector = connector
+        self.clock = clock  # ExchangeClock opcional: horário da corretora nos logs e notificações
+        # Função que autoriza o envio de ordens (ex: LeaderLease.check_fence no modo ativo/passivo)
+        self.trade_gate = trade_gate
         self.strategy = strategy
+        self.risk_engine = risk_engine
+        self.order_manager = order_manager or OrderManager(connector)
+        # Executores em threads que compartilham o motor de risco serializam verificação + envio
+        self.order_lock = order_lock or nullcontext()
         self.last_order_result = None
+        # Histórico buscado uma vez (no tamanho declarado pela estratégia); depois só os candles novos
+        self.candle_cache = CandleCache(connector, clock=clock)
+        # Funding, mark/index price e open interest declarados em `strategy.aux_data`
+        self.aux_feed = AuxDataFeed(connector, clock=clock)
+        self.last_candles = None  # Últimos candles recebidos (validação no hot reload)
+        # Última linha de sinais e a chave (timestamp e fechamento do último candle, posição,
+        # estratégia) com que foi calculada: enquanto a chave não muda, os sinais são reaproveitados
+        self._signal_memo = None
+        self.cycle_stats = {'cycles': 0, 'signals_reused': 0, 'balance_skipped': 0}
+        # SignalRecorder opcional: última linha de sinais, posição e decisão de cada ciclo em Parquet
+        self.signal_recorder = signal_recorder
+        # (início em perf_counter, intervalo, sinais reaproveitados) do ciclo em andamento
+        self._cycle = (time.perf_counter(), None, False)
         logger.info("Strategy Executor initialized.")
 
+    def _now(self):
+        return self.clock.now_datetime() if self.clock else datetime.now()
+
     def _get_base_asset(self, symbol):
         # Assume USDT ou USD como quote asset por enquanto
         if symbol.endswith("USDT"):
@@ -23,6 +78,14 @@ class StrategyExecutor:
         # Adicionar lógica para outros quotes se necessário
         return symbol # Fallback
 
+    def _qty_rules(self, symbol):
+        """Retorna (casas decimais, quantidade mínima) do par."""
+        if symbol == "BTCUSDT":
+            return 3, 0.001  # 3 casas decimais para BTC
+        elif symbol.endswith("USDT"):
+            return 2, 0.01  # 2 casas decimais para outros pares USDT
+        return 3, 0.001  # 3 casas decimais para outros pares
+
     def calculate_order_size(self, category, symbol, close_price):
         account_type = "UNIFIED" # ou "CONTRACT" dependendo da conta/categoria
         if category == "spot":
@@ -44,7 +107,8 @@ class StrategyExecutor:
              else:
                  quote_coin = "USDT" # Fallback
 
-        logger.info(f"Executor: Getting balance for {quote_coin} (Account: {account_type})")
+        hot_log('executor.balance_request', 'DEBUG', "Executor: Getting balance for {coin} (Account: {account_type})",
+                coin=quote_coin, account_type=account_type)
         balance_info = self.connector.get_balance(account_type=account_type, coin=quote_coin)
 
         if not balance_info or 'walletBalance' not in balance_info:
@@ -53,27 +117,22 @@ class StrategyExecutor:
 
         # Calcular o valor investido com base no investment_percent
         available_balance = float(balance_info['walletBalance'])
+        if self.risk_engine:
+            self.risk_engine.update_equity(available_balance)
         investment_percent = self.strategy.investment_percent if hasattr(self.strategy, 'investment_percent') else 100
         capital_to_use = available_balance * (investment_percent / 100)
         
-        logger.info(f"Executor: Available balance: {available_balance:.2f} {quote_coin}, Investment percent: {investment_percent}%, Capital to use: {capital_to_use:.2f} {quote_coin}")
+        hot_log('executor.balance', 'INFO',
+                "Executor: Available balance: {balance:.2f} {coin}, Investment percent: {investment_percent}%, "
+                "Capital to use: {capital:.2f} {coin}",
+                balance=available_balance, coin=quote_coin, investment_percent=investment_percent, capital=capital_to_use)
         
         # Calcular a quantidade da ordem
         order_qty = capital_to_use / close_price
         
         # Arredondar a quantidade para o número correto de casas decimais
-        if symbol == "BTCUSDT":
-            order_qty = round(order_qty, 3)  # 3 casas decimais para BTC
-            if order_qty < 0.001:
-                order_qty = 0.001  # Quantidade mínima para BTC
-        elif symbol.endswith("USDT"):
-            order_qty = round(order_qty, 2)  # 2 casas decimais para outros pares USDT
-            if order_qty < 0.01:
-                order_qty = 0.01  # Quantidade mínima para outros pares USDT
-        else:
-            order_qty = round(order_qty, 3)  # 3 casas decimais para outros pares
-            if order_qty < 0.001:
-                order_qty = 0.001  # Quantidade mínima para outros pares
+        decimals, min_qty = self._qty_rules(symbol)
+        order_qty = max(round(order_qty, decimals), min_qty)
         
         # Adicionar o valor investido ao metadata
         metadata = {
@@ -86,177 +145,407 @@ class StrategyExecutor:
         # Atualizar o metadata da estratégia
         self.strategy.update_metadata(metadata)
         
-        logger.info(f"Executor: Order size calculated - Qty: {order_qty} {self._get_base_asset(symbol)}, Value: {order_qty * close_price:.2f} {quote_coin}")
+        hot_log(('executor.order_size', symbol), 'INFO', "Executor: Order size calculated - Qty: {qty} {base}, Value: {value:.2f} {coin}",
+                qty=order_qty, base=lambda: self._get_base_asset(symbol), value=order_qty * close_price, coin=quote_coin)
         
         return order_qty
 
+    def _sync_risk(self, symbol, position, close_price):
+        """Atualiza o motor de risco com o snapshot da posição (O(1))."""
+        if not position:
+            self.risk_engine.sync_position(symbol, 0, 0, close_price)
+            return
+        size = float(position.get('size', 0))
+        if position.get('side') != 'Buy':
+            size = -size
+        mark_price = float(position.get('markPrice') or close_price)
+        self.risk_engine.sync_position(
+            symbol, size, float(position.get('avgPrice') or position.get('entryPrice') or 0),
+            mark_price, float(position.get('leverage') or 1),
+        )
+
+    def _check_risk(self, symbol, order_params, price):
+        """
+        Consulta o motor de risco antes de enviar a ordem.
+        Retorna False se a ordem foi bloqueada; pode reduzir `order_params['qty']`.
+        """
+        if not self.risk_engine:
+            return True
+        decision = self.risk_engine.check_order(
+            symbol, order_params['side'], order_params['qty'], price,
+            leverage=order_params.get('leverage') or 1,
+            reduce_only=order_params.get('reduce_only', False),
+        )
+        if not decision.allowed:
+            logger.warning(f"Executor: Order blocked by risk engine - {decision.reason}")
+            return False
+        if decision.resized:
+            decimals, min_qty = self._qty_rules(symbol)
+            factor = 10 ** decimals
+            qty = int(decision.qty * factor) / factor
+            if qty < min_qty:
+                logger.warning(f"Executor: Order blocked by risk engine - resized qty {qty} below minimum ({decision.reason})")
+                return False
+            logger.info(f"Executor: Order qty {order_params['qty']} -> {qty} ({decision.reason})")
+            order_params['qty'] = qty
+        return True
+
+    def _load_position(self, category, symbol, close_price):
+        """
+        Consulta a posição atual e sincroniza o metadata da estratégia.
+        Retorna (posição, deve_continuar). Quando a posição já tem stop loss
+        na corretora, deve_continuar é False.
+        """
+        current_position = self.connector.get_open_position(category, symbol)
+
+        if self.risk_engine:
+            self._sync_risk(symbol, current_position, close_price)
+
+        if current_position:
+            position_side = 'long' if current_position.get('side') == 'Buy' else 'short'
+            position_size = float(current_position.get('size', 0))
+            entry_price = float(current_position.get('entryPrice', 0))
+
+            # Atualizar o metadata com a posição atual
+            self.strategy.update_metadata({
+                'position_side': position_side,
+                'position_size': position_size,
+                'entry_price': entry_price,
+                'close_price': close_price  # Adicionar preço de fechamento atual
+            })
+
+            # Se tem stop loss, deixa a corretora gerenciar
+            stop_loss = current_position.get('stopLoss')
+
+            if stop_loss is not None and stop_loss != '':
+                logger.info(f"Executor: Position has stop loss set at {stop_loss}. Letting exchange handle exit.")
+                return current_position, False
+        else:
+            # Limpar o metadata da posição
+            self.strategy.update_metadata({
+                'position_side': None,
+                'position_size': 0,
+                'entry_price': 0,
+                'close_price': close_price  # Adicionar preço de fechamento atual
+            })
+
+        return current_position, True
+
+    def _execute_order(self, order_params, last_close):
+        """
+        Envia a ordem e aguarda a confirmação do fill.
+        Retorna (resumo da ordem, qty executada, preço médio) ou None se foi rejeitada.
+        """
+        # Fencing: confirma a liderança imediatamente antes de enviar
+        if self.trade_gate and not self.trade_gate():
+            logger.warning("Executor: Trade gate closed right before submit; order not sent")
+            return None
+        order = self.order_manager.submit(**order_params)
+        return self.await_fill(order, order_params, last_close)
+
+    def await_fill(self, order, order_params, last_close):
+        """
+        Aguarda a confirmação de uma ordem já enviada (individualmente ou em lote).
+        Sem confirmação dentro do timeout, usa a quantidade pedida e o último fechamento;
+        o próximo ciclo ressincroniza com a posição real.
+        """
+        if order.status == REJECTED:
+            return None
+        self.order_manager.wait(order)
+        if not order.done:
+            # Sem estado final no timeout: o próximo ciclo ressincroniza pela posição
+            self.order_manager.forget(order)
+        if order.status == REJECTED:
+            return None
+
+        summary = {
+            'orderId': order.order_id,
+            'orderLinkId': order.order_link_id,
+            'status': order.status,
+            'filled_qty': order.filled_qty,
+            'avg_price': order.avg_price,
+        }
+        self.last_order_result = summary
+        if order.confirmed:
+            return summary, order.filled_qty, order.avg_price or last_close
+        logger.warning(f"Executor: Fill not confirmed for {order.order_link_id}; assuming requested qty at last close")
+        return summary, float(order_params['qty']), last_close
+
+    def evaluate(self, category, symbol, interval):
+        """
+        Etapas do ciclo até os sinais: candles, posição, indicadores e tamanho da ordem.
+        Retorna (última linha, posição, tamanho da ordem, último fechamento) ou None se não
+        há o que decidir neste ciclo. O tamanho é None quando não há entrada a fazer.
+        """
+        self._cycle = (time.perf_counter(), interval, False)
+        # 1. Buscar candles históricos (lookback declarado pela estratégia)
+        df = self.candle_cache.get(category, symbol, interval, self.strategy.required_candles())
+        if df is None:
+            logger.info("Executor: No candles data available.")
+            return None
+        if self.strategy.aux_data:
+            df = self.aux_feed.join(category, symbol, interval, df, self.strategy.aux_data)
+        self.last_candles = df
+        
+        # 2. Verificar posição atual
+        last_close = float(df['close'].iloc[-1])
+        current_position, should_manage = self._load_position(category, symbol, last_close)
+        self.cycle_stats['cycles'] += 1
+        if not should_manage:
+            return None
+
+        # 3. Calcular indicadores e sinais, a menos que nada que os afete tenha mudado
+        key = (int(df['timestamp'].iloc[-1]), last_close, position_fingerprint(current_position), self.strategy,
+               self.aux_feed.version)
+        if self._signal_memo is not None and self._signal_memo[0] == key:
+            last_row = self._signal_memo[1]
+            self.cycle_stats['signals_reused'] += 1
+            self._cycle = (self._cycle[0], interval, True)
+        else:
+            last_row = self.strategy.calculate_signals(df, self.strategy.metadata).iloc[-1]
+            self._signal_memo = (key, last_row)
+
+        # 4. Tamanho da ordem (consulta o saldo só se houver entrada a fazer)
+        order_size = self._entry_size(category, symbol, current_position, last_row, last_close)
+        self._log_cycle_stats(symbol)
+        return last_row, current_position, order_size, last_close
+
+    def _entry_size(self, category, symbol, position, last_row, last_close):
+        """
+        O saldo só influencia entradas: com posição aberta ou sem sinal de entrada, a consulta
+        é pulada e o tamanho fica None.
+        """
+        if position or not wants_entry(last_row):
+            self.cycle_stats['balance_skipped'] += 1
+            return None
+        return self.calculate_order_size(category, symbol, last_close)
+
+    def _log_cycle_stats(self, symbol):
+        stats = self.cycle_stats
+        hot_log(('executor.cycle_stats', symbol), 'INFO',
+                "Executor: {symbol} - {signals_reused}/{cycles} cycles reused signals, "
+                "{balance_skipped} balance fetches skipped",
+                sample_interval=STATS_LOG_INTERVAL, symbol=symbol, **stats)
+
     def run(self, category, symbol, interval):
         """
         Executa a estratégia.
         """
-        logger.info(f"Executor: Starting strategy execution for {symbol} on {interval} timeframe")
+        hot_log(('executor.run', symbol), 'INFO', "Executor: Starting strategy execution for {symbol} on {interval} timeframe",
+                symbol=symbol, interval=interval)
         
         try:
-            # 1. Buscar candles históricos
-            df = self.connector.get_historical_candles(category, symbol, interval)
-            if df is None:
-                logger.info("Executor: No candles data available.")
-                return
-            
-            # 2. Verificar posição atual
-            current_position = self.connector.get_open_position(category, symbol)
+            evaluated = self.evaluate(category, symbol, interval)
+            if evaluated:
+                # 5. Verificar sinais de entrada/saída e executar ordens se necessário
+                self.execute_signals(category, symbol, *evaluated)
             
-            if current_position:
-                position_side = 'long' if current_position.get('side') == 'Buy' else 'short'
-                position_size = float(current_position.get('size', 0))
-                entry_price = float(current_position.get('entryPrice', 0))
-                
-                # Atualizar o metadata com a posição atual
-                self.strategy.update_metadata({
-                    'position_side': position_side,
-                    'position_size': position_size,
-                    'entry_price': entry_price,
-                    'close_price': df['close'].iloc[-1]  # Adicionar preço de fechamento atual
-                })
+        except Exception as e:
+            logger.error(f"Executor Error: {e}")
+            logger.exception("Detailed error information:")
 
-                # Se tem stop loss, deixa a corretora gerenciar
-                stop_loss = current_position.get('stopLoss')
-                
-                if stop_loss is not None and stop_loss != '':
-                    logger.info(f"Executor: Position has stop loss set at {stop_loss}. Letting exchange handle exit.")
-                    return
+    def run_signal(self, category, symbol, last_row):
+        """
+        Executa ordens a partir de uma linha de sinais já calculada em outro processo.
+        `last_row` é um dict (ou Series) com close e as colunas de sinais.
+        Retorna False se o processamento falhou com exceção.
+        """
+        hot_log(('executor.signal', symbol), 'INFO', "Executor: Processing signal intent for {symbol}", symbol=symbol)
+        self.last_order_result = None
+        self._cycle = (time.perf_counter(), None, False)
+
+        try:
+            last_close = float(last_row['close'])
+            current_position, should_manage = self._load_position(category, symbol, last_close)
+            if not should_manage:
+                return True
+
+            order_size = self._entry_size(category, symbol, current_position, last_row, last_close)
+            self.execute_signals(category, symbol, last_row, current_position, order_size, last_close)
+            return True
+
+        except Exception as e:
+            logger.error(f"Executor Error: {e}")
+            logger.exception("Detailed error information:")
+            return False
+
+    def execute_signals(self, category, symbol, last_row, current_position, order_size, last_close):
+        """Verifica os sinais da última linha e envia as ordens de entrada/saída."""
+        if self.trade_gate and not self.trade_gate():
+            # Standby: candles, indicadores e posição seguem atualizados, mas sem ordens
+            logger.info(f"Executor: Standby - signals evaluated for {symbol}, order placement disabled")
+            self.record_signals(category, symbol, last_row, current_position, order_size, STANDBY)
+            return
+        with self.order_lock:
+            plan = self.plan_order(category, symbol, last_row, current_position, order_size, last_close)
+            if plan:
+                self.complete_order(plan, self._execute_order(plan.order_params, last_close))
+
+    def plan_order(self, category, symbol, last_row, current_position, order_size, last_close) -> Optional[OrderPlan]:
+        """
+        Decide a ordem do ciclo a partir da última linha de sinais, sem enviá-la.
+        Entradas já passam pela verificação pré-trade (que pode reduzir a quantidade).
+        """
+        plan = self._decide(category, symbol, last_row, current_position, order_size, last_close)
+        self.record_signals(category, symbol, last_row, current_position, order_size, plan.action if plan else None)
+        return plan
+
+    def record_signals(self, category, symbol, last_row, current_position, order_size, decision):
+        """Envia a linha de sinais do ciclo, com posição, decisão e latência, ao SignalRecorder."""
+        if self.signal_recorder is None:
+            return
+        started, interval, reused = self._cycle
+        self.signal_recorder.record(
+            last_row,
+            recorded_at=self.clock.now_ms() if self.clock else int(time.time() * 1000),
+            strategy=self.strategy.name,
+            account=getattr(self.connector, 'account', None),
+            category=category,
+            symbol=symbol,
+            interval=interval,
+            position_side=current_position.get('side') if current_position else None,
+            position_size=float(current_position.get('size', 0)) if current_position else 0.0,
+            position_price=float(current_position.get('avgPrice') or 0) if current_position else 0.0,
+            order_size=order_size,
+            decision=decision,
+            signals_reused=reused,
+            latency_ms=(time.perf_counter() - started) * 1000,
+        )
+
+    def _decide(self, category, symbol, last_row, current_position, order_size, last_close) -> Optional[OrderPlan]:
+        if current_position:
+            position_side = 'long' if current_position.get('side') == 'Buy' else 'short'
+            position_size = float(current_position.get('size', 0))
+
+            # Posicionado - Verificar sinais de saída
+            if position_side == 'long' and last_row.get('exit_long', 0) == 1:
+                logger.info("Executor: Signal to exit LONG position")
+                close_side = 'Sell'
+            elif position_side == 'short' and last_row.get('exit_short', 0) == 1:
+                logger.info("Executor: Signal to exit SHORT position")
+                close_side = 'Buy'
             else:
+                return None
+
+            # Preparar parâmetros da ordem de fechamento
+            order_params = {
+                'category': category,
+                'symbol': symbol,
+                'side': close_side,
+                'order_type': 'Market',
+                'qty': position_size,
+                'reduce_only': True
+            }
+            return OrderPlan(category, symbol, EXIT, order_params, last_close)
+
+        # Não posicionado - Verificar sinais de entrada
+        if last_row.get('enter_long', 0) == 1:
+            logger.info(f"Executor: Signal to enter LONG position with size {order_size}")
+            entry_side = 'Buy'
+            new_position_side = 'long'
+        elif last_row.get('enter_short', 0) == 1:
+            logger.info(f"Executor: Signal to enter SHORT position with size {order_size}")
+            entry_side = 'Sell'
+            new_position_side = 'short'
+        else:
+            return None
+        if not order_size:
+            # Saldo indisponível (o erro já foi logado em calculate_order_size)
+            return None
+
+        # Preparar parâmetros da ordem de entrada
+        order_params = {
+            'category': category,
+            'symbol': symbol,
+            'side': entry_side,
+            'order_type': 'Market',
+            'qty': order_size
+        }
+        
+        # Adicionar stop loss e take profit se disponíveis
+        if 'stop_loss' in last_row:
+            sl_value = float(last_row['stop_loss'])
+            if sl_value > 0:
+                order_params['stop_loss'] = sl_value
+        
+        if 'take_profit' in last_row:
+            tp_value = float(last_row['take_profit'])
+            if tp_value > 0:
+                order_params['take_profit'] = tp_value
+        
+        # Adicionar alavancagem da estratégia
+        order_params['leverage'] = self.strategy.leverage
+
+        # Verificação pré-trade (pode bloquear ou reduzir a ordem)
+        if not self._check_risk(symbol, order_params, last_close):
+            return None
+        return OrderPlan(category, symbol, ENTRY, order_params, last_close, new_position_side)
+
+    def reserve_risk(self, plan: OrderPlan):
+        """
+        Conta a entrada no motor de risco antes do envio (qty pedida no último fechamento), para
+        que as próximas ordens do mesmo lote sejam verificadas já com ela. `complete_order`
+        desfaz a reserva se a ordem for rejeitada; o próximo ciclo ressincroniza com a posição real.
+        """
+        if self.risk_engine and plan.action == ENTRY:
+            params = plan.order_params
+            self.risk_engine.on_fill(plan.symbol, params['side'], params['qty'], plan.last_close, self.strategy.leverage or 1)
+            plan.reserved = True
+
+    def complete_order(self, plan: OrderPlan, execution):
+        """Atualiza risco, metadata e notificações com o resultado da ordem planejada."""
+        symbol, last_close, side = plan.symbol, plan.last_close, plan.order_params['side']
+        if plan.action == EXIT:
+            if execution:
+                order_result, filled_qty, fill_price = execution
+                logger.info(f"Executor: Position closed successfully - {order_result}")
+                if self.risk_engine:
+                    self.risk_engine.on_fill(symbol, side, filled_qty, fill_price)
+                
                 # Limpar o metadata da posição
                 self.strategy.update_metadata({
                     'position_side': None,
                     'position_size': 0,
                     'entry_price': 0,
-                    'close_price': df['close'].iloc[-1]  # Adicionar preço de fechamento atual
+                    'close_price': last_close,
+                    'last_order': order_result
                 })
-            
-            # 3. Calcular o valor investido antes de chamar a estratégia
-            last_close = float(df['close'].iloc[-1])
-            order_size = self.calculate_order_size(category, symbol, last_close)
-            
-            if order_size:
-                # 4. Calcular indicadores e sinais
-                df = self.strategy.calculate_signals(df, self.strategy.metadata)
-                
-                # 5. Verificar sinais de entrada/saída
-                last_row = df.iloc[-1]
-                
-                # 6. Executar ordens se necessário
-                if current_position:
-                    # Posicionado - Verificar sinais de saída
-                    should_close = False
-                    
-                    if position_side == 'long' and last_row.get('exit_long', 0) == 1:
-                        logger.info("Executor: Signal to exit LONG position")
-                        should_close = True
-                        close_side = 'Sell'
-                    elif position_side == 'short' and last_row.get('exit_short', 0) == 1:
-                        logger.info("Executor: Signal to exit SHORT position")
-                        should_close = True
-                        close_side = 'Buy'
-                    
-                    if should_close:
-                        # Preparar parâmetros da ordem de fechamento
-                        order_params = {
-                            'category': category,
-                            'symbol': symbol,
-                            'side': close_side,
-                            'order_type': 'Market',
-                            'qty': position_size,
-                            'reduce_only': True
-                        }
-                        
-                        # Executar a ordem
-                        order_result = self.connector.place_order(**order_params)
-                        if order_result:
-                            logger.info(f"Executor: Position closed successfully - {order_result}")
-                            
-                            # Limpar o metadata da posição
-                            self.strategy.update_metadata({
-                                'position_side': None,
-                                'position_size': 0,
-                                'entry_price': 0,
-                                'close_price': last_close,
-                                'last_order': order_result
-                            })
-                        else:
-                            logger.error("Executor Error: Failed to close position")
-                
-                else:
-                    # Não posicionado - Verificar sinais de entrada
-                    should_enter = False
-                    
-                    if last_row.get('enter_long', 0) == 1:
-                        logger.info(f"Executor: Signal to enter LONG position with size {order_size}")
-                        should_enter = True
-                        entry_side = 'Buy'
-                        new_position_side = 'long'
-                    elif last_row.get('enter_short', 0) == 1:
-                        logger.info(f"Executor: Signal to enter SHORT position with size {order_size}")
-                        should_enter = True
-                        entry_side = 'Sell'
-                        new_position_side = 'short'
-                    
-                    if should_enter:
-                        # Preparar parâmetros da ordem de entrada
-                        order_params = {
-                            'category': category,
-                            'symbol': symbol,
-                            'side': entry_side,
-                            'order_type': 'Market',
-                            'qty': order_size
-                        }
-                        
-                        # Adicionar stop loss e take profit se disponíveis
-                        if 'stop_loss' in last_row:
-                            sl_value = float(last_row['stop_loss'])
-                            if sl_value > 0:
-                                order_params['stop_loss'] = sl_value
-                        
-                        if 'take_profit' in last_row:
-                            tp_value = float(last_row['take_profit'])
-                            if tp_value > 0:
-                                order_params['take_profit'] = tp_value
-                        
-                        # Adicionar alavancagem da estratégia
-                        order_params['leverage'] = self.strategy.leverage
-                        
-                        # Executar a ordem
-                        order_result = self.connector.place_order(**order_params)
-                        if order_result:
-                            logger.info(f"Executor: Order placed successfully - {order_result}")
-                            
-                            # Atualizar o metadata com o resultado da ordem
-                            self.strategy.update_metadata({
-                                'last_order': order_result,
-                                'position_side': new_position_side,
-                                'position_size': order_size,
-                                'entry_price': last_close,
-                                'close_price': last_close
-                            })
-                            
-                            # Envia notificação por email
-                            EmailNotifier().send_email(
-                                subject=f"Robô executou uma ordem - {symbol} - {entry_side} - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
-                                content={
-                                    "title": "Ordem Executada",
-                                    "symbol": symbol,
-                                    "side": entry_side,
-                                    "price": last_close,
-                                    "quantity": order_size,
-                                    "leverage": self.strategy.leverage,
-                                    "stop_loss": order_params.get('stop_loss'),
-                                    "take_profit": order_params.get('take_profit')    
-                                }
-                            )
-                        else:
-                            logger.error("Executor Error: Failed to place order")
-            
-        except Exception as e:
-            logger.error(f"Executor Error: {e}")
-            logger.exception("Detailed error information:")
+            else:
+                logger.error("Executor Error: Failed to close position")
+            return
 
+        if not execution:
+            if plan.reserved:
+                opposite = 'Sell' if side == 'Buy' else 'Buy'
+                self.risk_engine.on_fill(symbol, opposite, plan.order_params['qty'], last_close)
+            logger.error("Executor Error: Failed to place order")
+            return
+
+        order_result, filled_qty, fill_price = execution
+        logger.info(f"Executor: Order placed successfully - {order_result}")
+        if self.risk_engine and not plan.reserved:
+            self.risk_engine.on_fill(symbol, side, filled_qty, fill_price, self.strategy.leverage or 1)
+        
+        # Atualizar o metadata com a execução real (quantidade e preço médio)
+        self.strategy.update_metadata({
+            'last_order': order_result,
+            'position_side': plan.position_side,
+            'position_size': filled_qty,
+            'entry_price': fill_price,
+            'close_price': last_close
+        })
+        
+        # Envia notificação por email
+        EmailNotifier().send_email(
+            subject=f"Robô executou uma ordem - {symbol} - {side} - {self._now().strftime('%Y-%m-%d %H:%M:%S')}",
+            content={
+                "title": "Ordem Executada",
+                "symbol": symbol,
+                "side": side,
+                "price": fill_price,
+                "quantity": filled_qty,
+                "leverage": self.strategy.leverage,
+                "stop_loss": plan.order_params.get('stop_loss'),
+                "take_profit": plan.order_params.get('take_profit')    
+            }
+        )
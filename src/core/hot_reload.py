@@ -0,0 +1,209 @@
+import json
+import os
+import threading
+from typing import Dict, Optional
+from src.connector.responses import CANDLE_COLUMNS
+from src.core.risk_engine import RiskEngine, RiskLimits
+from src.core.strategy_loader import (
+    BASE_CLASS, STRATEGIES_DIR, import_strategy_isolated, register_strategy_module,
+)
+from src.data.market_data import AUX_SERIES
+from src.utils.config_loader import STRATEGY_OVERRIDES
+from src.utils.logger import logger
+
+SIGNAL_COLUMNS = ['enter_long', 'enter_short', 'exit_long', 'exit_short']
+# Mudanças nestas chaves exigem reiniciar o processo (conexões, processos e agendamento já montados)
+RESTART_KEYS = ['pair', 'timeframe', 'category', 'workers', 'portfolio', 'scanner', 'schedule', 'ha',
+                'resilience', 'order_stream', 'shared_indicators', 'supervisor', 'hot_reload']
+
+
+class HotReloadCandidate:
+    """Nova versão validada, pronta para entrar no executor entre dois ciclos."""
+
+    def __init__(self, config, raw_config, strategy=None, module=None):
+        self.config = config
+        self.raw_config = raw_config
+        self.strategy = strategy
+        self.module = module
+
+
+class StrategyReloader:
+    """
+    Recarrega estratégia e config sem reiniciar o loop.
+
+    Uma thread consulta o mtime de `strategies/*.py` e do arquivo de config. Quando o módulo
+    da estratégia ativa (ou a seção relevante do config) muda, a nova versão é importada
+    isoladamente — sem tocar em `sys.modules` —, instanciada e validada nos últimos candles
+    do executor. Só um candidato aprovado fica pendente; `apply()`, chamado pelo loop
+    principal entre ciclos, troca a estratégia de uma vez, preservando o metadata (posição,
+    última ordem). Se a validação falha, nada é trocado e a versão atual segue rodando.
+    """
+
+    def __init__(self, executor, params: Dict, poll_interval=1.0):
+        self.executor = executor
+        self.config_path = params['config_path_used']
+        self.poll_interval = poll_interval
+        self.config = self._reloadable(params)
+        try:
+            self._raw_config = self._read_config()
+        except (OSError, ValueError):
+            self._raw_config = {}
+        self._mtimes = self._scan()
+        self._rejected = set()
+        self._pending: Optional[HotReloadCandidate] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _reloadable(config: Dict) -> Dict:
+        """Parte do config que pode mudar a quente."""
+        overrides = config.get('overrides')
+        if overrides is None:
+            overrides = {k: config[k] for k in STRATEGY_OVERRIDES if k in config}
+        return {'strategy': config.get('strategy'), 'overrides': overrides, 'risk': config.get('risk') or {}}
+
+    def _scan(self) -> Dict[str, int]:
+        paths = [os.path.join(STRATEGIES_DIR, name) for name in os.listdir(STRATEGIES_DIR) if name.endswith('.py')]
+        paths.append(self.config_path)
+        mtimes = {}
+        for path in paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return mtimes
+
+    def _read_config(self) -> Dict:
+        with open(self.config_path) as f:
+            config = json.load(f)
+        if not isinstance(config, dict):
+            raise ValueError("config must be a JSON object")
+        return config
+
+    def _validate(self, strategy):
+        """Roda a estratégia candidata nos candles em cache do executor (cópia, sem efeitos)."""
+        candles = getattr(self.executor, 'last_candles', None)
+        if candles is None or candles.empty:
+            logger.warning("Hot reload: No cached candles yet; candidate validated by instantiation only")
+            return
+        frame = candles[[c for c in CANDLE_COLUMNS + list(AUX_SERIES) if c in candles]].copy()
+        frame = strategy.calculate_signals(frame, dict(self.executor.strategy.metadata))
+        missing = [c for c in SIGNAL_COLUMNS if c not in frame]
+        if missing:
+            raise ValueError(f"signals missing from result: {missing}")
+        if len(frame) != len(candles):
+            raise ValueError(f"result has {len(frame)} rows, expected {len(candles)}")
+
+    def _prepare(self, changed, current: Dict, current_raw: Dict) -> Optional[HotReloadCandidate]:
+        """Monta e valida o candidato para os arquivos alterados (None se não há o que trocar)."""
+        config, raw_config = current, current_raw
+        if self.config_path in changed:
+            raw_config = self._read_config()
+            restart = [k for k in RESTART_KEYS if raw_config.get(k) != current_raw.get(k)]
+            if restart:
+                logger.warning(f"Hot reload: Changes to {restart} are only applied on restart")
+            # Só o que mudou no arquivo é aplicado (valores vindos da CLI continuam valendo)
+            new, old = self._reloadable(raw_config), self._reloadable(current_raw)
+            config = {key: new[key] if new[key] != old[key] else value for key, value in current.items()}
+            config['strategy'] = config['strategy'] or current['strategy']
+
+        strategy_file = os.path.join(STRATEGIES_DIR, f"{config['strategy']}.py")
+        if os.path.join(STRATEGIES_DIR, 'base_strategy.py') in changed:
+            logger.warning(f"Hot reload: {BASE_CLASS} changed; restart the process to apply it")
+
+        if config == current and strategy_file not in changed:
+            if raw_config is not current_raw:
+                return HotReloadCandidate(config, raw_config)
+            return None
+
+        candidate = HotReloadCandidate(config, raw_config)
+        if strategy_file in changed or config['strategy'] != current['strategy'] \
+                or config['overrides'] != current['overrides']:
+            module, strategy_class = import_strategy_isolated(config['strategy'])
+            strategy = strategy_class(config=self.executor.strategy.config)
+            for attr, value in config['overrides'].items():
+                setattr(strategy, attr, value)
+            self._validate(strategy)
+            candidate.strategy, candidate.module = strategy, module
+        if config['risk']:
+            RiskLimits.from_dict(config['risk'])
+        return candidate
+
+    def check(self):
+        """Verifica alterações e, se houver, prepara um candidato validado."""
+        mtimes = self._scan()
+        changed = {path for path, mtime in mtimes.items() if self._mtimes.get(path) != mtime}
+        if not changed:
+            return
+        self._mtimes = mtimes
+        # Arquivos de uma mudança rejeitada são reavaliados junto com a próxima
+        changed |= self._rejected
+        with self._lock:
+            pending = self._pending
+        # Mudanças em sequência antes do próximo ciclo se acumulam sobre o candidato pendente
+        current, current_raw = (pending.config, pending.raw_config) if pending else (self.config, self._raw_config)
+        try:
+            candidate = self._prepare(changed, current, current_raw)
+        except Exception as e:
+            logger.error(f"Hot reload: Rejected change to {sorted(os.path.basename(p) for p in changed)}; "
+                         f"keeping current version - {type(e).__name__}: {e}")
+            self._rejected = changed
+            return
+        self._rejected = set()
+        if candidate is not None:
+            with self._lock:
+                if candidate.strategy is None and self._pending is not None:
+                    candidate.strategy, candidate.module = self._pending.strategy, self._pending.module
+                self._pending = candidate
+            if candidate.strategy is not None or candidate.config != current:
+                logger.info("Hot reload: Change validated; will apply before next cycle")
+
+    def apply(self) -> bool:
+        """Troca atômica entre ciclos. Retorna True se algo foi aplicado."""
+        with self._lock:
+            candidate, self._pending = self._pending, None
+        if candidate is None:
+            return False
+
+        executor = self.executor
+        if candidate.strategy is not None:
+            previous = executor.strategy
+            # Estado em memória (posição, última ordem) segue com a nova instância
+            candidate.strategy.metadata = previous.metadata
+            register_strategy_module(candidate.module)
+            executor.strategy = candidate.strategy
+            logger.info(f"Hot reload: Strategy {previous.name} -> {candidate.strategy.name} "
+                        f"({candidate.module.__name__})")
+
+        if candidate.config['risk'] != self.config['risk']:
+            if not candidate.config['risk']:
+                executor.risk_engine = None
+            elif executor.risk_engine is None:
+                # Posições são sincronizadas no próximo ciclo
+                executor.risk_engine = RiskEngine.from_config(candidate.config['risk'])
+            else:
+                executor.risk_engine.limits = RiskLimits.from_dict(candidate.config['risk'])
+            logger.info(f"Hot reload: Risk limits updated - {candidate.config['risk']}")
+
+        self.config = candidate.config
+        self._raw_config = candidate.raw_config
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Hot reload: Watcher error - {e}")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="hot-reload", daemon=True)
+        self._thread.start()
+        logger.info(f"Hot reload: Watching {STRATEGIES_DIR} and {self.config_path}")
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval * 2)
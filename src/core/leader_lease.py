@@ -0,0 +1,131 @@
+import fcntl
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+from src.utils.logger import logger
+
+
+class LeaderLease:
+    """
+    Eleição ativo/passivo entre instâncias no mesmo host através de um arquivo de lease.
+
+    O líder renova o lease a cada `renew_interval`; o standby consulta a cada `poll_interval`
+    e assume assim que o lease expira, incrementando o `epoch` (token de fencing). Antes de
+    cada ordem o executor chama `check_fence`, que confirma no arquivo que o epoch ainda é o
+    nosso — um líder antigo que travou e voltou não consegue mais operar. O líder também se
+    considera inválido um pouco antes do lease expirar (`self_fence_ratio`), de modo que as
+    janelas de operação das duas instâncias nunca se sobrepõem.
+    """
+
+    def __init__(self, path, ttl=3.0, renew_interval=0.5, poll_interval=0.2, self_fence_ratio=0.8, owner=None):
+        self.path = path
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.poll_interval = poll_interval
+        self.self_fence_ratio = self_fence_ratio
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        self.epoch: Optional[int] = None
+        self.promoted = threading.Event()  # Sinalizado quando esta instância vira líder
+        self._valid_until = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> Optional["LeaderLease"]:
+        """Cria o lease a partir da seção `ha` do config (None se ausente)."""
+        if not config:
+            return None
+        config = dict(config)
+        return cls(config.pop('lease_path', os.path.join('logs', 'leader.lease')), **config)
+
+    @contextmanager
+    def _locked(self, mode=fcntl.LOCK_EX):
+        with open(f"{self.path}.lock", 'a') as lock_file:
+            fcntl.flock(lock_file, mode)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read(self) -> Optional[Dict]:
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write(self, record):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(record, f)
+        os.replace(tmp_path, self.path)
+
+    def is_leader(self) -> bool:
+        """Checagem local e barata: somos líderes e o lease ainda está dentro da validade."""
+        return self.epoch is not None and time.monotonic() < self._valid_until
+
+    def check_fence(self) -> bool:
+        """Porta de negociação: confirma no arquivo que o lease ainda é nosso (mesmo epoch)."""
+        if not self.is_leader():
+            return False
+        with self._locked(fcntl.LOCK_SH):
+            current = self._read()
+        return bool(current) and current.get('owner') == self.owner and current.get('epoch') == self.epoch
+
+    def try_acquire(self) -> bool:
+        """Renova o lease se for nosso ou o assume se expirou. Retorna se somos líderes."""
+        renewed_at = time.monotonic()
+        with self._locked():
+            current = self._read()
+            now = time.time()
+            ours = current is not None and current.get('owner') == self.owner and current.get('epoch') == self.epoch
+            if not ours:
+                if current is not None and current.get('expires_at', 0) > now:
+                    self.epoch = None
+                    return False
+                self.epoch = (current.get('epoch', 0) if current else 0) + 1
+            self._write({'owner': self.owner, 'epoch': self.epoch, 'pid': os.getpid(), 'expires_at': now + self.ttl})
+        self._valid_until = renewed_at + self.ttl * self.self_fence_ratio
+        if not ours:
+            logger.warning(f"Lease: {self.owner} is now the leader (epoch {self.epoch})")
+            self.promoted.set()
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            was_leader = self.epoch is not None
+            try:
+                leader = self.try_acquire()
+            except OSError as e:
+                logger.error(f"Lease: Could not access {self.path} - {e}")
+                leader = self.is_leader()
+            if was_leader and not leader:
+                logger.error(f"Lease: {self.owner} lost leadership; order placement disabled")
+            self._stop.wait(self.renew_interval if leader else self.poll_interval)
+
+    def start(self):
+        leader = self.try_acquire()
+        if not leader:
+            current = self._read() or {}
+            logger.info(f"Lease: Standing by; leader is {current.get('owner')} (epoch {current.get('epoch')})")
+        self._thread = threading.Thread(target=self._run, name="leader-lease", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, release=True):
+        """Para a renovação; com `release`, expira o lease para o standby assumir na hora."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.renew_interval * 2)
+        if release and self.epoch is not None:
+            with self._locked():
+                current = self._read()
+                if current and current.get('owner') == self.owner and current.get('epoch') == self.epoch:
+                    self._write({**current, 'expires_at': 0})
+                    logger.info(f"Lease: Released leadership (epoch {self.epoch})")
+        self.epoch = None
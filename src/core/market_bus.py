@@ -0,0 +1,220 @@
+import hashlib
+import time
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.utils.logger import logger
+
+CANDLE_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume', 'turnover']
+
+# Cabeçalho do bloco compartilhado (int64): sequência (seqlock), total de linhas escritas, último timestamp
+HEADER_SLOTS = 8
+SEQ, WRITTEN, LAST_TS = 0, 1, 2
+# Leituras do seqlock em espera ativa antes de começar a ceder a CPU ao escritor
+SPIN_READS = 100
+
+
+@dataclass(frozen=True)
+class StreamSpec:
+    """Descreve um fluxo símbolo/intervalo publicado no barramento."""
+    category: str
+    symbol: str
+    interval: str
+    strategy: str
+    indicator_columns: Tuple[str, ...] = ()
+    capacity: int = 1000
+    overrides: Tuple[Tuple[str, Any], ...] = ()
+
+    @property
+    def indicator_tag(self) -> str:
+        """
+        Identifica quem calcula os indicadores compartilhados (estratégia e overrides). Vazio
+        quando o ring só tem candles e pode ser lido por qualquer estratégia.
+        """
+        if not self.indicator_columns:
+            return ""
+        return hashlib.sha1(repr((self.strategy, self.overrides)).encode()).hexdigest()[:8]
+
+    @property
+    def key(self) -> str:
+        """
+        Chave do ring. Com indicadores compartilhados, inclui a estratégia e os overrides que os
+        calculam: streams com parâmetros diferentes no mesmo par não leem indicadores alheios.
+        """
+        base = f"{self.category}:{self.symbol}:{self.interval}"
+        return f"{base}:{self.indicator_tag}" if self.indicator_columns else base
+
+    @property
+    def strategy_key(self) -> str:
+        return f"{self.key}:{self.strategy}"
+
+    @property
+    def columns(self) -> List[str]:
+        return CANDLE_COLUMNS + list(self.indicator_columns)
+
+    @property
+    def shm_name(self) -> str:
+        name = f"robo_{self.category}_{self.symbol}_{self.interval}"
+        return (f"{name}_{self.indicator_tag}" if self.indicator_columns else name).lower()
+
+
+class SharedCandleRing:
+    """
+    Ring buffer de candles/indicadores em memória compartilhada (float64).
+
+    Cada linha é gravada duas vezes (posições i e i + capacity), de modo que as
+    últimas N linhas formam sempre uma fatia contígua e podem ser lidas sem cópia.
+    A consistência entre escritor e leitores é garantida por um seqlock: o contador
+    fica ímpar durante a escrita e o leitor valida que ele não mudou.
+    """
+
+    def __init__(self, spec: StreamSpec, shm: shared_memory.SharedMemory, owner: bool):
+        self.spec = spec
+        self.owner = owner
+        self._shm = shm
+        self._header = np.ndarray((HEADER_SLOTS,), dtype=np.int64, buffer=shm.buf)
+        self._data = np.ndarray(
+            (2 * spec.capacity, len(spec.columns)),
+            dtype=np.float64,
+            buffer=shm.buf,
+            offset=HEADER_SLOTS * 8,
+        )
+
+    @staticmethod
+    def _size(spec: StreamSpec) -> int:
+        return HEADER_SLOTS * 8 + 2 * spec.capacity * len(spec.columns) * 8
+
+    @classmethod
+    def create(cls, spec: StreamSpec) -> "SharedCandleRing":
+        """Cria o bloco (processo dono). Remove um bloco órfão com o mesmo nome."""
+        try:
+            stale = shared_memory.SharedMemory(name=spec.shm_name)
+            stale.close()
+            stale.unlink()
+            logger.warning(f"MarketBus: Removed stale shared memory block {spec.shm_name}")
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=spec.shm_name, create=True, size=cls._size(spec))
+        ring = cls(spec, shm, owner=True)
+        ring._header[:] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, spec: StreamSpec) -> "SharedCandleRing":
+        """Conecta a um bloco existente sem assumir a posse dele."""
+        # Os processos filhos compartilham o resource_tracker do processo dono,
+        # então o bloco só é removido por `close()` do dono
+        shm = shared_memory.SharedMemory(name=spec.shm_name)
+        return cls(spec, shm, owner=False)
+
+    @property
+    def seq(self) -> int:
+        return int(self._header[SEQ])
+
+    @property
+    def written(self) -> int:
+        return int(self._header[WRITTEN])
+
+    def _put(self, row: np.ndarray):
+        capacity = self.spec.capacity
+        pos = int(self._header[WRITTEN]) % capacity
+        self._data[pos] = row
+        self._data[pos + capacity] = row
+        self._header[WRITTEN] += 1
+
+    def _last_pos(self) -> int:
+        return (int(self._header[WRITTEN]) - 1) % self.spec.capacity
+
+    def _replace_last(self, row: np.ndarray):
+        pos = self._last_pos()
+        self._data[pos] = row
+        self._data[pos + self.spec.capacity] = row
+
+    def write(self, dataframe: pd.DataFrame) -> int:
+        """
+        Publica um DataFrame de candles (ordem crescente de timestamp).
+        Linhas antigas são ignoradas, o candle em formação é sobrescrito (se mudou) e os novos
+        são anexados. Sem nada novo, nada é escrito e `seq` não muda. Retorna o número de
+        linhas gravadas.
+        """
+        columns = self.spec.columns
+        missing = [c for c in columns if c not in dataframe.columns]
+        if missing:
+            raise ValueError(f"MarketBus: Missing columns for {self.spec.key}: {missing}")
+
+        rows = dataframe[columns].to_numpy(dtype=np.float64)
+        last_ts = int(self._header[LAST_TS])
+        has_rows = self._header[WRITTEN] > 0
+        timestamps = rows[:, 0].astype(np.int64)
+        start = np.searchsorted(timestamps, last_ts, side='left') if has_rows else 0
+        rows = rows[start:]
+        if has_rows and len(rows) and int(rows[0, 0]) == last_ts \
+                and np.array_equal(rows[0], self._data[self._last_pos()], equal_nan=True):
+            rows = rows[1:]
+        if len(rows) == 0:
+            return 0
+
+        self._header[SEQ] += 1
+        try:
+            for row in rows:
+                if has_rows and int(row[0]) == int(self._header[LAST_TS]):
+                    self._replace_last(row)
+                else:
+                    self._put(row)
+                    has_rows = True
+                self._header[LAST_TS] = int(row[0])
+        finally:
+            self._header[SEQ] += 1
+        return len(rows)
+
+    def view(self, n: Optional[int] = None) -> Tuple[int, np.ndarray]:
+        """
+        Retorna (seq, array) com as últimas N linhas, sem cópia e somente leitura.
+        O chamador deve conferir `seq` após usar o array (ver `is_consistent`).
+        """
+        reads = 0
+        while True:
+            seq = self.seq
+            if seq % 2 == 0:
+                break
+            reads += 1
+            if reads >= SPIN_READS:
+                # Escrita longa em andamento: cede a CPU em vez de girar
+                time.sleep(0.0005)
+        capacity = self.spec.capacity
+        written = int(self._header[WRITTEN])
+        available = min(written, capacity)
+        n = available if n is None else min(n, available)
+        if n == 0:
+            return seq, self._data[:0]
+        end = (written - 1) % capacity + capacity + 1
+        array = self._data[end - n:end]
+        array.flags.writeable = False
+        return seq, array
+
+    def is_consistent(self, seq: int) -> bool:
+        """Indica se nenhuma escrita ocorreu desde a leitura feita com `seq`."""
+        return self.seq == seq
+
+    def frame(self, n: Optional[int] = None) -> Tuple[int, pd.DataFrame]:
+        """Monta um DataFrame sobre a memória compartilhada (apenas o timestamp é copiado)."""
+        seq, array = self.view(n)
+        dataframe = pd.DataFrame(array, columns=self.spec.columns, copy=False)
+        dataframe['timestamp'] = array[:, 0].astype(np.int64)
+        return seq, dataframe
+
+    def close(self):
+        self._header = None
+        self._data = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Ainda existem DataFrames apontando para o bloco; o SO libera no fim do processo
+            logger.warning(f"MarketBus: Shared memory {self.spec.shm_name} still referenced on close")
+        if self.owner:
+            try:
+                self._shm.unlink()
+            except FileNotFoundError:
+                pass
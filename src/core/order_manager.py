@@ -0,0 +1,223 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from src.connector.resilience import new_order_link_id
+from src.utils.logger import logger
+
+SUBMITTED = "submitted"
+PARTIALLY_FILLED = "partially_filled"
+FILLED = "filled"
+CANCELLED = "cancelled"
+REJECTED = "rejected"
+
+FINAL_STATUSES = {FILLED, CANCELLED, REJECTED}
+
+# orderStatus da API v5 -> estado interno
+BYBIT_STATUS = {
+    'Created': SUBMITTED,
+    'New': SUBMITTED,
+    'Untriggered': SUBMITTED,
+    'Triggered': SUBMITTED,
+    'PartiallyFilled': PARTIALLY_FILLED,
+    'Filled': FILLED,
+    'Cancelled': CANCELLED,
+    'PartiallyFilledCanceled': CANCELLED,
+    'Deactivated': CANCELLED,
+    'Rejected': REJECTED,
+}
+
+
+@dataclass
+class TrackedOrder:
+    order_link_id: str
+    category: str
+    symbol: str
+    side: str
+    qty: float
+    reduce_only: bool = False
+    order_id: Optional[str] = None
+    status: str = SUBMITTED
+    filled_qty: float = 0.0
+    avg_price: float = 0.0
+    submitted_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    # Execuções já somadas (por execId) e seus totais; os snapshots da ordem trazem o acumulado
+    _exec_ids: set = field(default_factory=set, repr=False)
+    _exec_qty: float = field(default=0.0, repr=False)
+    _exec_notional: float = field(default=0.0, repr=False)
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    @property
+    def confirmed(self) -> bool:
+        """Há execução confirmada pela corretora (total ou parcial)."""
+        return self.filled_qty > 0
+
+
+class OrderManager:
+    """
+    Acompanha cada ordem de submitted até partially_filled/filled/cancelled/rejected.
+
+    As atualizações chegam pelo stream privado de ordens/execuções (`attach_stream`) ou,
+    na falta dele, por polling do conector. `wait` retorna assim que o fill é confirmado,
+    com a quantidade e o preço médio reais da execução.
+    """
+
+    def __init__(self, connector, poll_interval=0.25, timeout=5.0):
+        self.connector = connector
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.orders: Dict[str, TrackedOrder] = {}
+        self._lock = threading.Lock()
+        self.streaming = False
+
+    def attach_stream(self, ws):
+        """Assina os tópicos `order` e `execution` de um pybit WebSocket privado."""
+        ws.order_stream(self.on_order_message)
+        ws.execution_stream(self.on_execution_message)
+        self.streaming = True
+        logger.info("Executor: Order manager listening to private order/execution streams")
+
+    def submit(self, category, symbol, side, order_type, qty, reduce_only=False, **kwargs) -> TrackedOrder:
+        """Envia a ordem pelo conector e passa a rastreá-la pelo orderLinkId."""
+        order_link_id = kwargs.pop('orderLinkId', None) or new_order_link_id()
+        order = TrackedOrder(order_link_id, category, symbol, side, float(qty), reduce_only)
+        with self._lock:
+            self.orders[order_link_id] = order
+
+        result = self.connector.place_order(
+            category=category, symbol=symbol, side=side, order_type=order_type, qty=qty,
+            reduce_only=reduce_only, orderLinkId=order_link_id, **kwargs
+        )
+        if not result:
+            self._transition(order, REJECTED)
+        else:
+            order.order_id = result.get('orderId') or order.order_id
+        return order
+
+    def submit_batch(self, orders: List[Dict]) -> List[TrackedOrder]:
+        """
+        Envia várias ordens pelos endpoints de lote (uma requisição por categoria a cada até
+        20 ordens) e rastreia cada uma como em `submit`. `orders` são dicts com os argumentos
+        de `submit`; o retorno segue a mesma ordem. Ordens recusadas no lote ficam `rejected`
+        sem afetar as demais.
+        """
+        tracked = []
+        by_category: Dict[str, List] = {}
+        for params in orders:
+            params = dict(params)
+            params['orderLinkId'] = params.get('orderLinkId') or new_order_link_id()
+            order = TrackedOrder(params['orderLinkId'], params['category'], params['symbol'], params['side'],
+                                 float(params['qty']), params.get('reduce_only', False))
+            with self._lock:
+                self.orders[order.order_link_id] = order
+            tracked.append(order)
+            category = params.pop('category')
+            by_category.setdefault(category, []).append((order, params))
+
+        for category, items in by_category.items():
+            results = self.connector.place_batch_order(category, [params for _, params in items])
+            for (order, _), result in zip(items, results):
+                if not result:
+                    self._transition(order, REJECTED)
+                else:
+                    order.order_id = result.get('orderId') or order.order_id
+        return tracked
+
+    def wait(self, order: TrackedOrder, timeout: Optional[float] = None) -> TrackedOrder:
+        """
+        Bloqueia até a ordem chegar a um estado final ou o timeout expirar.
+        Com stream, acorda no instante do fill; sem ele, consulta a cada `poll_interval`.
+        """
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while not order.done:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                logger.warning(f"Executor: Order {order.order_link_id} still {order.status} after waiting "
+                               f"(filled {order.filled_qty}/{order.qty})")
+                break
+            if order._done.wait(min(self.poll_interval, remaining)):
+                break
+            if not self.poll(order):
+                # Sem como confirmar (ex: falha de rede ou replay sem a consulta gravada)
+                break
+        return order
+
+    def poll(self, order: TrackedOrder) -> bool:
+        """Consulta o estado da ordem na API. Retorna False se a consulta falhou."""
+        data = self.connector.get_order(order.category, order.symbol, order.order_link_id)
+        if data is None:
+            return False
+        self._apply_order(order, data)
+        return True
+
+    def on_order_message(self, message):
+        """Callback do tópico `order`: atualiza estado, quantidade e preço médio acumulados."""
+        for data in message.get('data', []):
+            order = self.orders.get(data.get('orderLinkId'))
+            if order is not None:
+                self._apply_order(order, data)
+
+    def on_execution_message(self, message):
+        """
+        Callback do tópico `execution`: soma cada fill uma única vez (por execId). Os tópicos
+        `order` e `execution` informam o mesmo fill; ambos medem o acumulado executado, então
+        vale o maior dos dois, nunca a soma.
+        """
+        for data in message.get('data', []):
+            order = self.orders.get(data.get('orderLinkId'))
+            if order is None or data.get('execType', 'Trade') != 'Trade':
+                continue
+            exec_id = data.get('execId')
+            exec_qty = float(data.get('execQty') or 0)
+            exec_price = float(data.get('execPrice') or 0)
+            with self._lock:
+                if exec_id is not None:
+                    if exec_id in order._exec_ids:
+                        continue
+                    order._exec_ids.add(exec_id)
+                order._exec_qty += exec_qty
+                order._exec_notional += exec_qty * exec_price
+                if order._exec_qty > order.filled_qty:
+                    order.filled_qty = order._exec_qty
+                    order.avg_price = order._exec_notional / order._exec_qty
+                order.order_id = data.get('orderId') or order.order_id
+            if order.filled_qty >= order.qty:
+                self._transition(order, FILLED)
+            else:
+                self._transition(order, PARTIALLY_FILLED)
+
+    def _apply_order(self, order: TrackedOrder, data):
+        status = BYBIT_STATUS.get(data.get('orderStatus'), order.status)
+        with self._lock:
+            order.order_id = data.get('orderId') or order.order_id
+            cum_qty = float(data.get('cumExecQty') or 0)
+            # Acumulado da corretora; não regride o que as execuções (mais recentes) já confirmaram
+            if cum_qty >= order.filled_qty:
+                order.filled_qty = cum_qty
+                avg_price = float(data.get('avgPrice') or 0)
+                if avg_price > 0:
+                    order.avg_price = avg_price
+        self._transition(order, status)
+
+    def forget(self, order: TrackedOrder):
+        """Para de rastrear uma ordem que não chegou a um estado final (ex: timeout da espera)."""
+        with self._lock:
+            self.orders.pop(order.order_link_id, None)
+
+    def _transition(self, order: TrackedOrder, status):
+        if order.done or status == order.status:
+            return
+        logger.info(f"Executor: Order {order.order_link_id} {order.status} -> {status} "
+                    f"(filled {order.filled_qty}/{order.qty} @ {order.avg_price})")
+        order.status = status
+        order.updated_at = time.time()
+        if order.done:
+            order._done.set()
+            # Ordens finalizadas não precisam mais ser rastreadas
+            with self._lock:
+                self.orders.pop(order.order_link_id, None)
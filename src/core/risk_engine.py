@@ -0,0 +1,231 @@
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, Optional
+from src.utils.logger import logger
+
+
+@dataclass
+class RiskLimits:
+    """Limites pré-trade. Valores None desativam o limite correspondente."""
+    max_total_exposure: Optional[float] = None   # Nocional total (moeda de cotação)
+    max_symbol_exposure: Optional[float] = None  # Nocional por símbolo
+    max_open_positions: Optional[int] = None
+    daily_loss_cap: Optional[float] = None       # Perda máxima no dia (realizado + não realizado)
+    max_leverage: Optional[float] = None         # Exposição total / equity
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "RiskLimits":
+        known = {f.name for f in fields(cls)}
+        unknown = set(config) - known
+        if unknown:
+            logger.warning(f"Risk: Ignoring unknown risk settings {sorted(unknown)}")
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+@dataclass
+class PositionState:
+    size: float = 0.0         # Positivo = long, negativo = short
+    entry_price: float = 0.0
+    mark_price: float = 0.0
+    leverage: float = 1.0
+
+    @property
+    def notional(self) -> float:
+        return abs(self.size) * self.mark_price
+
+    @property
+    def margin(self) -> float:
+        return abs(self.size) * self.entry_price / self.leverage
+
+    @property
+    def unrealized_pnl(self) -> float:
+        return self.size * (self.mark_price - self.entry_price)
+
+
+@dataclass
+class RiskDecision:
+    allowed: bool
+    qty: float
+    reason: str = ""
+
+    @property
+    def resized(self) -> bool:
+        return self.allowed and self.reason != ""
+
+
+class RiskEngine:
+    """
+    Motor de risco em memória. Os agregados (exposição, margem, PnL) são mantidos
+    incrementalmente a cada fill ou atualização de preço, então cada verificação
+    pré-trade custa O(1) e não faz chamadas REST.
+    """
+
+    def __init__(self, limits: RiskLimits):
+        self.limits = limits
+        self.positions: Dict[str, PositionState] = {}
+        self.equity = 0.0
+        self.gross_exposure = 0.0
+        self.margin_used = 0.0
+        self.unrealized_pnl = 0.0
+        self.realized_pnl_today = 0.0
+        self.open_positions = 0
+        self._day = self._current_day()
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> Optional["RiskEngine"]:
+        """Cria o motor a partir da seção `risk` do config (None se ausente)."""
+        if not config:
+            return None
+        return cls(RiskLimits.from_dict(config))
+
+    @staticmethod
+    def _current_day() -> int:
+        return int(time.time() // 86400)
+
+    def _roll_day(self):
+        day = self._current_day()
+        if day != self._day:
+            self._day = day
+            self.realized_pnl_today = 0.0
+
+    def _remove(self, position: PositionState):
+        self.gross_exposure -= position.notional
+        self.margin_used -= position.margin
+        self.unrealized_pnl -= position.unrealized_pnl
+        if position.size != 0:
+            self.open_positions -= 1
+
+    def _add(self, position: PositionState):
+        self.gross_exposure += position.notional
+        self.margin_used += position.margin
+        self.unrealized_pnl += position.unrealized_pnl
+        if position.size != 0:
+            self.open_positions += 1
+
+    def update_equity(self, equity: float):
+        self.equity = float(equity)
+
+    def sync_position(self, symbol: str, size: float, entry_price: float, mark_price: float, leverage: float = 1.0):
+        """
+        Substitui o estado de um símbolo pelo snapshot da corretora (size com sinal), que também
+        atualiza o preço de marcação a cada ciclo. Se a posição diminuiu ou fechou fora do robô
+        (SL/TP na corretora, liquidação, ordem manual), o PnL da parte fechada é realizado no
+        preço de marcação do snapshot.
+        """
+        self._roll_day()
+        position = self.positions.setdefault(symbol, PositionState())
+        self._remove(position)
+        size = float(size)
+        if position.size != 0:
+            if size == 0 or (size > 0) != (position.size > 0):
+                closed = position.size
+            elif abs(size) < abs(position.size):
+                closed = position.size - size
+            else:
+                closed = 0.0
+            self.realized_pnl_today += closed * (float(mark_price) - position.entry_price)
+        position.size = size
+        position.entry_price = float(entry_price)
+        position.mark_price = float(mark_price)
+        position.leverage = float(leverage) or 1.0
+        self._add(position)
+
+    def on_fill(self, symbol: str, side: str, qty: float, price: float, leverage: float = 1.0, fee: float = 0.0):
+        """Aplica um fill (side 'Buy'/'Sell') e realiza o PnL da parte que reduz a posição."""
+        self._roll_day()
+        qty = float(qty)
+        price = float(price)
+        signed_qty = qty if side == 'Buy' else -qty
+
+        position = self.positions.setdefault(symbol, PositionState(mark_price=price))
+        self._remove(position)
+
+        if position.size == 0 or (position.size > 0) == (signed_qty > 0):
+            # Abrindo ou aumentando: preço médio ponderado
+            new_size = position.size + signed_qty
+            position.entry_price = (abs(position.size) * position.entry_price + qty * price) / abs(new_size)
+            position.size = new_size
+            position.leverage = float(leverage) or 1.0
+        else:
+            closed = min(qty, abs(position.size))
+            direction = 1.0 if position.size > 0 else -1.0
+            self.realized_pnl_today += closed * (price - position.entry_price) * direction
+            remaining = position.size + signed_qty
+            if remaining == 0 or (remaining > 0) == (position.size > 0):
+                position.size = remaining
+            else:
+                # Virou de lado: o excedente abre nova posição no preço do fill
+                position.size = remaining
+                position.entry_price = price
+                position.leverage = float(leverage) or 1.0
+            if position.size == 0:
+                position.entry_price = 0.0
+
+        self.realized_pnl_today -= float(fee)
+        position.mark_price = price
+        self._add(position)
+
+    @property
+    def daily_pnl(self) -> float:
+        return self.realized_pnl_today + self.unrealized_pnl
+
+    def check_order(self, symbol: str, side: str, qty: float, price: float,
+                    leverage: float = 1.0, reduce_only: bool = False) -> RiskDecision:
+        """
+        Verificação pré-trade. Ordens que reduzem posição sempre passam.
+        Ordens de aumento podem ser bloqueadas ou redimensionadas para caber nos limites.
+        """
+        qty = float(qty)
+        if reduce_only:
+            return RiskDecision(True, qty)
+
+        self._roll_day()
+        limits = self.limits
+        price = float(price)
+        leverage = float(leverage) or 1.0
+        position = self.positions.get(symbol)
+        current_size = position.size if position else 0.0
+        signed_qty = qty if side == 'Buy' else -qty
+        if current_size != 0 and (current_size > 0) != (signed_qty > 0) and qty <= abs(current_size):
+            return RiskDecision(True, qty)
+
+        if limits.daily_loss_cap is not None and self.daily_pnl <= -abs(limits.daily_loss_cap):
+            return RiskDecision(False, 0.0, f"daily loss cap reached ({self.daily_pnl:.2f})")
+
+        if limits.max_open_positions is not None and current_size == 0 and self.open_positions >= limits.max_open_positions:
+            return RiskDecision(False, 0.0, f"max open positions reached ({self.open_positions})")
+
+        allowed = qty
+        reasons = []
+        symbol_notional = position.notional if position else 0.0
+
+        def cap(limit_notional, label):
+            nonlocal allowed
+            max_qty = max(0.0, limit_notional) / price
+            if max_qty < allowed:
+                allowed = max_qty
+                reasons.append(label)
+
+        if limits.max_total_exposure is not None:
+            cap(limits.max_total_exposure - self.gross_exposure, "total exposure")
+        if limits.max_symbol_exposure is not None:
+            cap(limits.max_symbol_exposure - symbol_notional, "symbol exposure")
+        if limits.max_leverage is not None and self.equity > 0:
+            cap(limits.max_leverage * self.equity - self.gross_exposure, "leverage budget")
+        if self.equity > 0:
+            free_margin = self.equity + self.unrealized_pnl - self.margin_used
+            cap(free_margin * leverage, "free margin")
+
+        if allowed <= 0:
+            return RiskDecision(False, 0.0, f"no room left ({', '.join(reasons)})")
+        return RiskDecision(True, allowed, f"resized by {', '.join(reasons)}" if reasons else "")
+
+    def snapshot(self) -> Dict:
+        return {
+            'equity': self.equity,
+            'gross_exposure': self.gross_exposure,
+            'margin_used': self.margin_used,
+            'unrealized_pnl': self.unrealized_pnl,
+            'realized_pnl_today': self.realized_pnl_today,
+            'open_positions': self.open_positions,
+        }
@@ -0,0 +1,205 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, fields
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from src.core.executor import ENTRY, StrategyExecutor
+from src.core.order_manager import OrderManager
+from src.core.strategy_loader import create_strategy
+from src.utils.logger import logger
+
+TICKER_NUMERIC_COLUMNS = ['lastPrice', 'bid1Price', 'ask1Price', 'turnover24h', 'volume24h', 'price24hPcnt']
+
+
+@dataclass
+class ScannerConfig:
+    """Filtros baratos aplicados ao snapshot de tickers antes de buscar candles."""
+    quote_coin: Optional[str] = "USDT"
+    min_turnover_24h: float = 0.0         # Volume financeiro mínimo em 24h (moeda de cotação)
+    min_abs_change_pct: float = 0.0       # Variação absoluta mínima em 24h (%)
+    max_spread_pct: Optional[float] = None  # Spread máximo entre bid e ask (% do preço médio)
+    rank_by: str = "turnover24h"          # Coluna que define a prioridade da shortlist
+    top_n: int = 20                       # Tamanho máximo da shortlist por ciclo
+    max_concurrency: int = 4              # Símbolos processados em paralelo
+    include: List[str] = field(default_factory=list)  # Sempre analisados
+    exclude: List[str] = field(default_factory=list)  # Nunca analisados
+    batch_orders: bool = True             # Ordens do mesmo ciclo enviadas juntas pelos endpoints de lote
+
+    @classmethod
+    def from_dict(cls, config: Dict) -> "ScannerConfig":
+        known = {f.name for f in fields(cls)}
+        unknown = set(config) - known
+        if unknown:
+            logger.warning(f"Scanner: Ignoring unknown scanner settings {sorted(unknown)}")
+        return cls(**{k: v for k, v in config.items() if k in known})
+
+
+def tickers_to_frame(tickers) -> pd.DataFrame:
+    """Converte a lista de tickers da API em DataFrame numérico com spread e variação em %."""
+    frame = pd.DataFrame(tickers)
+    if frame.empty:
+        return frame
+    for column in TICKER_NUMERIC_COLUMNS:
+        values = frame[column] if column in frame else np.nan
+        frame[column] = pd.to_numeric(values, errors='coerce')
+    mid = (frame['bid1Price'] + frame['ask1Price']) / 2
+    frame['spread_pct'] = (frame['ask1Price'] - frame['bid1Price']) / mid.where(mid > 0) * 100
+    frame['change_pct'] = frame['price24hPcnt'] * 100
+    return frame
+
+
+def shortlist(frame: pd.DataFrame, config: ScannerConfig) -> List[str]:
+    """Aplica os filtros de forma vetorizada e retorna os símbolos em ordem de prioridade."""
+    if frame.empty:
+        return []
+    mask = frame['turnover24h'].fillna(0) >= config.min_turnover_24h
+    mask &= frame['change_pct'].abs().fillna(0) >= config.min_abs_change_pct
+    if config.max_spread_pct is not None:
+        mask &= frame['spread_pct'] <= config.max_spread_pct
+    if config.quote_coin:
+        mask &= frame['symbol'].str.endswith(config.quote_coin)
+    if config.exclude:
+        mask &= ~frame['symbol'].isin(config.exclude)
+
+    ranked = frame.loc[mask].sort_values(config.rank_by, ascending=False, na_position='last')
+    return ranked['symbol'].head(config.top_n).tolist()
+
+
+class MarketScanner:
+    """
+    Roda uma estratégia sobre o mercado inteiro de uma categoria com custo de API fixo:
+    um snapshot de tickers por ciclo (uma chamada) escolhe a shortlist, e só ela passa
+    pela busca de candles e `calculate_signals`, com concorrência limitada e ordenada
+    por prioridade. Símbolos com posição aberta são sempre incluídos para gerenciar a saída.
+
+    Com `batch_orders`, o ciclo roda em etapas: sinais em paralelo, decisão e verificação
+    de risco em ordem de prioridade, envio de todas as ordens do candle em lote e, por fim,
+    a confirmação dos fills em paralelo.
+    """
+
+    def __init__(self, connector, strategy_name, category, interval, config: ScannerConfig,
+                 overrides: Optional[Dict] = None, risk_engine=None, clock=None, signal_recorder=None):
+        self.connector = connector
+        self.strategy_name = strategy_name
+        self.category = category
+        self.interval = interval
+        self.config = config
+        self.overrides = overrides or {}
+        self.risk_engine = risk_engine
+        self.clock = clock
+        self.signal_recorder = signal_recorder
+        self.executors: Dict[str, StrategyExecutor] = {}
+        self._order_lock = threading.Lock()
+        self.order_manager = OrderManager(connector)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, config.max_concurrency), thread_name_prefix="scanner")
+
+    def _executor(self, symbol) -> StrategyExecutor:
+        executor = self.executors.get(symbol)
+        if executor is None:
+            strategy = create_strategy(
+                self.strategy_name, {'pair': symbol, 'timeframe': self.interval, 'category': self.category}, self.overrides
+            )
+            executor = StrategyExecutor(self.connector, strategy, risk_engine=self.risk_engine,
+                                         order_manager=self.order_manager, order_lock=self._order_lock,
+                                         clock=self.clock, signal_recorder=self.signal_recorder)
+            self.executors[symbol] = executor
+        return executor
+
+    def _open_symbols(self) -> List[str]:
+        """
+        Símbolos com posição: os que os executores já acompanham e os da conta (uma consulta
+        em lote por ciclo), para não perder posições abertas antes de um reinício.
+        """
+        symbols = [symbol for symbol, executor in self.executors.items()
+                   if executor.strategy.metadata.get('position_side')]
+        if self.category != 'spot':
+            positions = self.connector.get_open_positions(self.category, self.config.quote_coin)
+            if positions is not None:
+                symbols += [position['symbol'] for position in positions]
+        return list(dict.fromkeys(symbols))
+
+    def select(self) -> Optional[List[str]]:
+        """Busca os tickers e monta a lista do ciclo: abertas, `include` e a shortlist."""
+        tickers = self.connector.get_tickers(self.category)
+        if tickers is None:
+            return None
+        candidates = shortlist(tickers_to_frame(tickers), self.config)
+        symbols = list(dict.fromkeys(self._open_symbols() + self.config.include + candidates))
+        logger.info(f"Scanner: {len(tickers)} tickers -> {len(candidates)} shortlisted, {len(symbols)} to process")
+        return symbols
+
+    def run_cycle(self):
+        started = time.perf_counter()
+        symbols = self.select()
+        if not symbols:
+            return []
+
+        if self.config.batch_orders:
+            self._run_batched(symbols)
+        else:
+            # O pool consome na ordem de submissão: os de maior prioridade rodam primeiro
+            futures = {
+                self._pool.submit(self._executor(symbol).run, self.category, symbol, self.interval): symbol
+                for symbol in symbols
+            }
+            self._wait(futures)
+        logger.info(f"Scanner: Cycle processed {len(symbols)} symbols in {time.perf_counter() - started:.2f}s")
+        return symbols
+
+    @staticmethod
+    def _wait(futures) -> Dict[str, object]:
+        """Aguarda as tarefas {future: símbolo}; retorna {símbolo: resultado} das que não falharam."""
+        results = {}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Scanner: {futures[future]} failed - {error}")
+            else:
+                results[futures[future]] = future.result()
+        return results
+
+    def _run_batched(self, symbols):
+        # 1. Candles, posição e sinais em paralelo (maior prioridade primeiro)
+        futures = {
+            self._pool.submit(self._executor(symbol).evaluate, self.category, symbol, self.interval): symbol
+            for symbol in symbols
+        }
+        evaluated = self._wait(futures)
+
+        # 2. Decisão em ordem de prioridade; cada entrada aprovada já conta para o risco da seguinte
+        plans = []
+        for symbol in symbols:
+            if not evaluated.get(symbol):
+                continue
+            executor = self.executors[symbol]
+            try:
+                plan = executor.plan_order(self.category, symbol, *evaluated[symbol])
+            except Exception as e:
+                logger.error(f"Scanner: {symbol} failed - {e}")
+                continue
+            if plan:
+                executor.reserve_risk(plan)
+                plans.append((executor, plan))
+        if not plans:
+            return
+
+        # 3. Todas as ordens do candle em lote
+        entries = sum(1 for _, plan in plans if plan.action == ENTRY)
+        logger.info(f"Scanner: Sending {len(plans)} orders in batch ({entries} entries, {len(plans) - entries} exits)")
+        orders = self.order_manager.submit_batch([plan.order_params for _, plan in plans])
+
+        # 4. Confirmação dos fills e atualização de cada estratégia em paralelo
+        futures = {
+            self._pool.submit(self._complete, executor, plan, order): plan.symbol
+            for (executor, plan), order in zip(plans, orders)
+        }
+        self._wait(futures)
+
+    @staticmethod
+    def _complete(executor, plan, order):
+        executor.complete_order(plan, executor.await_fill(order, plan.order_params, plan.last_close))
+
+    def close(self):
+        self._pool.shutdown(wait=True)
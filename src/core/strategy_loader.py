@@ -0,0 +1,155 @@
+import ast
+import importlib
+import importlib.util
+import json
+import os
+import sys
+from src.utils.logger import logger
+
+STRATEGIES_FOLDER = "strategies"
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+STRATEGIES_DIR = os.path.join(PROJECT_ROOT, STRATEGIES_FOLDER)
+REGISTRY_CACHE = os.path.join(STRATEGIES_DIR, '__pycache__', 'registry.json')
+BASE_CLASS = "BaseStrategy"
+
+
+def _class_bases(path):
+    """Lê o arquivo com `ast` (sem importar) e retorna {classe: [nomes das bases]}."""
+    with open(path, 'rb') as f:
+        tree = ast.parse(f.read(), filename=path)
+    classes = {}
+    for node in tree.body:
+        if isinstance(node, ast.ClassDef):
+            bases = []
+            for base in node.bases:
+                if isinstance(base, ast.Name):
+                    bases.append(base.id)
+                elif isinstance(base, ast.Attribute):
+                    bases.append(base.attr)
+            classes[node.name] = bases
+    return classes
+
+
+def _fingerprint(files):
+    return {name: [os.stat(path).st_mtime_ns, os.stat(path).st_size] for name, path in files.items()}
+
+
+def discover_strategies(refresh=False):
+    """
+    Registro {módulo: classe da estratégia} montado por análise estática dos arquivos em
+    `strategies/`, sem importar pandas/pandas_ta. Fica em cache e só é refeito quando algum
+    arquivo muda (mtime/tamanho).
+    """
+    files = {
+        name[:-3]: os.path.join(STRATEGIES_DIR, name)
+        for name in sorted(os.listdir(STRATEGIES_DIR))
+        if name.endswith('.py') and not name.startswith('_')
+    }
+    fingerprint = _fingerprint(files)
+
+    if not refresh and os.path.exists(REGISTRY_CACHE):
+        try:
+            with open(REGISTRY_CACHE) as f:
+                cached = json.load(f)
+            if cached.get('files') == fingerprint:
+                return cached['strategies']
+        except (OSError, ValueError):
+            pass
+
+    module_classes = {}
+    for module, path in files.items():
+        try:
+            module_classes[module] = _class_bases(path)
+        except SyntaxError as e:
+            logger.warning(f"Strategy registry: Skipping {path} - {e}")
+
+    # Herança transitiva: classes que herdam de outra estratégia também são estratégias
+    strategy_classes = {BASE_CLASS}
+    changed = True
+    while changed:
+        changed = False
+        for classes in module_classes.values():
+            for name, bases in classes.items():
+                if name not in strategy_classes and strategy_classes.intersection(bases):
+                    strategy_classes.add(name)
+                    changed = True
+
+    registry = {}
+    for module, classes in module_classes.items():
+        found = [name for name in classes if name in strategy_classes and name != BASE_CLASS]
+        if found:
+            registry[module] = found[0]
+
+    try:
+        os.makedirs(os.path.dirname(REGISTRY_CACHE), exist_ok=True)
+        tmp_path = f"{REGISTRY_CACHE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'files': fingerprint, 'strategies': registry}, f)
+        os.replace(tmp_path, REGISTRY_CACHE)
+    except OSError as e:
+        logger.warning(f"Strategy registry: Could not write cache - {e}")
+    return registry
+
+
+def _find_strategy_class(strategy_module, class_name, module_path):
+    """Retorna a classe da estratégia no módulo (pelo nome do registro ou procurando em `__dict__`)."""
+    from strategies.base_strategy import BaseStrategy
+
+    # Caminho rápido: classe já conhecida pelo registro
+    obj = getattr(strategy_module, class_name, None) if class_name else None
+    if isinstance(obj, type) and issubclass(obj, BaseStrategy):
+        logger.info(f"Found strategy class: {class_name}")
+        return obj
+
+    # Procurar classe que herda de BaseStrategy
+    for name, obj in strategy_module.__dict__.items():
+        if isinstance(obj, type) and issubclass(obj, BaseStrategy) and obj is not BaseStrategy:
+            logger.info(f"Found strategy class: {name}")
+            return obj
+
+    raise AttributeError(f"Could not find a valid class inheriting from BaseStrategy in '{module_path}.py'")
+
+
+def load_strategy_class(strategy_name):
+    """Carrega a classe da estratégia pelo nome."""
+    module_path = f"{STRATEGIES_FOLDER}.{strategy_name}"
+    try:
+        class_name = discover_strategies().get(strategy_name)
+        if class_name is None and not os.path.exists(os.path.join(STRATEGIES_DIR, f"{strategy_name}.py")):
+            raise ImportError(f"No module named '{module_path}'")
+
+        strategy_module = importlib.import_module(module_path)
+        return _find_strategy_class(strategy_module, class_name, module_path)
+    except ImportError as e:
+        raise ImportError(f"Could not import strategy module '{STRATEGIES_FOLDER}/{strategy_name}.py'. Details: {e}")
+    except AttributeError as e:
+        raise AttributeError(f"Error loading strategy '{strategy_name}': {e}")
+    except Exception as e:
+        raise RuntimeError(f"Unexpected error loading strategy '{strategy_name}': {e}")
+
+def import_strategy_isolated(strategy_name):
+    """
+    Executa o arquivo da estratégia em um módulo novo, sem tocar em `sys.modules`, e retorna
+    (módulo, classe). Usado no hot reload: o código em execução só é substituído depois que
+    a nova versão for validada (ver `register_strategy_module`).
+    """
+    module_path = f"{STRATEGIES_FOLDER}.{strategy_name}"
+    spec = importlib.util.spec_from_file_location(module_path, os.path.join(STRATEGIES_DIR, f"{strategy_name}.py"))
+    if spec is None:
+        raise ImportError(f"Could not find strategy module '{STRATEGIES_FOLDER}/{strategy_name}.py'")
+    strategy_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(strategy_module)
+    class_name = discover_strategies().get(strategy_name)
+    return strategy_module, _find_strategy_class(strategy_module, class_name, module_path)
+
+def register_strategy_module(strategy_module):
+    """Publica em `sys.modules` um módulo carregado com `import_strategy_isolated`."""
+    sys.modules[strategy_module.__name__] = strategy_module
+
+def create_strategy(strategy_name, config, overrides=None):
+    """Instancia a estratégia e aplica os overrides (ex: leverage, stop_loss) da entrada do portfólio."""
+    strategy = load_strategy_class(strategy_name)(config=config)
+    for attr, value in (overrides or {}).items():
+        setattr(strategy, attr, value)
+    return strategy
@@ -0,0 +1,231 @@
+import multiprocessing as mp
+import os
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from src.utils.logger import logger
+
+# Chamadas REST por ciclo de cada entrada: candles, posição e saldo
+CALLS_PER_CYCLE = 3
+
+
+@dataclass
+class ShardPlan:
+    """Conjunto de entradas do portfólio executado por um processo."""
+    shard_id: int
+    entries: List[Dict]
+    run_interval: float
+
+
+@dataclass
+class ShardState:
+    plan: ShardPlan
+    process: Optional[mp.Process] = None
+    restarts: int = 0
+    next_start: float = 0.0
+    started_at: float = 0.0
+
+
+def plan_shards(entries: List[Dict], run_interval: float = 5.0, api_budget: Optional[float] = None,
+                cpu_count: Optional[int] = None, max_shards: Optional[int] = None) -> List[ShardPlan]:
+    """
+    Divide as entradas em shards dimensionados pela quantidade de CPUs e pelo orçamento da API.
+
+    `api_budget` é o limite de requisições por segundo para o host. Se a demanda
+    (entradas x CALLS_PER_CYCLE / run_interval) passar do orçamento, o intervalo
+    de execução é aumentado até caber.
+    """
+    if not entries:
+        return []
+
+    cpu_count = cpu_count or os.cpu_count() or 1
+    shard_count = min(len(entries), cpu_count, max_shards or cpu_count)
+
+    interval = float(run_interval)
+    if api_budget:
+        demand = len(entries) * CALLS_PER_CYCLE / interval
+        if demand > api_budget:
+            interval = len(entries) * CALLS_PER_CYCLE / api_budget
+            logger.warning(f"Supervisor: API demand {demand:.1f} req/s exceeds budget {api_budget} req/s. "
+                           f"Run interval raised to {interval:.1f}s")
+
+    # Mantém as entradas do mesmo par juntas para reaproveitar o conector do shard
+    ordered = sorted(entries, key=lambda e: (e['pair'], e['timeframe'], e['strategy']))
+    per_shard = -(-len(ordered) // shard_count)
+    return [
+        ShardPlan(shard_id=i, entries=ordered[i * per_shard:(i + 1) * per_shard], run_interval=interval)
+        for i in range(shard_count)
+        if ordered[i * per_shard:(i + 1) * per_shard]
+    ]
+
+
+def split_risk_config(risk_config: Optional[Dict], plans: List[ShardPlan]) -> List[Optional[Dict]]:
+    """
+    Divide os limites de risco do host entre os shards, para que a soma dos motores de risco
+    (um por processo) nunca passe do configurado.
+
+    Exposição total, perda diária e alavancagem são divididas igualmente; posições abertas
+    são distribuídas (um shard pode ficar sem nenhuma); a exposição por símbolo é dividida
+    pelo número de shards que operam aquele símbolo, usando o pior caso.
+    """
+    if not risk_config or len(plans) <= 1:
+        return [risk_config] * len(plans)
+    count = len(plans)
+    shards_per_symbol = {}
+    for plan in plans:
+        for pair in {entry['pair'] for entry in plan.entries}:
+            shards_per_symbol[pair] = shards_per_symbol.get(pair, 0) + 1
+
+    configs = []
+    for index in range(count):
+        config = dict(risk_config)
+        for key in ('max_total_exposure', 'daily_loss_cap', 'max_leverage'):
+            if config.get(key) is not None:
+                config[key] = config[key] / count
+        if config.get('max_symbol_exposure') is not None:
+            config['max_symbol_exposure'] = config['max_symbol_exposure'] / max(shards_per_symbol.values())
+        if config.get('max_open_positions') is not None:
+            limit = int(config['max_open_positions'])
+            config['max_open_positions'] = limit // count + (1 if index < limit % count else 0)
+        configs.append(config)
+    if any(config.get('max_open_positions') == 0 for config in configs):
+        logger.warning(f"Supervisor: max_open_positions ({risk_config['max_open_positions']}) is lower than the "
+                       f"number of shards ({count}); some shards cannot open positions")
+    return configs
+
+
+def shard_process(plan: ShardPlan, testnet: bool, risk_config: Optional[Dict], heartbeats, stop_event,
+                  signal_history=None):
+    """
+    Executa sequencialmente as entradas do shard com um único conector.
+    O motor de risco é compartilhado pelas entradas do shard (limites valem por shard).
+    """
+    from src.connector.bybit_connector import BybitConnector
+    from src.core.executor import StrategyExecutor
+    from src.core.risk_engine import RiskEngine
+    from src.core.strategy_loader import create_strategy
+    from src.data.signal_recorder import SignalRecorder
+    from src.utils.profiler import CycleProfiler
+
+    connector = BybitConnector(testnet=testnet)
+    risk_engine = RiskEngine.from_config(risk_config)
+    recorder = SignalRecorder.from_config(signal_history)
+    executors = []
+    for entry in plan.entries:
+        strategy = create_strategy(entry['strategy'], config=entry, overrides=entry.get('overrides'))
+        executors.append((entry, StrategyExecutor(connector, strategy, risk_engine=risk_engine, signal_recorder=recorder)))
+    profiler = CycleProfiler(name=f"shard-{plan.shard_id}")
+    profiler.install_signal()
+    logger.info(f"Supervisor: Shard {plan.shard_id} running {len(executors)} entries every {plan.run_interval:.1f}s")
+
+    try:
+        while not stop_event.is_set():
+            started = time.monotonic()
+            for entry, executor in executors:
+                if stop_event.is_set():
+                    break
+                with profiler.cycle():
+                    executor.run(category=entry['category'], symbol=entry['pair'], interval=entry['timeframe'])
+                heartbeats[plan.shard_id] = time.time()
+            heartbeats[plan.shard_id] = time.time()
+            stop_event.wait(max(0.0, plan.run_interval - (time.monotonic() - started)))
+    finally:
+        # Processos filhos não executam os handlers de atexit
+        if recorder:
+            recorder.close()
+
+
+class Supervisor:
+    """
+    Distribui as entradas do portfólio em processos, monitora heartbeats e
+    reinicia shards que morreram ou travaram (com backoff exponencial).
+    """
+
+    def __init__(self, entries: List[Dict], testnet: bool, settings: Optional[Dict] = None, risk_config: Optional[Dict] = None,
+                 signal_history=None):
+        settings = settings or {}
+        self.testnet = testnet
+        self.risk_config = risk_config
+        self.signal_history = signal_history
+        self.check_interval = float(settings.get('check_interval', 2))
+        self.max_backoff = float(settings.get('max_backoff', 60))
+        plans = plan_shards(
+            entries,
+            run_interval=float(settings.get('run_interval', 5)),
+            api_budget=settings.get('api_budget'),
+            cpu_count=settings.get('cpu_count'),
+            max_shards=settings.get('max_shards'),
+        )
+        # Um shard é considerado travado se não der sinal de vida por este tempo
+        default_timeout = max(60.0, 3 * max((p.run_interval for p in plans), default=5.0))
+        self.heartbeat_timeout = float(settings.get('heartbeat_timeout', default_timeout))
+        self.shards = [ShardState(plan=plan) for plan in plans]
+        # Cada shard tem o seu motor de risco: os limites do host são divididos entre eles
+        self.shard_risk = dict(zip((plan.shard_id for plan in plans), split_risk_config(risk_config, plans)))
+        self.heartbeats = mp.Array('d', len(plans), lock=False)
+        self.stop_event = mp.Event()
+
+    def _start(self, shard: ShardState):
+        plan = shard.plan
+        self.heartbeats[plan.shard_id] = time.time()
+        shard.process = mp.Process(
+            target=shard_process,
+            args=(plan, self.testnet, self.shard_risk[plan.shard_id], self.heartbeats, self.stop_event,
+                  self.signal_history),
+            name=f"shard-{plan.shard_id}",
+        )
+        shard.process.start()
+        shard.started_at = time.monotonic()
+
+    def _schedule_restart(self, shard: ShardState, reason: str):
+        # Backoff só cresce se o shard cair logo após subir
+        if time.monotonic() - shard.started_at > self.heartbeat_timeout:
+            shard.restarts = 0
+        delay = min(self.max_backoff, 2 ** shard.restarts)
+        shard.restarts += 1
+        shard.next_start = time.monotonic() + delay
+        shard.process = None
+        logger.error(f"Supervisor: Shard {shard.plan.shard_id} {reason}. Restarting in {delay:.0f}s (restart #{shard.restarts})")
+
+    def check_health(self):
+        """Verifica processos e heartbeats, reiniciando o que for necessário."""
+        now = time.monotonic()
+        for shard in self.shards:
+            process = shard.process
+            if process is None:
+                if now >= shard.next_start:
+                    self._start(shard)
+                continue
+
+            if not process.is_alive():
+                self._schedule_restart(shard, f"exited with code {process.exitcode}")
+                continue
+
+            silence = time.time() - self.heartbeats[shard.plan.shard_id]
+            if silence > self.heartbeat_timeout:
+                process.terminate()
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.kill()
+                self._schedule_restart(shard, f"missed heartbeat for {silence:.0f}s")
+
+    def run(self):
+        total = sum(len(s.plan.entries) for s in self.shards)
+        logger.info(f"Supervisor: Starting {len(self.shards)} shard(s) for {total} entries")
+        for shard in self.shards:
+            self._start(shard)
+        try:
+            while not self.stop_event.is_set():
+                time.sleep(self.check_interval)
+                self.check_health()
+        finally:
+            self.stop()
+
+    def stop(self):
+        self.stop_event.set()
+        for shard in self.shards:
+            if shard.process is not None:
+                shard.process.join(timeout=10)
+                if shard.process.is_alive():
+                    shard.process.terminate()
+        logger.info("Supervisor: All shards stopped")
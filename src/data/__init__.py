@@ -0,0 +1 @@
+# Módulo de dados locais
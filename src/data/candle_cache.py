@@ -0,0 +1,67 @@
+import time
+from typing import Dict, Optional, Tuple
+import pandas as pd
+from src.connector.responses import KLINE_PAGE_LIMIT
+from src.data.candle_store import interval_to_ms
+from src.utils.logger import logger
+
+
+class CandleCache:
+    """
+    Janela de candles em memória por (categoria, símbolo, intervalo) para o loop ao vivo.
+
+    A primeira chamada busca exatamente o histórico pedido (paginado pelo conector); as
+    seguintes buscam só os candles desde o último armazenado — ele incluído, pois pode ter
+    sido salvo ainda em formação. Se a janela pedida cresce ou o intervalo desde a última
+    busca passa do tamanho da janela, o histórico é rebuscado por inteiro.
+    """
+
+    def __init__(self, connector, clock=None):
+        self.connector = connector
+        self.clock = clock  # ExchangeClock opcional: calcula quantos candles faltam pelo horário da corretora
+        # (janela, quantidade pedida na carga completa) por chave
+        self._windows: Dict[Tuple[str, str, str], Tuple[pd.DataFrame, int]] = {}
+
+    def _now_ms(self) -> int:
+        return self.clock.now_ms() if self.clock else int(time.time() * 1000)
+
+    def _missing(self, window, interval) -> Optional[int]:
+        """Candles a buscar desde o último da janela (ele incluído), ou None se o intervalo não tem duração fixa."""
+        try:
+            step = interval_to_ms(interval)
+        except ValueError:
+            return None
+        return max(0, (self._now_ms() - int(window['timestamp'].iloc[-1])) // step) + 1
+
+    def get(self, category, symbol, interval, count) -> Optional[pd.DataFrame]:
+        """Retorna uma cópia dos `count` candles mais recentes (None se a busca falhar)."""
+        key = (category, symbol, str(interval))
+        window, loaded_count = self._windows.get(key, (None, 0))
+
+        # Histórico mais curto que o pedido (símbolo recente) não força nova carga completa
+        missing = self._missing(window, interval) if window is not None and loaded_count >= count else None
+        if missing is not None and missing < min(count, KLINE_PAGE_LIMIT):
+            delta = self.connector.get_historical_candles(category, symbol, interval, limit=missing)
+            if delta is None:
+                return None
+            window = (pd.concat([window, delta], ignore_index=True)
+                      .drop_duplicates('timestamp', keep='last')
+                      .tail(count)
+                      .reset_index(drop=True))
+            loaded_count = count
+        else:
+            window = self.connector.get_historical_candles(category, symbol, interval, limit=count)
+            if window is None:
+                return None
+            if len(window) < count:
+                logger.warning(f"CandleCache: Only {len(window)} of {count} candles available for {symbol} {interval}; "
+                               f"early indicator values may be inaccurate")
+            logger.info(f"CandleCache: Loaded {len(window)} candles for {symbol} {interval}")
+            loaded_count = count
+
+        self._windows[key] = (window, loaded_count)
+        # A estratégia adiciona colunas ao DataFrame; a janela em cache fica só com os candles
+        return window.copy()
+
+    def clear(self):
+        self._windows.clear()
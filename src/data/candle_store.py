@@ -0,0 +1,105 @@
+from pathlib import Path
+from typing import Optional
+import pandas as pd
+from src.utils.logger import logger
+
+DEFAULT_STORE_DIR = Path('data') / 'candles'
+
+# Duração de cada intervalo da Bybit em milissegundos
+INTERVAL_MS = {
+    '1': 60_000, '3': 180_000, '5': 300_000, '15': 900_000, '30': 1_800_000,
+    '60': 3_600_000, '120': 7_200_000, '240': 14_400_000, '360': 21_600_000,
+    '720': 43_200_000, 'D': 86_400_000, 'W': 604_800_000,
+}
+
+
+def interval_to_ms(interval) -> int:
+    try:
+        return INTERVAL_MS[str(interval)]
+    except KeyError:
+        raise ValueError(f"Intervalo '{interval}' não suportado. Use: {list(INTERVAL_MS)}")
+
+
+class CandleStore:
+    """
+    Armazena candles localmente em Parquet (um arquivo por categoria/símbolo/intervalo)
+    e atualiza de forma incremental, buscando na API apenas o trecho que falta.
+    """
+
+    kind = 'candles'
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def path(self, category, symbol, interval) -> Path:
+        return self.root / f"{category}_{symbol}_{interval}.parquet"
+
+    def bounds(self, category, symbol, interval):
+        """Retorna (primeiro, último) timestamp armazenado ou None."""
+        path = self.path(category, symbol, interval)
+        if not path.exists():
+            return None
+        timestamps = pd.read_parquet(path, columns=['timestamp'])['timestamp']
+        if timestamps.empty:
+            return None
+        return int(timestamps.iloc[0]), int(timestamps.iloc[-1])
+
+    def load(self, category, symbol, interval, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """Lê candles no intervalo [start, end) sem carregar o arquivo inteiro na memória."""
+        path = self.path(category, symbol, interval)
+        if not path.exists():
+            return pd.DataFrame()
+        filters = []
+        if start is not None:
+            filters.append(('timestamp', '>=', int(start)))
+        if end is not None:
+            filters.append(('timestamp', '<', int(end)))
+        return pd.read_parquet(path, filters=filters or None).reset_index(drop=True)
+
+    def save(self, category, symbol, interval, dataframe: pd.DataFrame):
+        """Mescla com o que já existe (o dado novo prevalece) e grava de forma atômica."""
+        path = self.path(category, symbol, interval)
+        if path.exists():
+            dataframe = pd.concat([pd.read_parquet(path), dataframe], ignore_index=True)
+        dataframe = (dataframe.drop_duplicates('timestamp', keep='last')
+                     .sort_values('timestamp')
+                     .reset_index(drop=True))
+        tmp_path = path.with_suffix('.tmp')
+        dataframe.to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+
+    def period_ms(self, interval) -> int:
+        """Espaçamento entre dois pontos armazenados."""
+        return interval_to_ms(interval)
+
+    def _fetch(self, connector, category, symbol, interval, start, end) -> Optional[pd.DataFrame]:
+        return connector.get_candles_range(category, symbol, interval, start, end)
+
+    def refresh(self, connector, category, symbol, interval, start: int, end: int) -> bool:
+        """
+        Garante que o armazenamento cobre [start, end], buscando só os trechos ausentes.
+        O último candle armazenado é sempre rebuscado, pois pode ter sido salvo em formação.
+        """
+        step = self.period_ms(interval)
+        bounds = self.bounds(category, symbol, interval)
+        ranges = []
+        if bounds is None:
+            ranges.append((start, end))
+        else:
+            first, last = bounds
+            if start < first:
+                ranges.append((start, first - step))
+            if end > last:
+                ranges.append((last, end))
+
+        for range_start, range_end in ranges:
+            if range_end < range_start:
+                continue
+            logger.info(f"CandleStore: Fetching {self.kind} {symbol} {interval} from {range_start} to {range_end}")
+            df = self._fetch(connector, category, symbol, interval, range_start, range_end)
+            if df is None:
+                return False
+            if not df.empty:
+                self.save(category, symbol, interval, df)
+        return True
@@ -0,0 +1,164 @@
+import time
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from src.connector.responses import OPEN_INTEREST_INTERVALS, open_interest_interval
+from src.data.candle_store import CandleStore, interval_to_ms
+from src.utils.logger import logger
+
+DEFAULT_AUX_DIR = Path('data') / 'aux'
+
+# Séries auxiliares disponíveis; o nome é também a coluna adicionada aos candles
+AUX_SERIES = ('funding_rate', 'mark_price', 'index_price', 'open_interest')
+# Só existem para derivativos (linear/inverse)
+DERIVATIVES_ONLY = ('funding_rate', 'open_interest')
+# Séries em candles: o valor (fechamento) de cada kline só existe quando ela fecha
+CANDLE_SERIES = ('mark_price', 'index_price')
+
+# O funding é liquidado a cada 1h, 4h ou 8h conforme o contrato: consulta de hora em hora e
+# busca até 8h antes do primeiro candle para que ele já tenha uma taxa alinhada
+FUNDING_POLL_MS = 3_600_000
+FUNDING_MAX_INTERVAL_MS = 28_800_000
+# Intervalo mínimo entre consultas quando o próximo ponto já deveria ter sido publicado
+RETRY_MS = 60_000
+
+
+class AuxSeriesStore(CandleStore):
+    """
+    Uma série auxiliar (funding, mark/index price ou open interest) em Parquet, com a mesma
+    atualização incremental dos candles. Colunas: timestamp e o nome da série.
+    """
+
+    def __init__(self, kind, root=DEFAULT_AUX_DIR):
+        if kind not in AUX_SERIES:
+            raise ValueError(f"Série auxiliar '{kind}' não suportada. Use: {list(AUX_SERIES)}")
+        self.kind = kind
+        super().__init__(Path(root) / kind)
+
+    def path(self, category, symbol, interval) -> Path:
+        if self.kind == 'funding_rate':
+            # O funding não depende do intervalo dos candles
+            return self.root / f"{category}_{symbol}.parquet"
+        return super().path(category, symbol, interval)
+
+    def period_ms(self, interval) -> int:
+        if self.kind == 'funding_rate':
+            return FUNDING_POLL_MS
+        if self.kind == 'open_interest':
+            return OPEN_INTEREST_INTERVALS[open_interest_interval(interval_to_ms(interval))]
+        return interval_to_ms(interval)
+
+    def publish_delay_ms(self, interval) -> int:
+        """Tempo entre o timestamp de um ponto na API e o momento em que o valor fica conhecido."""
+        return self.period_ms(interval) if self.kind in CANDLE_SERIES else 0
+
+    def load(self, category, symbol, interval, start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+        """
+        Lê a série com o timestamp de publicação: em mark/index price, o fim da kline. Assim o
+        join as-of só usa klines fechadas, no live e no backtest (a kline aberta fica de fora).
+        """
+        delay = self.publish_delay_ms(interval)
+        if not delay:
+            return super().load(category, symbol, interval, start, end)
+        frame = super().load(category, symbol, interval,
+                             None if start is None else start - delay, None if end is None else end - delay)
+        if not frame.empty:
+            frame['timestamp'] += delay
+        return frame
+
+    def lookback_ms(self, interval) -> int:
+        """Quanto buscar antes do primeiro candle para que ele tenha um valor alinhado."""
+        if self.kind == 'funding_rate':
+            return FUNDING_MAX_INTERVAL_MS
+        return self.period_ms(interval)
+
+    def _fetch(self, connector, category, symbol, interval, start, end) -> Optional[pd.DataFrame]:
+        if self.kind == 'funding_rate':
+            return connector.get_funding_history_range(category, symbol, start, end)
+        if self.kind == 'open_interest':
+            interval_time = open_interest_interval(interval_to_ms(interval))
+            return connector.get_open_interest_range(category, symbol, interval_time, start, end)
+        return connector.get_price_series_range(self.kind, category, symbol, interval, start, end)
+
+
+def join_aux(candles: pd.DataFrame, series: Dict[str, Optional[pd.DataFrame]]) -> pd.DataFrame:
+    """
+    Adiciona cada série como coluna dos candles, alinhada pelo timestamp: cada candle recebe
+    o último valor publicado até a sua abertura (as-of para trás, sem olhar o futuro).
+    Séries ausentes viram colunas NaN.
+    """
+    for column, frame in series.items():
+        if frame is None or frame.empty:
+            candles[column] = np.nan
+            continue
+        candles = pd.merge_asof(candles, frame[['timestamp', column]], on='timestamp', direction='backward')
+    return candles
+
+
+class AuxDataFeed:
+    """
+    Séries auxiliares para o loop ao vivo, sem custo de rede por ciclo.
+
+    Cada série fica em memória e no AuxSeriesStore. Ela só é atualizada quando o próximo
+    ponto já deve ter sido publicado: a cada candle para mark/index price (que entram pela
+    última kline fechada), a cada intervalo para o open interest e de hora em hora para o
+    funding. `version` muda sempre que algum dado novo chega; o executor usa isso para saber
+    quando recalcular os sinais.
+    """
+
+    def __init__(self, connector, root=DEFAULT_AUX_DIR, clock=None):
+        self.connector = connector
+        self.root = root
+        self.clock = clock
+        self.version = 0
+        self._stores: Dict[str, AuxSeriesStore] = {}
+        self._frames: Dict[Tuple[str, str, str, str], pd.DataFrame] = {}
+        self._next_due: Dict[Tuple[str, str, str, str], int] = {}
+
+    def _now_ms(self) -> int:
+        return self.clock.now_ms() if self.clock else int(time.time() * 1000)
+
+    def _store(self, kind) -> AuxSeriesStore:
+        store = self._stores.get(kind)
+        if store is None:
+            store = self._stores[kind] = AuxSeriesStore(kind, self.root)
+        return store
+
+    def _refresh(self, kind, category, symbol, interval, window_start):
+        key = (kind, category, symbol, str(interval))
+        now = self._now_ms()
+        if now < self._next_due.get(key, 0):
+            return
+        store = self._store(kind)
+        period = store.period_ms(interval)
+        start = window_start - store.lookback_ms(interval)
+        frame = self._frames.get(key)
+        # Depois da primeira carga só a cauda é buscada (o início já está no armazenamento)
+        fetch_start = max(start, int(frame['timestamp'].iloc[0])) if frame is not None and not frame.empty else start
+        if not store.refresh(self.connector, category, symbol, interval, fetch_start, now):
+            logger.warning(f"MarketData: Could not refresh {kind} for {symbol}; keeping last values")
+            self._next_due[key] = now + min(period, RETRY_MS)
+            return
+
+        fresh = store.load(category, symbol, interval, start=start)
+        if frame is None or not fresh.equals(frame):
+            self.version += 1
+        self._frames[key] = fresh
+        # Timestamp do último ponto na API (em mark/index price, o início da kline mais recente)
+        last = int(fresh['timestamp'].iloc[-1]) - store.publish_delay_ms(interval) if not fresh.empty else now
+        self._next_due[key] = max(last + period, now + min(period, RETRY_MS))
+
+    def join(self, category, symbol, interval, candles: pd.DataFrame, kinds: Sequence[str]) -> pd.DataFrame:
+        """Candles com uma coluna por série em `kinds`, atualizando as que estiverem vencidas."""
+        window_start = int(candles['timestamp'].iloc[0])
+        series = {}
+        for kind in kinds:
+            if kind not in AUX_SERIES:
+                raise ValueError(f"Série auxiliar '{kind}' não suportada. Use: {list(AUX_SERIES)}")
+            if kind in DERIVATIVES_ONLY and category == 'spot':
+                series[kind] = None
+                continue
+            self._refresh(kind, category, symbol, interval, window_start)
+            series[kind] = self._frames.get((kind, category, symbol, str(interval)))
+        return join_aux(candles, series)
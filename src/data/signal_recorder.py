@@ -0,0 +1,172 @@
+import atexit
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from queue import Empty, SimpleQueue
+from typing import Dict, List, Optional, Sequence
+import pandas as pd
+import pyarrow.parquet as pq
+from src.utils.logger import logger
+
+DEFAULT_SIGNAL_DIR = Path('data') / 'signals'
+# Um arquivo Parquet por descarga: a cada FLUSH_ROWS linhas ou FLUSH_INTERVAL segundos
+FLUSH_ROWS = 5000
+FLUSH_INTERVAL = 300.0
+
+
+def _day(timestamp_ms) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, tz=timezone.utc).strftime('%Y-%m-%d')
+
+
+class SignalRecorder:
+    """
+    Histórico colunar do que a estratégia viu em cada ciclo: a última linha dos sinais
+    (OHLCV, indicadores, flags de entrada/saída, stop loss e take profit), a posição, a
+    decisão e a latência até ela.
+
+    `record` só enfileira a linha; uma thread dedicada acumula e grava em Parquet, em
+    partições por dia (UTC): `<root>/date=AAAA-MM-DD/<execução>-<n>.parquet`. Quando o dia
+    vira (e ao encerrar), as partes da execução naquele dia são compactadas em
+    `<execução>.parquet`, para que a leitura de meses não abra milhares de arquivos.
+    """
+
+    _STOP = object()
+
+    def __init__(self, root=DEFAULT_SIGNAL_DIR, flush_rows=FLUSH_ROWS, flush_interval=FLUSH_INTERVAL):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.flush_rows = int(flush_rows)
+        self.flush_interval = float(flush_interval)
+        # Identifica os arquivos desta execução (vários processos gravam no mesmo diretório)
+        self.run_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{os.getpid()}"
+        self.rows_written = 0
+        self._queue = SimpleQueue()
+        self._buffer: List[Dict] = []
+        self._day: Optional[str] = None
+        self._parts = 0
+        self._thread = threading.Thread(target=self._run, name="signal-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @classmethod
+    def from_config(cls, config) -> Optional["SignalRecorder"]:
+        """Cria o gravador a partir da seção `signal_history` do config (None se desligado)."""
+        if not config:
+            return None
+        return cls(**config) if isinstance(config, dict) else cls()
+
+    def record(self, row, **fields):
+        """
+        Enfileira a linha de sinais (Series ou dict) com os campos do ciclo, que devem incluir
+        `recorded_at` (ms). Não bloqueia o ciclo: a conversão e a escrita ficam na thread.
+        """
+        self._queue.put((row, fields))
+
+    def _run(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                row = self._queue.get(timeout=max(0.1, self.flush_interval - (time.monotonic() - last_flush)))
+            except Empty:
+                row = None
+            if row is self._STOP:
+                break
+            try:
+                if row is not None:
+                    values, fields = row
+                    day = _day(fields['recorded_at'])
+                    if day != self._day:
+                        self._close_day()
+                        self._day = day
+                    # tolist() converte para tipos nativos de uma vez (bem mais rápido que to_dict)
+                    row = dict(zip(values.index.tolist(), values.tolist())) if isinstance(values, pd.Series) else dict(values)
+                    row.update(fields)
+                    self._buffer.append(row)
+                if len(self._buffer) >= self.flush_rows or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush()
+                    last_flush = time.monotonic()
+            except Exception as e:
+                logger.error(f"SignalRecorder: Could not write signal history - {e}")
+                self._buffer = []
+        try:
+            self._close_day()
+        except Exception as e:
+            logger.error(f"SignalRecorder: Could not write signal history - {e}")
+
+    def _partition(self, day) -> Path:
+        return self.root / f"date={day}"
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        partition = self._partition(self._day)
+        partition.mkdir(parents=True, exist_ok=True)
+        path = partition / f"{self.run_id}-{self._parts:05d}.parquet"
+        tmp_path = path.with_suffix('.tmp')
+        pd.DataFrame(self._buffer).to_parquet(tmp_path, index=False)
+        tmp_path.replace(path)
+        self._parts += 1
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def _close_day(self):
+        """Grava o que resta do dia atual e junta as partes desta execução em um arquivo."""
+        if self._day is None:
+            return
+        self._flush()
+        if self._parts > 1:
+            partition = self._partition(self._day)
+            parts = sorted(partition.glob(f"{self.run_id}-*.parquet"))
+            path = partition / f"{self.run_id}.parquet"
+            tmp_path = path.with_suffix('.tmp')
+            pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True).to_parquet(tmp_path, index=False)
+            tmp_path.replace(path)
+            for part in parts:
+                part.unlink(missing_ok=True)
+        elif self._parts == 1:
+            part = self._partition(self._day) / f"{self.run_id}-00000.parquet"
+            part.replace(part.with_name(f"{self.run_id}.parquet"))
+        self._parts = 0
+
+    def close(self):
+        """Grava o que restou na fila e encerra a thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout=30)
+
+
+def signal_files(root=DEFAULT_SIGNAL_DIR, start: Optional[str] = None, end: Optional[str] = None) -> List[Path]:
+    """
+    Arquivos das partições entre os dias `start` e `end` (AAAA-MM-DD, inclusivos). Partes de
+    uma execução cujo arquivo compactado já existe ficam de fora (compactação em andamento).
+    """
+    files = []
+    for partition in sorted(Path(root).glob('date=*')):
+        day = partition.name[len('date='):]
+        if (start and day < start) or (end and day > end):
+            continue
+        compacted = {path.stem for path in partition.glob('*.parquet') if path.stem.count('-') == 1}
+        files += [path for path in sorted(partition.glob('*.parquet'))
+                  if path.stem in compacted or path.stem.rsplit('-', 1)[0] not in compacted]
+    return files
+
+
+def load_signals(root=DEFAULT_SIGNAL_DIR, start: Optional[str] = None, end: Optional[str] = None,
+                 columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Lê o histórico de sinais em um DataFrame. Estratégias diferentes gravam indicadores
+    diferentes; colunas ausentes em um arquivo viram NaN.
+    """
+    frames = []
+    for path in signal_files(root, start, end):
+        if columns is None:
+            frames.append(pd.read_parquet(path))
+        else:
+            # Só as colunas pedidas que existem no arquivo (o schema varia por estratégia)
+            names = set(pq.read_schema(path).names)
+            frames.append(pd.read_parquet(path, columns=[c for c in columns if c in names]).reindex(columns=list(columns)))
+    if not frames:
+        return pd.DataFrame(columns=list(columns) if columns else None)
+    return pd.concat(frames, ignore_index=True)
@@ -1,14 +1,17 @@
-import importlib
 import sys
 import os
 import time 
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from dotenv import load_dotenv
-from utils.logger import logger
 
-# Configuração do ambiente
+# Configuração do ambiente (antes de qualquer import de `src`, para o logger ser carregado uma única vez)
 ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(ROOT_DIR)
 
+from src.utils.logger import logger
+
 # Carregar variáveis de ambiente
 dotenv_path = os.path.join(ROOT_DIR, '.env')
 if os.path.exists(dotenv_path):
@@ -19,32 +22,10 @@ if os.path.exists(dotenv_path):
 else:
     logger.warning("Aviso: .env não encontrado na raiz. As variáveis devem ser definidas no ambiente.")
 
+# Apenas módulos leves aqui: conector, executor e estratégias (pandas, pybit, pandas_ta)
+# são importados sob demanda, em paralelo quando possível
 from src.utils.config_loader import get_parameters
-from src.connector.bybit_connector import BybitConnector
-from src.core.executor import StrategyExecutor
-from strategies.base_strategy import BaseStrategy
-
-STRATEGIES_FOLDER = "strategies"
-
-def load_strategy_class(strategy_name):
-    """Carrega a classe da estratégia pelo nome."""
-    try:
-        module_path = f"{STRATEGIES_FOLDER}.{strategy_name}"
-        strategy_module = importlib.import_module(module_path)
-
-        # Procurar classe que herda de BaseStrategy
-        for name, obj in strategy_module.__dict__.items():
-            if isinstance(obj, type) and issubclass(obj, BaseStrategy) and obj is not BaseStrategy:
-                logger.info(f"Found strategy class: {name}")
-                return obj
-
-        raise AttributeError(f"Could not find a valid class inheriting from BaseStrategy in '{module_path}.py'")
-    except ImportError as e:
-        raise ImportError(f"Could not import strategy module '{STRATEGIES_FOLDER}/{strategy_name}.py'. Details: {e}")
-    except AttributeError as e:
-        raise AttributeError(f"Error loading strategy '{strategy_name}': {e}")
-    except Exception as e:
-        raise RuntimeError(f"Unexpected error loading strategy '{strategy_name}': {e}")
+from src.core.strategy_loader import create_strategy
 
 def log_configuration(params, strategy_instance, run_interval_seconds):
     """Loga a configuração atual do robô."""
@@ -59,33 +40,201 @@ def log_configuration(params, strategy_instance, run_interval_seconds):
     logger.info(f"  - Stop Loss: {strategy_instance.stop_loss}%")
     logger.info(f"  - Take Profit: {strategy_instance.take_profit}%")
 
+def run_market_bus_mode(params, entries, run_interval_seconds):
+    """Executa as entradas no barramento de memória compartilhada (feed + workers + roteador)."""
+    from src.core.market_bus import StreamSpec
+    from src.core.bus_workers import run_market_bus
+
+    streams = [StreamSpec(
+        category=entry['category'],
+        symbol=entry['pair'],
+        interval=entry['timeframe'],
+        strategy=entry['strategy'],
+        indicator_columns=tuple(params['shared_indicators']),
+        overrides=tuple(sorted(entry.get('overrides', {}).items())),
+    ) for entry in entries]
+    run_market_bus(streams, testnet=params['testnet'], workers=params['workers'], poll_interval=run_interval_seconds,
+                   risk_config=params['risk'], signal_history=params['signal_history'])
+
+def prepare_connector(params):
+    """
+    Cria o conector e sincroniza o relógio com a corretora. Roda em uma thread enquanto
+    a estratégia é importada, sobrepondo importações e latência de rede.
+    """
+    from src.connector.bybit_connector import BybitConnector, ReplayConnector
+    from src.connector.exchange_clock import ExchangeClock
+
+    logger.info("Initializing Bybit Connector...")
+    if params['replay']:
+        from src.connector.cassette import ReplayClock
+        # Relógio nos timestamps gravados: o cache pede os mesmos deltas de candles da sessão original
+        connector = ReplayConnector(params['replay'], speed=params['replay_speed'])
+        return connector, ReplayClock(connector.session)
+
+    connector = BybitConnector(testnet=params['testnet'], record_path=params['record'],
+                               resilience=params['resilience'])
+    # Horário da corretora para assinatura, logs e agendamento no fechamento do candle
+    clock = ExchangeClock(connector.get_server_time).start().install()
+    return connector, clock
+
+def run_scanner_mode(params, run_interval_seconds):
+    """Roda a estratégia sobre a shortlist do mercado inteiro, escolhida pelos tickers."""
+    from src.core.scanner import MarketScanner, ScannerConfig
+    from src.core.risk_engine import RiskEngine
+    from src.data.signal_recorder import SignalRecorder
+
+    connector, clock = prepare_connector({**params, 'replay': None})
+    scanner = MarketScanner(
+        connector, params['strategy'], params['category'], params['timeframe'],
+        ScannerConfig.from_dict(params['scanner']), overrides=params['overrides'],
+        risk_engine=RiskEngine.from_config(params['risk']), clock=clock,
+        signal_recorder=SignalRecorder.from_config(params['signal_history']),
+    )
+    logger.info(f"Starting scanner mode for {params['category']} (Interval: {run_interval_seconds}s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            if params['schedule'] == 'bar_close':
+                clock.sleep_until_bar_close(params['timeframe'])
+                scanner.run_cycle()
+            else:
+                scanner.run_cycle()
+                time.sleep(run_interval_seconds)
+    finally:
+        scanner.close()
+        clock.stop()
+
+def run_fanout_mode(params, run_interval_seconds):
+    """Calcula os sinais uma vez e espelha as ordens em várias contas em paralelo."""
+    from src.connector.bybit_connector import BybitConnector
+    from src.core.account_fanout import AccountFanout, AccountSpec
+    from src.data.signal_recorder import SignalRecorder
+
+    def account_connector(spec):
+        api_key, api_secret = spec.credentials()
+        return BybitConnector(testnet=params['testnet'], resilience=params['resilience'],
+                              api_key=api_key, api_secret=api_secret, account=spec.name)
+
+    connector, clock = prepare_connector({**params, 'replay': None})
+    fanout = AccountFanout(
+        connector, [AccountSpec.from_dict(account) for account in params['accounts']], account_connector,
+        params['strategy'], params, risk_config=params['risk'], clock=clock,
+        signal_recorder=SignalRecorder.from_config(params['signal_history']),
+    )
+    logger.info(f"Starting fan-out to {len(fanout.executors)} accounts for {params['pair']} "
+                f"(Interval: {run_interval_seconds}s). Press Ctrl+C to stop.")
+    try:
+        while True:
+            if params['schedule'] == 'bar_close':
+                clock.sleep_until_bar_close(params['timeframe'])
+                fanout.run(params['category'], params['pair'], params['timeframe'])
+            else:
+                fanout.run(params['category'], params['pair'], params['timeframe'])
+                time.sleep(run_interval_seconds)
+    finally:
+        fanout.close()
+        clock.stop()
+
 def main():
     run_interval_seconds = 5
     try:
         params = get_parameters()
+
+        if params['portfolio'] and params['workers'] == 0:
+            from src.core.supervisor import Supervisor
+
+            Supervisor(params['portfolio'], testnet=params['testnet'], settings=params['supervisor'], risk_config=params['risk'],
+                       signal_history=params['signal_history']).run()
+            return
+
+        if params['portfolio']:
+            run_market_bus_mode(params, params['portfolio'], run_interval_seconds)
+            return
+
+        if params['scanner'] is not None:
+            run_scanner_mode(params, run_interval_seconds)
+            return
+
+        if params['accounts']:
+            run_fanout_mode(params, run_interval_seconds)
+            return
+
         strategy_name = params['strategy']
+
+        # Conector (pybit + rede) em paralelo com a importação da estratégia (pandas/pandas_ta)
+        preload = ThreadPoolExecutor(max_workers=1, thread_name_prefix="preload")
+        connector_future = preload.submit(prepare_connector, params) if params['workers'] == 0 else None
+        preload.shutdown(wait=False)
         
         logger.info(f"Loading strategy: {strategy_name}...")
-        StrategyClass = load_strategy_class(strategy_name)
-        strategy_instance = StrategyClass(config=params)
+        strategy_instance = create_strategy(strategy_name, params, params['overrides'])
         
         log_configuration(params, strategy_instance, run_interval_seconds)
-        logger.info(f"Strategy '{StrategyClass.__name__}' loaded successfully.")
+        logger.info(f"Strategy '{strategy_instance.name}' loaded successfully.")
+
+        if params['workers'] > 0:
+            entry = {key: params[key] for key in ('strategy', 'pair', 'timeframe', 'category')}
+            run_market_bus_mode(params, [entry], run_interval_seconds)
+            return
+
+        from src.core.executor import StrategyExecutor
+        from src.core.risk_engine import RiskEngine
+        from src.core.leader_lease import LeaderLease
+        from src.utils.profiler import CycleProfiler
+        from src.data.signal_recorder import SignalRecorder
+
+        connector, clock = connector_future.result()
 
-        logger.info("Initializing Bybit Connector...")
-        connector = BybitConnector(testnet=params['testnet'])
+        lease = None
+        if params['ha'] and not params['replay']:
+            # Ativo/passivo: só o dono do lease envia ordens; o standby mantém tudo aquecido
+            lease = LeaderLease.from_config(params['ha']).start()
+        wake = lease.promoted if lease else threading.Event()
 
         logger.info("Initializing Strategy Executor...")
-        executor = StrategyExecutor(connector, strategy_instance)
+        executor = StrategyExecutor(connector, strategy_instance, risk_engine=RiskEngine.from_config(params['risk']),
+                                    clock=clock, trade_gate=lease.check_fence if lease else None,
+                                    signal_recorder=SignalRecorder.from_config(params['signal_history']))
+        if params['order_stream'] and not params['replay']:
+            # Confirmação de fills em tempo real; sem o stream, o executor consulta a ordem por polling
+            executor.order_manager.attach_stream(connector.private_stream())
+
+        reloader = None
+        if params['hot_reload']:
+            from src.core.hot_reload import StrategyReloader
+            options = params['hot_reload'] if isinstance(params['hot_reload'], dict) else {}
+            reloader = StrategyReloader(executor, params, **options).start()
+
+        profiler = CycleProfiler()
+        profiler.install_signal()
 
         logger.info(f"\nStarting continuous execution loop (Interval: {run_interval_seconds}s). Press Ctrl+C to stop.")
         logger.info("-----------------------------------------------------------------------")
 
-        while True:
-            logger.info(f"\n[{time.strftime('%Y-%m-%d %H:%M:%S')}] Running check...")
-            executor.run(category=params['category'], symbol=params['pair'], interval=params['timeframe'])
-            logger.info(f"Check finished. Waiting {run_interval_seconds} seconds...")
-            time.sleep(run_interval_seconds)
+        on_bar_close = clock is not None and not params['replay'] and params['schedule'] == 'bar_close'
+        try:
+            while not (params['replay'] and connector.exhausted):
+                if on_bar_close and not wake.is_set():
+                    clock.sleep_until_bar_close(params['timeframe'], stop_event=wake)
+                # Uma promoção a líder acorda o loop na hora, sem esperar o próximo ciclo
+                wake.clear()
+                if reloader:
+                    # Troca validada em segundo plano entra aqui, entre ciclos
+                    reloader.apply()
+                now = clock.now_datetime() if clock else datetime.now()
+                logger.info(f"\n[{now.strftime('%Y-%m-%d %H:%M:%S')}] Running check...")
+                with profiler.cycle():
+                    executor.run(category=params['category'], symbol=params['pair'], interval=params['timeframe'])
+                if params['replay'] or on_bar_close:
+                    continue
+                logger.info(f"Check finished. Waiting {run_interval_seconds} seconds...")
+                wake.wait(run_interval_seconds)
+        finally:
+            if reloader:
+                reloader.stop()
+            if lease:
+                lease.stop()
+
+        logger.info("Replay finished: recorded session exhausted.")
 
     except (ValueError, ImportError, AttributeError, TypeError, RuntimeError) as e:
         logger.error(f"\nExecution Error: {e}")
@@ -1,7 +1,7 @@
 import json
 import argparse
+import itertools
 import os
-import sys
 from dotenv import load_dotenv
 from src.utils.logger import logger
 
@@ -10,6 +10,14 @@ from src.utils.logger import logger
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 DEFAULT_CONFIG_PATH = os.path.join(PROJECT_ROOT, 'config.json')
 
+BYBIT_TIMEFRAMES = ['1', '3', '5', '15', '30', '60', '120', '240', '360', '720', 'D', 'W', 'M']
+VALID_CATEGORIES = ['linear', 'inverse', 'spot']
+# interval: roda a cada poucos segundos; bar_close: roda logo após o fechamento de cada candle
+SCHEDULES = ['interval', 'bar_close']
+
+# Campos de uma entrada do portfólio que sobrescrevem atributos da estratégia
+STRATEGY_OVERRIDES = ['leverage', 'investment_percent', 'stop_loss', 'take_profit']
+
 # Carrega as variáveis de ambiente do .env
 load_dotenv()
 
@@ -40,86 +48,139 @@ def parse_arguments():
     parser.add_argument('--config', type=str, help=f'Caminho para o arquivo de configuração JSON (padrão busca por config.json na raiz)')
     parser.add_argument('--pair', type=str, help='Par de moedas a ser negociado (ex: BTCUSDT)')
     parser.add_argument('--timeframe', type=str, help='Timeframe dos candles (ex: 1m, 5m, 1h, 1D)')
+    parser.add_argument('--category', type=str, choices=VALID_CATEGORIES, help='Categoria do mercado (linear, inverse, spot). Padrão: inferida pelo par')
     # BooleanOptionalAction permite --testnet e --no-testnet
     parser.add_argument('--testnet', action=argparse.BooleanOptionalAction, default=None, help='Forçar uso da Testnet (--testnet) ou Mainnet (--no-testnet)')
+    parser.add_argument('--record', type=str, help='Grava todas as requisições/respostas da API neste arquivo (.jsonl.gz)')
+    parser.add_argument('--replay', type=str, help='Executa offline reproduzindo uma sessão gravada com --record')
+    parser.add_argument('--replay-speed', type=float, default=0.0, help='0 = o mais rápido possível, 1.0 = latência gravada de cada chamada (sem as pausas entre chamadas)')
+    parser.add_argument('--workers', type=int, help='Número de processos de estratégia no barramento de memória compartilhada (0 = loop único)')
+    parser.add_argument('--signal-history', action=argparse.BooleanOptionalAction, default=None, help='Grava o histórico de sinais em Parquet (data/signals). Padrão: seção signal_history do config, desligado se ausente')
 
     return parser.parse_args()
 
+def infer_category(pair):
+    """Infere a categoria pelo nome do par quando ela não é informada (ex: BTCUSD -> inverse)."""
+    if pair and "USD" in pair and not pair.endswith("USDT") and not pair.endswith("USDC"):
+        return "inverse"
+    return "linear"
+
+def _check_timeframe(timeframe):
+    # Bybit usa '1', '3', '5'... para minutos, D/W/M para dias/semanas/meses
+    if timeframe not in BYBIT_TIMEFRAMES:
+        logger.warning(f"Aviso: Timeframe '{timeframe}' pode não ser reconhecido pela API Bybit. Usar formatos como: {BYBIT_TIMEFRAMES}")
+
+def _as_list(entry, single_key, plural_key):
+    values = entry.get(plural_key, entry.get(single_key))
+    if values is None:
+        return []
+    return values if isinstance(values, list) else [values]
+
+def expand_portfolio(portfolio):
+    """
+    Expande a seção `portfolio` do config em uma lista de entradas símbolo x estratégia x timeframe.
+
+    Formato aceito:
+        {"defaults": {...}, "entries": [{"strategies": [...], "pairs": [...], "timeframes": [...], ...}]}
+    ou diretamente a lista de entradas. Cada entrada aceita a forma singular
+    (`strategy`/`pair`/`timeframe`) ou plural, e pode sobrescrever `category`,
+    `leverage`, `investment_percent`, `stop_loss` e `take_profit`.
+    """
+    if isinstance(portfolio, list):
+        portfolio = {'entries': portfolio}
+    defaults = portfolio.get('defaults', {})
+
+    entries = []
+    seen = set()
+    for index, raw in enumerate(portfolio.get('entries', [])):
+        entry = {**defaults, **raw}
+        strategies = _as_list(entry, 'strategy', 'strategies')
+        pairs = _as_list(entry, 'pair', 'pairs')
+        timeframes = _as_list(entry, 'timeframe', 'timeframes')
+        if not (strategies and pairs and timeframes):
+            raise ValueError(f"Entrada {index} do portfólio precisa de strategy, pair e timeframe: {raw}")
+
+        overrides = {k: entry[k] for k in STRATEGY_OVERRIDES if k in entry}
+        for strategy, pair, timeframe in itertools.product(strategies, pairs, timeframes):
+            category = entry.get('category') or infer_category(pair)
+            if category not in VALID_CATEGORIES:
+                raise ValueError(f"Categoria inválida '{category}' para {pair}. Use: {VALID_CATEGORIES}")
+            key = (strategy, pair, str(timeframe))
+            if key in seen:
+                logger.warning(f"Aviso: Entrada duplicada no portfólio ignorada: {key}")
+                continue
+            seen.add(key)
+            _check_timeframe(str(timeframe))
+            entries.append({
+                'strategy': strategy,
+                'pair': pair,
+                'timeframe': str(timeframe),
+                'category': category,
+                'overrides': overrides,
+            })
+    return entries
+
+def _signal_history(cli_flag, config_value):
+    """`--signal-history`/`--no-signal-history` prevalecem; ligado pela CLI, usa os ajustes do config."""
+    if cli_flag is None:
+        return config_value
+    return (config_value or True) if cli_flag else False
+
 def get_parameters():
     """Obtém os parâmetros finais combinando config.json e argumentos CLI."""
     args = parse_arguments()
     config_from_file = load_config(args.config)
-    
-    # Depuração: mostrar estrutura do config_from_file
-    logger.info("DEBUG - CONFIG CARREGADO:")
-    logger.info(config_from_file)
-    
-    # Verificar tipo de config_from_file
-    logger.info(f"DEBUG - TIPO: {type(config_from_file)}")
-
-    # Determinar a categoria com base no par (simplificado)
-    # Idealmente, isso seria mais robusto ou configurável
-    category = "linear" # Default para USDT-M
-    if args.pair and ("USD" in args.pair and not args.pair.endswith("USDT")): # Ex: BTCUSD
-        category = "inverse"
-    elif args.pair and not ("USD" in args.pair):
-        # Poderia ser spot, mas vamos manter linear/inverse por enquanto
-        # category = "spot"
-        pass # Mantém default
-    elif config_from_file.get('pair') and ("USD" in config_from_file.get('pair') and not config_from_file.get('pair').endswith("USDT")):
-        category = "inverse"
 
     # Prioridade: Argumentos CLI > Arquivo config.json > .env > Padrões
-    # DEBUG: Tentar acessar individualmente
-    logger.info("DEBUG - Tentando acessar campos individualmente:")
-    try:
-        logger.info(f"strategy: {config_from_file.get('strategy')}")
-        logger.info(f"pair: {config_from_file.get('pair')}")
-        logger.info(f"timeframe: {config_from_file.get('timeframe')}")
-    except Exception as e:
-        logger.error(f"ERROR ao acessar campos: {e}")
-    
-    try:
-        # Obtém o valor de TESTNET do .env (padrão True se não definido)
-        env_testnet = os.getenv('TESTNET', 'true').lower() == 'true'
-        
-        params = {
-            'strategy': args.strategy or config_from_file.get('strategy'),
-            'pair': args.pair or config_from_file.get('pair'),
-            'timeframe': args.timeframe or config_from_file.get('timeframe'),
-            'testnet': args.testnet if args.testnet is not None else env_testnet,
-            'category': category,
-            'config_path_used': os.path.abspath(args.config) if args.config else DEFAULT_CONFIG_PATH
-        }
-        logger.info("DEBUG - Params criado com sucesso")
-    except Exception as e:
-        logger.error(f"ERROR na criação do params: {e}")
-        import traceback
-        traceback.print_exc()
-        params = {
-            'strategy': args.strategy,
-            'pair': args.pair,
-            'timeframe': args.timeframe,
-            'testnet': args.testnet if args.testnet is not None else env_testnet,
-            'category': category,
-            'config_path_used': os.path.abspath(args.config) if args.config else DEFAULT_CONFIG_PATH
-        }
-
-    # Validação mais rigorosa
-    required_params = ['strategy', 'pair', 'timeframe']
+    # Obtém o valor de TESTNET do .env (padrão True se não definido)
+    env_testnet = os.getenv('TESTNET', 'true').lower() == 'true'
+    pair = args.pair or config_from_file.get('pair')
+
+    params = {
+        'strategy': args.strategy or config_from_file.get('strategy'),
+        'pair': pair,
+        'timeframe': args.timeframe or config_from_file.get('timeframe'),
+        'testnet': args.testnet if args.testnet is not None else env_testnet,
+        'category': args.category or config_from_file.get('category') or infer_category(pair),
+        'workers': args.workers if args.workers is not None else int(config_from_file.get('workers', 0)),
+        'shared_indicators': config_from_file.get('shared_indicators', []),
+        'portfolio': expand_portfolio(config_from_file['portfolio']) if 'portfolio' in config_from_file else [],
+        'supervisor': config_from_file.get('supervisor', {}),
+        'risk': config_from_file.get('risk', {}),
+        'resilience': config_from_file.get('resilience', {}),
+        'order_stream': bool(config_from_file.get('order_stream', False)),
+        'scanner': config_from_file.get('scanner'),
+        'schedule': config_from_file.get('schedule', 'interval'),
+        'ha': config_from_file.get('ha'),
+        'hot_reload': config_from_file.get('hot_reload', False),
+        'accounts': config_from_file.get('accounts', []),
+        # Histórico de sinais em Parquet (data/signals); desligado se não for pedido
+        'signal_history': _signal_history(args.signal_history, config_from_file.get('signal_history', False)),
+        # Atributos da estratégia sobrescritos pelo config (mesmos campos das entradas do portfólio)
+        'overrides': {k: config_from_file[k] for k in STRATEGY_OVERRIDES if k in config_from_file},
+        'record': args.record,
+        'replay': args.replay,
+        'replay_speed': args.replay_speed,
+        'config_path_used': os.path.abspath(args.config) if args.config else DEFAULT_CONFIG_PATH
+    }
+
+    if params['portfolio']:
+        logger.info(f"Portfólio com {len(params['portfolio'])} entradas carregado de {params['config_path_used']}")
+        return params
+
+    if params['category'] not in VALID_CATEGORIES:
+        raise ValueError(f"Categoria inválida '{params['category']}'. Use: {VALID_CATEGORIES}")
+
+    # Validação mais rigorosa (no modo scanner os pares vêm do mercado)
+    required_params = ['strategy', 'timeframe'] if params['scanner'] is not None else ['strategy', 'pair', 'timeframe']
     missing_params = [p for p in required_params if not params[p]]
     if missing_params:
         raise ValueError(f"Parâmetros obrigatórios ausentes: {', '.join(missing_params)}. Forneça via CLI ou no arquivo de configuração ({params['config_path_used']}).")
 
-    # Validação adicional (ex: timeframe válido)
-    valid_timeframes = ['1m', '3m', '5m', '15m', '30m', '1h', '2h', '4h', '6h', '12h', '1D', '1W', '1M'] # Exemplos Bybit
-    # Bybit usa '1', '3', '5'... para minutos, D/W/M para dias/semanas/meses
-    # Ajuste a validação conforme a nomenclatura exata da pybit/Bybit API para get_kline
-    bybit_timeframes = ['1', '3', '5', '15', '30', '60', '120', '240', '360', '720', 'D', 'W', 'M']
-    if params['timeframe'] not in bybit_timeframes:
-         logger.warning(f"Aviso: Timeframe '{params['timeframe']}' pode não ser reconhecido pela API Bybit. Usar formatos como: {bybit_timeframes}")
-         # Poderia levantar erro aqui se desejado: raise ValueError("Timeframe inválido...")
+    _check_timeframe(params['timeframe'])
+
+    if params['schedule'] not in SCHEDULES:
+        raise ValueError(f"Agendamento inválido '{params['schedule']}'. Use: {SCHEDULES}")
 
     logger.info(f"Parâmetros finais: {params}")
     return params
-
@@ -1,5 +1,4 @@
 import os
-import requests
 from dotenv import load_dotenv
 from src.utils.logger import logger
 
@@ -22,8 +21,10 @@ class EmailNotifier:
     def send_email(self, subject: str, content: dict, to_email: str = None) -> bool:
         if not self.use_notifier:
             return False
-            
+
         try:
+            import requests  # Sob demanda: só é necessário ao enviar, não na inicialização
+
             html = f"""
                 <div style="font-family: Arial; max-width: 600px; margin: 0 auto; padding: 20px;">
                     <h2 style="color: #333;">{content.get('title', 'Notificação')}</h2>
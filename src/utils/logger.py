@@ -1,6 +1,13 @@
 import sys
 import os
+import json
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
 from pathlib import Path
+from queue import SimpleQueue
 from loguru import logger
 from dotenv import load_dotenv
 
@@ -16,31 +23,202 @@ if LOG_LEVEL not in valid_levels:
     print(f"Nível de log inválido: {LOG_LEVEL}. Usando INFO como padrão.")
     LOG_LEVEL = 'INFO'
 
-# Criar diretório de logs se não existir
-log_path = Path('logs')
-log_path.mkdir(parents=True, exist_ok=True)
-
-# Remover handler padrão
-logger.remove()
-
-# Adicionar handler para arquivo
-logger.add(
-    'logs/trading.log',
-    level=LOG_LEVEL,
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-    rotation="500 MB",
-    retention="10 days",
-    compression="zip",
-    enqueue=True
-)
-
-# Adicionar handler para console com cores
-logger.add(
-    sys.stderr,
-    level=LOG_LEVEL,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    colorize=True
-)
-
-# Log inicial para confirmar configuração
-logger.info(f"Logger configurado - Nível: {LOG_LEVEL}")
\ No newline at end of file
+# Modo de log: 'text' (padrão) ou 'hot' (JSON em arquivo, sinks assíncronos e limite por mensagem)
+LOG_MODE = os.getenv('LOG_MODE', 'text').lower()
+if LOG_MODE not in ('text', 'hot'):
+    print(f"Modo de log inválido: {LOG_MODE}. Usando text como padrão.")
+    LOG_MODE = 'text'
+
+# Intervalo mínimo (s) entre duas emissões da mesma mensagem de `hot_log`; 0 desliga o limite
+LOG_SAMPLE_INTERVAL = float(os.getenv('LOG_SAMPLE_INTERVAL', '60' if LOG_MODE == 'hot' else '0'))
+
+# Log de cada requisição/resposta do pybit: só em DEBUG, pois o pybit formata o corpo inteiro
+# da resposta mesmo quando a mensagem é descartada
+REQUEST_LOGGING = LOG_LEVEL == 'DEBUG' and LOG_MODE == 'text'
+
+TEXT_FORMAT = "{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}"
+JSON_LOG_PATH = 'logs/trading.jsonl'
+JSON_ROTATION_BYTES = 500 * 1024 * 1024
+JSON_BACKUPS = 10
+
+_LEVEL_NO = {name: logger.level(name).no for name in valid_levels}
+_MIN_LEVEL_NO = _LEVEL_NO[LOG_LEVEL]
+
+try:
+    import orjson
+
+    def _dumps(obj):
+        return orjson.dumps(obj, default=str).decode()
+except ImportError:  # orjson é opcional; cai para o json da biblioteca padrão
+    def _dumps(obj):
+        return json.dumps(obj, default=str, separators=(',', ':'))
+
+
+def json_record(record) -> str:
+    """Uma linha JSON por registro: campos fixos mais os `extra` (campos nomeados de `hot_log`)."""
+    entry = {
+        'ts': record['time'].isoformat(),
+        'level': record['level'].name,
+        'logger': record['name'],
+        'function': record['function'],
+        'line': record['line'],
+        'msg': record['message'],
+    }
+    if record['extra']:
+        entry.update(record['extra'])
+    if record['exception'] is not None:
+        entry['exception'] = repr(record['exception'].value)
+    return _dumps(entry) + '\n'
+
+
+class RotatingFile:
+    """Arquivo em modo append que rotaciona por tamanho, mantendo `backups` arquivos antigos."""
+
+    def __init__(self, path, max_bytes=JSON_ROTATION_BYTES, backups=JSON_BACKUPS):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def write(self, text):
+        self._file.write(text)
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        self._file.close()
+        self.path.rename(self.path.with_name(f"{self.path.stem}.{datetime.now():%Y-%m-%d_%H-%M-%S}{self.path.suffix}"))
+        rotated = sorted(self.path.parent.glob(f"{self.path.stem}.*{self.path.suffix}"))
+        for old in rotated[:-self.backups]:
+            old.unlink(missing_ok=True)
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def flush(self):
+        self._file.flush()
+
+
+class AsyncSink:
+    """
+    Sink do loguru que só enfileira a mensagem na thread que loga; uma thread dedicada
+    serializa (JSON, se `serialize`) e escreve no `stream`. Diferente de `enqueue=True`,
+    o registro não é serializado com pickle no caminho crítico.
+    """
+
+    _STOP = object()
+
+    def __init__(self, stream, serialize=False):
+        self.stream = stream
+        self.serialize = serialize
+        self._queue = SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name="log-sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def __call__(self, message):
+        self._queue.put(message)
+
+    def _run(self):
+        while True:
+            message = self._queue.get()
+            if message is self._STOP:
+                break
+            try:
+                self.stream.write(json_record(message.record) if self.serialize else str(message))
+                # Flush só quando a fila esvazia: rajadas viram uma única escrita no disco/terminal
+                if self._queue.empty():
+                    self.stream.flush()
+            except Exception as e:
+                print(f"Log sink error: {e}", file=sys.stderr)
+        self.stream.flush()
+
+    def stop(self):
+        """Escreve o que restou na fila e encerra a thread."""
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join(timeout=5)
+
+
+def _configure():
+    # Criar diretório de logs se não existir
+    log_path = Path('logs')
+    log_path.mkdir(parents=True, exist_ok=True)
+
+    # Remover handler padrão
+    logger.remove()
+
+    if LOG_MODE == 'hot':
+        # Registros estruturados em JSON Lines e escrita fora da thread do ciclo
+        logger.add(AsyncSink(RotatingFile(JSON_LOG_PATH), serialize=True), level=LOG_LEVEL, format="{message}")
+        logger.add(
+            AsyncSink(sys.stderr),
+            level=LOG_LEVEL,
+            format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <level>{message}</level>",
+            colorize=True
+        )
+        logger.info(f"Logger configurado - Nível: {LOG_LEVEL} Modo: hot ({JSON_LOG_PATH}, "
+                    f"intervalo de amostragem {LOG_SAMPLE_INTERVAL:g}s)")
+        return
+
+    # Adicionar handler para arquivo
+    logger.add(
+        'logs/trading.log',
+        level=LOG_LEVEL,
+        format=TEXT_FORMAT,
+        rotation="500 MB",
+        retention="10 days",
+        compression="zip",
+        enqueue=True
+    )
+
+    # Adicionar handler para console com cores
+    logger.add(
+        sys.stderr,
+        level=LOG_LEVEL,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        colorize=True
+    )
+
+    if REQUEST_LOGGING:
+        # O pybit loga requisições via `logging` em DEBUG; sem isso elas são formatadas e descartadas
+        logging.getLogger('pybit').setLevel(logging.DEBUG)
+
+    # Log inicial para confirmar configuração
+    logger.info(f"Logger configurado - Nível: {LOG_LEVEL}")
+
+
+# Último envio e quantidade de chamadas suprimidas/amostradas por chave de `hot_log`
+_hot_state = {}
+
+
+def hot_log(key, level, message, /, sample_interval=None, sample_every=1, **fields):
+    """
+    Log para o caminho crítico do ciclo. Nada é formatado se o nível está filtrado.
+
+    A mensagem usa o formato do loguru (`"Close: {close:.2f}"`) e os campos nomeados vão
+    também como campos do registro JSON. Campos chamáveis só são avaliados se a mensagem
+    for emitida. Por `key`, emite no máximo uma vez a cada `sample_interval` segundos (padrão
+    LOG_SAMPLE_INTERVAL) e/ou uma a cada `sample_every` chamadas; a próxima emissão informa
+    quantas foram suprimidas.
+    """
+    if _LEVEL_NO[level] < _MIN_LEVEL_NO:
+        return
+    interval = LOG_SAMPLE_INTERVAL if sample_interval is None else sample_interval
+    now = time.monotonic()
+    last, suppressed = _hot_state.get(key, (None, 0))
+    if last is not None and ((interval and now - last < interval) or (sample_every > 1 and (suppressed + 1) % sample_every)):
+        _hot_state[key] = (last, suppressed + 1)
+        return
+    _hot_state[key] = (now, 0)
+
+    fields = {name: value() if callable(value) else value for name, value in fields.items()}
+    if suppressed:
+        message += " ({suppressed} similar suppressed)"
+        fields['suppressed'] = suppressed
+    logger.opt(depth=1).log(level, message, **fields)
+
+
+# O loguru é um singleton do processo: se este módulo for carregado por outro caminho
+# (ex: `utils.logger` e `src.utils.logger`), os handlers não são duplicados
+if not getattr(logger, '_robo_configured', False):
+    _configure()
+    logger._robo_configured = True
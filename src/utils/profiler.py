@@ -0,0 +1,156 @@
+import cProfile
+import os
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from src.utils.logger import logger
+
+
+class CycleProfiler:
+    """
+    Profiling sob demanda dos ciclos do executor.
+
+    Ativado em tempo de execução por sinal (SIGUSR1) ou pela criação do arquivo de
+    controle (`logs/profile.request`, opcionalmente contendo o número de ciclos).
+    Captura os próximos N ciclos e grava em `logs/`:
+      - `<prefixo>.folded`: pilhas amostradas no formato do flamegraph.pl/speedscope
+      - `<prefixo>.prof`: pstats do cProfile (modo 'cprofile')
+      - `<prefixo>-alloc.txt`: top-N alocações do tracemalloc e duração dos ciclos
+    Depois se desliga sozinho. Desligado, custa um stat() do arquivo de controle por ciclo.
+    """
+
+    def __init__(self, name="main", log_dir="logs", default_cycles=5, mode="sample",
+                 sample_interval=0.005, top_n=25):
+        self.name = name
+        self.log_dir = Path(log_dir)
+        self.control_file = self.log_dir / ("profile.request" if name == "main" else f"profile-{name}.request")
+        self.default_cycles = default_cycles
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.top_n = top_n
+
+        self._requested = 0
+        self._remaining = 0
+        self._in_cycle = False
+        self._samples = Counter()
+        self._durations = []
+        self._profile = None
+        self._sampler = None
+        self._baseline = None
+        self._thread_id = None
+
+    def install_signal(self, signum=None):
+        """Registra o sinal que ativa a captura (SIGUSR1 por padrão, indisponível no Windows)."""
+        signum = signum or getattr(signal, "SIGUSR1", None)
+        if signum is None:
+            return
+        signal.signal(signum, lambda *_: self.request())
+        logger.info(f"Profiler: Send signal {signum} to pid {os.getpid()} or create {self.control_file} to profile the next cycles")
+
+    def request(self, cycles=None):
+        self._requested = cycles or self.default_cycles
+
+    def _poll_control_file(self):
+        try:
+            content = self.control_file.read_text().strip()
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            logger.warning(f"Profiler: Could not read {self.control_file}: {e}")
+            return
+        try:
+            self.control_file.unlink()
+        except OSError:
+            pass
+        self.request(int(content) if content.isdigit() else None)
+
+    @property
+    def active(self):
+        return self._remaining > 0
+
+    @contextmanager
+    def cycle(self):
+        """Envolve um ciclo do executor; só mede quando uma captura foi solicitada."""
+        if not self._remaining:
+            self._poll_control_file()
+            if self._requested:
+                self._start(self._requested)
+                self._requested = 0
+        if not self._remaining:
+            yield
+            return
+
+        started = time.perf_counter()
+        self._in_cycle = True
+        if self._profile:
+            self._profile.enable()
+        try:
+            yield
+        finally:
+            if self._profile:
+                self._profile.disable()
+            self._in_cycle = False
+            self._durations.append(time.perf_counter() - started)
+            self._remaining -= 1
+            if not self._remaining:
+                self._finish()
+
+    def _start(self, cycles):
+        logger.info(f"Profiler: Capturing next {cycles} cycle(s) (mode: {self.mode})")
+        self._remaining = cycles
+        self._samples.clear()
+        self._durations = []
+        self._thread_id = threading.get_ident()
+        tracemalloc.start(10)
+        self._baseline = tracemalloc.take_snapshot()
+        if self.mode == "cprofile":
+            self._profile = cProfile.Profile()
+        else:
+            self._sampler = threading.Thread(target=self._sample_loop, name="profiler-sampler", daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        while self._remaining:
+            if self._in_cycle:
+                frame = sys._current_frames().get(self._thread_id)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    self._samples[";".join(reversed(stack))] += 1
+            time.sleep(self.sample_interval)
+
+    def _finish(self):
+        prefix = self.log_dir / f"profile-{self.name}-{time.strftime('%Y%m%d-%H%M%S')}"
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+
+        snapshot = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        allocations = snapshot.compare_to(self._baseline, "lineno")[:self.top_n]
+        self._baseline = None
+
+        if self._sampler:
+            self._sampler.join(timeout=1)
+            self._sampler = None
+            with open(f"{prefix}.folded", "w") as f:
+                for stack, count in self._samples.most_common():
+                    f.write(f"{stack} {count}\n")
+        if self._profile:
+            self._profile.dump_stats(f"{prefix}.prof")
+            self._profile = None
+
+        with open(f"{prefix}-alloc.txt", "w") as f:
+            durations = ", ".join(f"{d * 1000:.1f}ms" for d in self._durations)
+            f.write(f"Cycles: {len(self._durations)} ({durations})\n\n")
+            f.write(f"Top {self.top_n} allocations since capture start:\n")
+            for stat in allocations:
+                f.write(f"{stat}\n")
+
+        logger.info(f"Profiler: Capture finished, results written to {prefix}.*")
@@ -1,26 +1,47 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import pandas as pd
 from pandas import DataFrame
-from src.utils.logger import logger
+from src.utils.logger import logger, hot_log
 import numpy as np
 
+# Candles buscados quando a estratégia não declara o lookback
+DEFAULT_CANDLE_COUNT = 200
+# Médias exponenciais convergem (erro da semente < 0,1%) após ~3,5x o período
+WARMUP_FACTOR = 4
+
 class BaseStrategy(ABC):
     
     stop_loss = None
     take_profit = None    
     leverage = 1  # Valor padrão
     investment_percent = None
+    # Histórico necessário: declarado em `startup_candle_count` ou derivado dos períodos
+    # listados em `indicator_params` (nomes de atributos, ex: ('ema_fast', 'ema_slow'))
+    startup_candle_count: Optional[int] = None
+    indicator_params: Tuple[str, ...] = ()
+    # Séries de mercado adicionadas como colunas aos candles, alinhadas pelo timestamp:
+    # 'funding_rate', 'mark_price', 'index_price', 'open_interest' (ver src/data/market_data.py)
+    aux_data: Tuple[str, ...] = ()
     
     def __init__(self, config: Dict):
         self.config = config
         self.name = self.__class__.__name__
         self.metadata = {}  # Inicializar metadata vazio
 
+    def required_candles(self) -> int:
+        """Quantidade de candles que `calculate_signals` precisa para valores corretos no último candle."""
+        if self.startup_candle_count:
+            return int(self.startup_candle_count)
+        periods = [int(getattr(self, name)) for name in self.indicator_params if getattr(self, name, None)]
+        if not periods:
+            return DEFAULT_CANDLE_COUNT
+        return max(periods) * WARMUP_FACTOR
+
     def update_metadata(self, metadata: dict):
         """Atualiza o metadata da estratégia."""
         self.metadata.update(metadata)
-        logger.info(f"Strategy: Metadata updated - {metadata}")
+        hot_log('strategy.metadata', 'DEBUG', "Strategy: Metadata updated - {metadata}", metadata=lambda: dict(metadata))
 
     @abstractmethod
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
@@ -100,10 +121,11 @@ class BaseStrategy(ABC):
             
         return dataframe
 
-    def calculate_signals(self, dataframe: DataFrame, metadata: Optional[dict] = None) -> DataFrame:
+    def calculate_signals(self, dataframe: DataFrame, metadata: Optional[dict] = None, with_indicators: bool = True) -> DataFrame:
         """
         Método principal que calcula todos os sinais.
         As estratégias podem sobrescrever este método se precisarem de lógica adicional.
+        Com with_indicators=False os indicadores já devem vir no dataframe (ex: barramento de memória compartilhada).
         """
         if metadata is not None:
             self.update_metadata(metadata)        
@@ -117,7 +139,8 @@ class BaseStrategy(ABC):
         dataframe['take_profit'] = np.zeros(len(dataframe))
 
         # 2. Popular indicadores
-        dataframe = self.populate_indicators(dataframe, self.metadata)
+        if with_indicators:
+            dataframe = self.populate_indicators(dataframe, self.metadata)
 
         # 3. Popular sinais de entrada
         dataframe = self.populate_entry_trend(dataframe, self.metadata)
@@ -129,11 +152,20 @@ class BaseStrategy(ABC):
         dataframe = self.populate_stop_loss(dataframe, self.metadata)
         dataframe = self.populate_take_profit(dataframe, self.metadata)
         
-        # 6. Log dos últimos valores para debug
-        last_row = dataframe.iloc[-1]
-        logger.info(f"Strategy: Last row - Close: {last_row['close']:.2f}, EnterLong: {last_row.get('enter_long', 0)}, "
-                   f"EnterShort: {last_row.get('enter_short', 0)}, ExitLong: {last_row.get('exit_long', 0)}, "
-                   f"ExitShort: {last_row.get('exit_short', 0)}, StopLoss: {last_row.get('stop_loss', 0):.2f}, "
-                   f"TakeProfit: {last_row.get('take_profit', 0):.2f}")
+        # 6. Log dos últimos valores (a linha só é extraída se a mensagem for emitida)
+        hot_log('strategy.last_row', 'INFO',
+                "Strategy: Last row - Close: {row[close]:.2f}, EnterLong: {row[enter_long]}, "
+                "EnterShort: {row[enter_short]}, ExitLong: {row[exit_long]}, ExitShort: {row[exit_short]}, "
+                "StopLoss: {row[stop_loss]:.2f}, TakeProfit: {row[take_profit]:.2f}",
+                row=lambda: self._signal_snapshot(dataframe))
 
         return dataframe
+
+    @staticmethod
+    def _signal_snapshot(dataframe: DataFrame) -> dict:
+        """Fechamento, sinais e SL/TP do último candle como valores Python simples (para log)."""
+        last_row = dataframe.iloc[-1]
+        snapshot = {'close': last_row['close']}
+        for column in ('enter_long', 'enter_short', 'exit_long', 'exit_short', 'stop_loss', 'take_profit'):
+            snapshot[column] = last_row.get(column, 0)
+        return {key: value.item() if hasattr(value, 'item') else value for key, value in snapshot.items()}
@@ -10,6 +10,7 @@ class SimpleCrossLongTest(BaseStrategy):
     """
     Estratégia de cruzamento de médias móveis .
     """
+    indicator_params = ('ema_fast', 'ema_slow')
     
     def __init__(self, config=None):
         super().__init__(config)
@@ -10,6 +10,7 @@ class SimpleCrossShortTest(BaseStrategy):
     """
     Estratégia de cruzamento de médias móveis .
     """
+    indicator_params = ('ema_fast', 'ema_slow')
     
     def __init__(self, config=None):
         super().__init__(config)
@@ -23,9 +24,6 @@ class SimpleCrossShortTest(BaseStrategy):
         # Stop Loss e Take Profit em porcentagem do capital investido
         self.stoploss = 0.02  # 2% do valor de entrada
         self.takeprofit = 0.04  # 4% do valor de entrada
-        
-        # Período de lookback para cálculos
-        self.lookback_period = self.ema_slow + 51
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
         """Calcula os indicadores técnicos."""
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+from src.data.candle_cache import CandleCache
+
+STEP = 60_000  # intervalo '1'
+
+
+class Clock:
+    def __init__(self, now_ms):
+        self.now = now_ms
+
+    def now_ms(self):
+        return self.now
+
+
+class Connector:
+    """Candles sintéticos até o horário do relógio; o último está em formação (close = versão)."""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.limits = []
+        self.version = 0
+        self.fail = False
+
+    def get_historical_candles(self, category, symbol, interval, limit=200):
+        self.limits.append(limit)
+        if self.fail:
+            return None
+        last = self.clock.now // STEP * STEP
+        timestamps = np.arange(last - (limit - 1) * STEP, last + 1, STEP)
+        close = timestamps / STEP
+        close[-1] += self.version / 10
+        return pd.DataFrame({'timestamp': timestamps, 'close': close})
+
+
+def make_cache(now=1_000 * STEP):
+    clock = Clock(now)
+    connector = Connector(clock)
+    return CandleCache(connector, clock=clock), connector, clock
+
+
+def test_first_call_loads_the_full_window():
+    cache, connector, _ = make_cache()
+    window = cache.get('linear', 'BTCUSDT', '1', 50)
+    assert connector.limits == [50]
+    assert len(window) == 50 and window['timestamp'].is_monotonic_increasing
+
+
+def test_delta_fetch_appends_new_candles_and_trims():
+    cache, connector, clock = make_cache()
+    first = cache.get('linear', 'BTCUSDT', '1', 50)
+    clock.now += 2 * STEP
+    window = cache.get('linear', 'BTCUSDT', '1', 50)
+    # Os dois novos e o último armazenado (que pode ter sido salvo em formação)
+    assert connector.limits == [50, 3]
+    assert len(window) == 50
+    assert window['timestamp'].iloc[0] == first['timestamp'].iloc[2]
+    assert window['timestamp'].iloc[-1] == clock.now // STEP * STEP
+    assert window['timestamp'].is_unique
+
+
+def test_forming_candle_is_replaced():
+    cache, connector, _ = make_cache()
+    cache.get('linear', 'BTCUSDT', '1', 50)
+    connector.version = 5
+    window = cache.get('linear', 'BTCUSDT', '1', 50)
+    assert connector.limits == [50, 1]
+    assert len(window) == 50
+    assert window['close'].iloc[-1] == window['timestamp'].iloc[-1] / STEP + 0.5
+
+
+def test_larger_window_or_long_gap_reloads_everything():
+    cache, connector, clock = make_cache()
+    cache.get('linear', 'BTCUSDT', '1', 50)
+    cache.get('linear', 'BTCUSDT', '1', 80)
+    clock.now += 100 * STEP
+    cache.get('linear', 'BTCUSDT', '1', 80)
+    assert connector.limits == [50, 80, 80]
+
+
+def test_failed_fetch_keeps_the_cached_window():
+    cache, connector, clock = make_cache()
+    cache.get('linear', 'BTCUSDT', '1', 50)
+    connector.fail = True
+    clock.now += STEP
+    assert cache.get('linear', 'BTCUSDT', '1', 50) is None
+    connector.fail = False
+    window = cache.get('linear', 'BTCUSDT', '1', 50)
+    assert connector.limits == [50, 2, 2]
+    assert len(window) == 50
+
+
+def test_returned_window_is_a_copy():
+    cache, _, _ = make_cache()
+    window = cache.get('linear', 'BTCUSDT', '1', 10)
+    window['ema'] = 1.0
+    assert 'ema' not in cache.get('linear', 'BTCUSDT', '1', 10)
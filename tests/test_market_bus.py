@@ -0,0 +1,53 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.core.market_bus import CANDLE_COLUMNS, SharedCandleRing, StreamSpec
+
+
+def candles(timestamps, close=100.0):
+    frame = pd.DataFrame({'timestamp': timestamps})
+    for column in CANDLE_COLUMNS[1:]:
+        frame[column] = close
+    return frame
+
+
+@pytest.fixture
+def ring():
+    spec = StreamSpec('linear', f"TEST{os.getpid()}", '1', 'test', capacity=4)
+    ring = SharedCandleRing.create(spec)
+    yield ring
+    ring.close()
+
+
+def test_unchanged_poll_does_not_bump_seq(ring):
+    assert ring.write(candles([1, 2, 3])) == 3
+    seq = ring.seq
+    assert ring.write(candles([1, 2, 3])) == 0
+    assert ring.seq == seq
+
+
+def test_forming_candle_is_replaced_when_it_changes(ring):
+    ring.write(candles([1, 2, 3]))
+    seq = ring.seq
+    assert ring.write(candles([2, 3], close=101.0)) == 1
+    assert ring.seq == seq + 2
+    _, frame = ring.frame()
+    assert frame['timestamp'].tolist() == [1, 2, 3]
+    assert frame['close'].tolist() == [100.0, 100.0, 101.0]
+
+
+def test_new_candles_are_appended_and_wrap(ring):
+    ring.write(candles([1, 2, 3]))
+    assert ring.write(candles([3, 4, 5])) == 2
+    _, frame = ring.frame()
+    assert frame['timestamp'].tolist() == [2, 3, 4, 5]
+    assert ring.written == 5
+
+
+def test_view_is_consistent_until_the_next_write(ring):
+    ring.write(candles([1, 2]))
+    seq, _ = ring.view()
+    assert ring.is_consistent(seq)
+    ring.write(candles([3]))
+    assert not ring.is_consistent(seq)
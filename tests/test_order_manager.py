@@ -0,0 +1,112 @@
+import pytest
+from src.core.order_manager import CANCELLED, FILLED, PARTIALLY_FILLED, REJECTED, SUBMITTED, OrderManager
+
+
+class Connector:
+    def __init__(self, accept=True, status=None):
+        self.accept = accept
+        self.status = status
+        self.placed = []
+
+    def place_order(self, **kwargs):
+        self.placed.append(kwargs)
+        return {'orderId': 'ex-1', 'orderLinkId': kwargs['orderLinkId']} if self.accept else None
+
+    def place_batch_order(self, category, orders):
+        return [{'orderId': f"ex-{i}"} if order['symbol'] != 'BAD' else None for i, order in enumerate(orders)]
+
+    def get_order(self, category, symbol, order_link_id):
+        return self.status
+
+
+def execution(order, exec_id, qty, price):
+    return {'data': [{'orderLinkId': order.order_link_id, 'execId': exec_id, 'execQty': str(qty),
+                      'execPrice': str(price), 'execType': 'Trade'}]}
+
+
+def order_update(order, status, cum_qty, avg_price):
+    return {'data': [{'orderLinkId': order.order_link_id, 'orderStatus': status,
+                      'cumExecQty': str(cum_qty), 'avgPrice': str(avg_price)}]}
+
+
+def test_submit_tracks_the_order_until_it_is_final():
+    manager = OrderManager(Connector())
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 2)
+    assert order.status == SUBMITTED and order.order_id == 'ex-1'
+    assert manager.orders[order.order_link_id] is order
+
+    manager.on_order_message(order_update(order, 'PartiallyFilled', 1, 100))
+    assert order.status == PARTIALLY_FILLED and order.filled_qty == 1
+    manager.on_order_message(order_update(order, 'Filled', 2, 101))
+    assert order.status == FILLED and order.avg_price == 101
+    assert order.order_link_id not in manager.orders
+
+
+def test_rejected_submit():
+    manager = OrderManager(Connector(accept=False))
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 1)
+    assert order.status == REJECTED and order.done
+
+
+def test_duplicate_execution_is_counted_once():
+    manager = OrderManager(Connector())
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 1)
+    manager.on_execution_message(execution(order, 'e1', 0.5, 100))
+    manager.on_execution_message(execution(order, 'e1', 0.5, 100))
+    assert order.status == PARTIALLY_FILLED
+    assert order.filled_qty == pytest.approx(0.5)
+
+
+def test_fill_reported_on_both_streams_is_not_double_counted():
+    manager = OrderManager(Connector())
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 1)
+    manager.on_order_message(order_update(order, 'PartiallyFilled', 0.5, 100))
+    manager.on_execution_message(execution(order, 'e1', 0.5, 100))
+    assert order.filled_qty == pytest.approx(0.5) and order.status == PARTIALLY_FILLED
+
+    manager.on_execution_message(execution(order, 'e2', 0.5, 110))
+    assert order.status == FILLED
+    assert order.filled_qty == pytest.approx(1) and order.avg_price == pytest.approx(105)
+
+
+def test_order_snapshot_does_not_regress_newer_executions():
+    manager = OrderManager(Connector())
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 2)
+    manager.on_execution_message(execution(order, 'e1', 1, 100))
+    manager.on_order_message(order_update(order, 'New', 0, 0))
+    assert order.filled_qty == 1 and order.avg_price == 100
+
+
+def test_non_trade_executions_are_ignored():
+    manager = OrderManager(Connector())
+    order = manager.submit('linear', 'BTCUSDT', 'Buy', 'Market', 1)
+    manager.on_execution_message({'data': [{'orderLinkId': order.order_link_id, 'execId': 'f1', 'execQty': '1',
+                                            'execPrice': '1', 'execType': 'Funding'}]})
+    assert order.filled_qty == 0 and order.status == SUBMITTED
+
+
+def test_wait_polls_until_final():
+    connector = Connector(status={'orderStatus': 'Cancelled', 'cumExecQty': '0', 'avgPrice': '0'})
+    manager = OrderManager(connector, poll_interval=0.01)
+    order = manager.wait(manager.submit('linear', 'BTCUSDT', 'Buy', 'Limit', 1), timeout=1)
+    assert order.status == CANCELLED
+    assert not manager.orders
+
+
+def test_wait_timeout_leaves_the_order_open_until_forgotten():
+    connector = Connector(status={'orderStatus': 'New', 'cumExecQty': '0', 'avgPrice': '0'})
+    manager = OrderManager(connector, poll_interval=0.01)
+    order = manager.wait(manager.submit('linear', 'BTCUSDT', 'Buy', 'Limit', 1), timeout=0.05)
+    assert order.status == SUBMITTED and not order.done
+    manager.forget(order)
+    assert not manager.orders
+
+
+def test_batch_rejections_do_not_affect_other_orders():
+    manager = OrderManager(Connector())
+    orders = manager.submit_batch([
+        {'category': 'linear', 'symbol': 'BTCUSDT', 'side': 'Buy', 'order_type': 'Market', 'qty': 1},
+        {'category': 'linear', 'symbol': 'BAD', 'side': 'Buy', 'order_type': 'Market', 'qty': 1},
+    ])
+    assert [order.status for order in orders] == [SUBMITTED, REJECTED]
+    assert list(manager.orders) == [orders[0].order_link_id]
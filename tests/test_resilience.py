@@ -0,0 +1,139 @@
+import asyncio
+import aiohttp
+import pytest
+import requests
+from pybit.exceptions import InvalidRequestError
+from src.connector.async_bybit_connector import AsyncBybitConnector
+from src.connector.resilience import CircuitBreaker, CircuitOpenError, ResilienceConfig, ResilientSession
+
+INSUFFICIENT_BALANCE = 110007
+
+
+def rejection(code=INSUFFICIENT_BALANCE):
+    return InvalidRequestError(request="place_order", message="rejected", status_code=code, time="", resp_headers={})
+
+
+class ScriptedSession:
+    """Sessão pybit falsa: cada chamada consome o próximo resultado (exceção ou resposta)."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def place_order(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0) if self.outcomes else {'retCode': 0, 'result': {}}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+def config(**overrides):
+    settings = dict(max_attempts=1, failure_threshold=2, reset_timeout=60.0, base_delay=0.0)
+    settings.update(overrides)
+    return ResilienceConfig(**settings)
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_breaker_probe_outcomes():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.failures == 0
+
+    breaker.record_failure()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.failures == 2 and breaker.allow()
+
+
+def test_release_probe_lets_the_next_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.state == "half-open" and breaker.allow()
+
+
+def test_open_circuit_rejects_without_calling():
+    session = ScriptedSession(requests.exceptions.ConnectionError(), requests.exceptions.ConnectionError())
+    resilient = ResilientSession(session, config())
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            resilient.place_order(category='linear')
+    with pytest.raises(CircuitOpenError):
+        resilient.place_order(category='linear')
+    assert session.calls == 2
+    assert resilient.stats['rejected'] == 1
+
+
+def test_rejected_probe_does_not_leave_the_circuit_stuck():
+    session = ScriptedSession(requests.exceptions.ConnectionError(), requests.exceptions.ConnectionError(), rejection())
+    resilient = ResilientSession(session, config(reset_timeout=0.0))
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            resilient.place_order(category='linear')
+    with pytest.raises(InvalidRequestError):
+        resilient.place_order(category='linear')
+    assert resilient.place_order(category='linear')['retCode'] == 0
+    assert session.calls == 4
+
+
+def test_probe_released_on_local_error():
+    session = ScriptedSession(requests.exceptions.ConnectionError(), requests.exceptions.ConnectionError(), ValueError("bad"))
+    resilient = ResilientSession(session, config(reset_timeout=0.0))
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            resilient.place_order(category='linear')
+    with pytest.raises(ValueError):
+        resilient.place_order(category='linear')
+    assert resilient.place_order(category='linear')['retCode'] == 0
+
+
+def test_retries_transient_failures_with_order_link_id():
+    session = ScriptedSession(requests.exceptions.ConnectionError(), {'retCode': 0, 'result': {'orderId': '1'}})
+    resilient = ResilientSession(session, config(max_attempts=3, failure_threshold=5))
+    response = resilient.place_order(category='linear', orderLinkId='bot-1')
+    assert response['result']['orderId'] == '1'
+    assert session.calls == 2 and resilient.stats['retries'] == 1
+
+
+def test_async_rejected_probe_does_not_leave_the_circuit_stuck():
+    outcomes = [asyncio.TimeoutError(), asyncio.TimeoutError(),
+                aiohttp.ClientResponseError(request_info=None, history=(), status=400), {'retCode': 0, 'result': {}}]
+
+    async def send(method, path, params, auth):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def scenario():
+        connector = AsyncBybitConnector(api_key='key', api_secret='secret',
+                                        resilience={'max_attempts': 1, 'failure_threshold': 2, 'reset_timeout': 0.0})
+        connector._send = send
+        for _ in range(2):
+            with pytest.raises(asyncio.TimeoutError):
+                await connector._request("POST", "/v5/order/create", {'category': 'linear'})
+        with pytest.raises(aiohttp.ClientResponseError):
+            await connector._request("POST", "/v5/order/create", {'category': 'linear'})
+        return await connector._request("POST", "/v5/order/create", {'category': 'linear'})
+
+    assert asyncio.run(scenario())['retCode'] == 0
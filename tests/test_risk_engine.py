@@ -0,0 +1,141 @@
+import pytest
+from src.core.risk_engine import RiskEngine, RiskLimits
+from src.core.supervisor import ShardPlan, split_risk_config
+
+
+def engine(**limits):
+    risk = RiskEngine(RiskLimits(**limits))
+    risk.update_equity(10_000)
+    return risk
+
+
+def test_fills_keep_aggregates_and_realize_pnl():
+    risk = engine()
+    risk.on_fill('BTCUSDT', 'Buy', 1, 100)
+    risk.on_fill('BTCUSDT', 'Buy', 1, 110)
+    assert risk.positions['BTCUSDT'].entry_price == pytest.approx(105)
+    assert risk.gross_exposure == pytest.approx(220)
+    assert risk.open_positions == 1
+
+    risk.on_fill('BTCUSDT', 'Sell', 1.5, 120, fee=0.5)
+    assert risk.realized_pnl_today == pytest.approx(1.5 * 15 - 0.5)
+    assert risk.positions['BTCUSDT'].size == pytest.approx(0.5)
+
+    risk.on_fill('BTCUSDT', 'Sell', 1, 100)
+    position = risk.positions['BTCUSDT']
+    assert risk.realized_pnl_today == pytest.approx(22.0 - 2.5)
+    assert position.size == pytest.approx(-0.5) and position.entry_price == 100
+    assert risk.open_positions == 1
+
+
+def test_short_pnl_is_positive_when_price_falls():
+    risk = engine()
+    risk.on_fill('ETHUSDT', 'Sell', 2, 50)
+    risk.on_fill('ETHUSDT', 'Buy', 2, 40)
+    assert risk.realized_pnl_today == pytest.approx(20)
+    assert risk.open_positions == 0 and risk.gross_exposure == pytest.approx(0)
+
+
+def test_sync_position_realizes_exchange_side_closes():
+    risk = engine()
+    risk.sync_position('BTCUSDT', 2, 100, 100)
+    risk.sync_position('BTCUSDT', 2, 100, 90)
+    assert risk.unrealized_pnl == pytest.approx(-20) and risk.realized_pnl_today == 0
+
+    risk.sync_position('BTCUSDT', 1, 100, 95)
+    assert risk.realized_pnl_today == pytest.approx(-5)
+    risk.sync_position('BTCUSDT', 0, 0, 97)
+    assert risk.realized_pnl_today == pytest.approx(-8)
+    assert risk.open_positions == 0 and risk.unrealized_pnl == pytest.approx(0)
+
+
+def test_sync_position_flip_realizes_the_whole_old_side():
+    risk = engine()
+    risk.sync_position('BTCUSDT', -1, 100, 100)
+    risk.sync_position('BTCUSDT', 1, 90, 90)
+    assert risk.realized_pnl_today == pytest.approx(10)
+    assert risk.open_positions == 1
+
+
+def test_daily_loss_cap_blocks_new_risk_but_not_reductions():
+    risk = engine(daily_loss_cap=4)
+    risk.sync_position('BTCUSDT', 1, 100, 100)
+    risk.sync_position('BTCUSDT', 0, 0, 95)
+    decision = risk.check_order('ETHUSDT', 'Buy', 1, 10)
+    assert not decision.allowed and 'daily loss cap' in decision.reason
+
+    risk.sync_position('SOLUSDT', 1, 10, 10)
+    assert risk.check_order('SOLUSDT', 'Sell', 1, 10).allowed
+    assert risk.check_order('SOLUSDT', 'Buy', 1, 10, reduce_only=True).allowed
+
+
+def test_daily_pnl_resets_on_a_new_day(monkeypatch):
+    risk = engine()
+    risk.on_fill('BTCUSDT', 'Buy', 1, 100)
+    risk.on_fill('BTCUSDT', 'Sell', 1, 90)
+    assert risk.realized_pnl_today == pytest.approx(-10)
+    monkeypatch.setattr(RiskEngine, '_current_day', staticmethod(lambda: risk._day + 1))
+    risk.check_order('BTCUSDT', 'Buy', 1, 100)
+    assert risk.realized_pnl_today == 0
+
+
+def test_max_open_positions_only_blocks_new_symbols():
+    risk = engine(max_open_positions=1)
+    risk.on_fill('BTCUSDT', 'Buy', 1, 100)
+    assert not risk.check_order('ETHUSDT', 'Buy', 1, 10).allowed
+    assert risk.check_order('BTCUSDT', 'Buy', 1, 100).allowed
+
+
+def test_exposure_limits_resize_the_order():
+    risk = engine(max_total_exposure=1_000, max_symbol_exposure=300)
+    risk.on_fill('BTCUSDT', 'Buy', 1, 100)
+    decision = risk.check_order('BTCUSDT', 'Buy', 5, 100)
+    assert decision.allowed and decision.resized
+    assert decision.qty == pytest.approx(2)
+    assert 'symbol exposure' in decision.reason
+
+    risk.on_fill('ETHUSDT', 'Buy', 8, 100)
+    decision = risk.check_order('SOLUSDT', 'Buy', 5, 100)
+    assert decision.qty == pytest.approx(1)
+
+
+def test_leverage_and_free_margin_caps():
+    risk = engine(max_leverage=2)
+    risk.update_equity(100)
+    assert risk.check_order('BTCUSDT', 'Buy', 5, 100).qty == pytest.approx(1)
+    risk.on_fill('BTCUSDT', 'Buy', 2, 100)
+    decision = risk.check_order('ETHUSDT', 'Buy', 1, 100)
+    assert not decision.allowed and 'no room left' in decision.reason
+
+
+def test_unknown_limits_are_ignored():
+    assert RiskLimits.from_dict({'max_open_positions': 3, 'typo': 1}) == RiskLimits(max_open_positions=3)
+
+
+def plans(*pairs_per_shard):
+    return [ShardPlan(shard_id=i, entries=[{'pair': pair} for pair in pairs], run_interval=5.0)
+            for i, pairs in enumerate(pairs_per_shard)]
+
+
+def test_split_risk_config_single_shard_keeps_the_limits():
+    config = {'max_total_exposure': 1000}
+    assert split_risk_config(config, plans(['BTCUSDT'])) == [config]
+    assert split_risk_config(None, plans(['BTCUSDT'], ['ETHUSDT'])) == [None, None]
+
+
+def test_split_risk_config_never_exceeds_the_host_limits():
+    config = {'max_total_exposure': 900, 'daily_loss_cap': 90, 'max_leverage': 3,
+              'max_open_positions': 4, 'max_symbol_exposure': 400}
+    shards = split_risk_config(config, plans(['BTCUSDT', 'ETHUSDT'], ['BTCUSDT'], ['SOLUSDT']))
+    assert [s['max_total_exposure'] for s in shards] == [300, 300, 300]
+    assert sum(s['daily_loss_cap'] for s in shards) == pytest.approx(90)
+    assert sum(s['max_leverage'] for s in shards) == pytest.approx(3)
+    assert [s['max_open_positions'] for s in shards] == [2, 1, 1]
+    # BTCUSDT está em dois shards: o pior caso divide a exposição por símbolo por dois
+    assert all(s['max_symbol_exposure'] == 200 for s in shards)
+    assert config['max_total_exposure'] == 900
+
+
+def test_split_risk_config_can_leave_a_shard_without_positions():
+    shards = split_risk_config({'max_open_positions': 1}, plans(['BTCUSDT'], ['ETHUSDT']))
+    assert [s['max_open_positions'] for s in shards] == [1, 0]
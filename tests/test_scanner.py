@@ -0,0 +1,69 @@
+from src.core.scanner import MarketScanner, ScannerConfig, shortlist, tickers_to_frame
+
+
+def ticker(symbol, turnover=100e6, change=0.05, bid=99.9, ask=100.1):
+    return {'symbol': symbol, 'lastPrice': '100', 'bid1Price': str(bid), 'ask1Price': str(ask),
+            'turnover24h': str(turnover), 'volume24h': '1', 'price24hPcnt': str(change)}
+
+
+def test_tickers_to_frame_derives_spread_and_change():
+    frame = tickers_to_frame([ticker('BTCUSDT'), {'symbol': 'NEWUSDT', 'bid1Price': '', 'ask1Price': ''}])
+    btc, new = frame.iloc[0], frame.iloc[1]
+    assert round(btc['spread_pct'], 6) == 0.2
+    assert round(btc['change_pct'], 6) == 5.0
+    assert new['spread_pct'] != new['spread_pct']  # NaN sem book
+    assert tickers_to_frame([]).empty
+
+
+def test_shortlist_filters():
+    frame = tickers_to_frame([
+        ticker('BTCUSDT', turnover=900e6),
+        ticker('ETHUSDT', turnover=500e6, change=-0.04),
+        ticker('LOWUSDT', turnover=1e6),
+        ticker('FLATUSDT', change=0.001),
+        ticker('WIDEUSDT', bid=95, ask=105),
+        ticker('BTCUSDC', turnover=950e6),
+        ticker('SKIPUSDT'),
+    ])
+    config = ScannerConfig(min_turnover_24h=50e6, min_abs_change_pct=3, max_spread_pct=0.5, exclude=['SKIPUSDT'])
+    assert shortlist(frame, config) == ['BTCUSDT', 'ETHUSDT']
+
+
+def test_shortlist_ranks_and_truncates():
+    frame = tickers_to_frame([ticker('AUSDT', change=0.01), ticker('BUSDT', change=0.09), ticker('CUSDT', change=0.05)])
+    assert shortlist(frame, ScannerConfig(rank_by='change_pct', top_n=2)) == ['BUSDT', 'CUSDT']
+    assert shortlist(frame, ScannerConfig(quote_coin=None, top_n=5)) == ['AUSDT', 'BUSDT', 'CUSDT']
+    assert shortlist(tickers_to_frame([]), ScannerConfig()) == []
+
+
+class Connector:
+    def __init__(self, tickers, positions):
+        self.tickers = tickers
+        self.positions = positions
+        self.position_calls = []
+
+    def get_tickers(self, category):
+        return self.tickers
+
+    def get_open_positions(self, category, settle_coin=None):
+        self.position_calls.append((category, settle_coin))
+        return self.positions
+
+
+def test_select_merges_exchange_positions_include_and_shortlist():
+    connector = Connector([ticker('BTCUSDT'), ticker('ETHUSDT', turnover=50e6)], [{'symbol': 'OLDUSDT', 'size': '1'}])
+    scanner = MarketScanner(connector, 'test', 'linear', '15', ScannerConfig(include=['ETHUSDT']))
+    try:
+        assert scanner.select() == ['OLDUSDT', 'ETHUSDT', 'BTCUSDT']
+        assert connector.position_calls == [('linear', 'USDT')]
+    finally:
+        scanner.close()
+
+
+def test_select_without_tickers_skips_the_cycle():
+    connector = Connector(None, [])
+    scanner = MarketScanner(connector, 'test', 'linear', '15', ScannerConfig())
+    try:
+        assert scanner.select() is None
+    finally:
+        scanner.close()
@@ -0,0 +1,38 @@
+from src.core.supervisor import CALLS_PER_CYCLE, plan_shards
+
+
+def entries(*pairs):
+    return [{'pair': pair, 'timeframe': '15', 'strategy': 'test'} for pair in pairs]
+
+
+def test_no_entries_no_shards():
+    assert plan_shards([], cpu_count=4) == []
+
+
+def test_shards_are_bounded_by_cpus_and_max_shards():
+    portfolio = entries(*(f"PAIR{i}USDT" for i in range(10)))
+    assert len(plan_shards(portfolio, cpu_count=4)) == 4
+    assert len(plan_shards(portfolio, cpu_count=4, max_shards=2)) == 2
+    assert len(plan_shards(entries('BTCUSDT', 'ETHUSDT'), cpu_count=8)) == 2
+
+
+def test_every_entry_runs_exactly_once():
+    portfolio = entries(*(f"PAIR{i}USDT" for i in range(7)))
+    plans = plan_shards(portfolio, cpu_count=3)
+    planned = [entry['pair'] for plan in plans for entry in plan.entries]
+    assert sorted(planned) == sorted(entry['pair'] for entry in portfolio)
+    assert [plan.shard_id for plan in plans] == list(range(len(plans)))
+    assert all(plan.entries for plan in plans)
+
+
+def test_same_pair_stays_in_one_shard():
+    portfolio = entries('ETHUSDT', 'BTCUSDT', 'ETHUSDT', 'BTCUSDT')
+    plans = plan_shards(portfolio, cpu_count=2)
+    assert [{entry['pair'] for entry in plan.entries} for plan in plans] == [{'BTCUSDT'}, {'ETHUSDT'}]
+
+
+def test_api_budget_stretches_the_run_interval():
+    portfolio = entries(*(f"PAIR{i}USDT" for i in range(10)))
+    assert plan_shards(portfolio, run_interval=5.0, api_budget=100, cpu_count=2)[0].run_interval == 5.0
+    plans = plan_shards(portfolio, run_interval=5.0, api_budget=2, cpu_count=2)
+    assert all(plan.run_interval == len(portfolio) * CALLS_PER_CYCLE / 2 for plan in plans)